@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """
-Augment existing D&D Beyond magic items data with SOURCE_SHORT from 5e.tools.
+Augment existing D&D Beyond magic items data (and, with ENTITIES, spells and
+monsters) with SOURCE_SHORT from 5e.tools.
 
 Reads stuff/data/dndbeyond-magicitems-data.csv, scrapes 5e.tools/items.html
 to get SOURCE_SHORT for each item, and outputs a new CSV with all original
@@ -13,32 +14,60 @@ Requires: selenium, rich
 
 Testing/Speed knobs:
  - Set TEST_LIMIT_ITEMS = 10 to only match first 10 items from CSV
+
+With ROW_STORE_DB set, SOURCE_SHORT is merged into the magic_items table of
+the SQLite row store and the output CSV is exported from its
+magicitems_with_sources view.
+
+Streaming mode (STREAMING = True, or more than one input file) builds the
+whole 5e.tools mapping first, or loads it from MAPPING_CACHE, then reads
+each input CSV in CHUNK_SIZE-row chunks and writes the augmented rows as it
+goes, so memory stays constant whatever the file size:
+
+    INPUT_FILE  -> OUTPUT_FILE
+    INPUT_FILES -> <input>-with-sources.csv next to each input
+
+ENTITIES = ("spells", "items", "monsters") adds spells.html and
+bestiary.html: all three list pages are read in one browser session and
+SPELLS_INPUT_FILE / MONSTERS_INPUT_FILE are augmented in the same run, so
+SOURCE_SHORT never needs a new D&D Beyond crawl.
+
+In streaming mode the output CSVs are written directly; with ROW_STORE_DB
+set, each chunk's SOURCE_SHORTs are also merged into the row store (only
+into rows already there, found by ID, URL or name).
 """
 from __future__ import annotations
 
 import csv
+import dataclasses
+import itertools
+import json
 import os
 import random
-import re
 import sys
 import time
-from typing import Dict, List, Optional, Set, Tuple
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Set, Tuple
 from urllib.parse import urlsplit, unquote
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.common.exceptions import (
     StaleElementReferenceException,
     TimeoutException,
+    WebDriverException,
 )
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn, TimeElapsedColumn
 from rich.console import Console
 from rich.panel import Panel
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import metrics, profiling, stream, trace, waits  # noqa: E402
+from common.commands import instrument  # noqa: E402
+from common.crawl import DEFAULT_USER_AGENT, make_driver  # noqa: E402
+from common.records import ItemRow  # noqa: E402
+from common.rowstore import RowStore  # noqa: E402
+from common.text import clean, norm_name, source_short_from_fragment  # noqa: E402
+
 # CONFIG --------------------------------------------------------------------
 INPUT_FILE = "stuff/data/dndbeyond-magicitems-data.csv"
 OUTPUT_FILE = "stuff/data/magicitems-with-sources.csv"
@@ -47,11 +76,7 @@ FIVEETOOLS_URL = "https://5e.tools/items.html"
 HEADLESS = True
 DELAY_MIN = 0.05
 DELAY_MAX = 0.20
-USER_AGENT = (
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-    "AppleWebKit/537.36 (KHTML, like Gecko) "
-    "Chrome/121.0.0.0 Safari/537.36"
-)
+USER_AGENT = DEFAULT_USER_AGENT
 MAX_WAIT = 20
 MAX_SCROLL_ROUNDS = 5
 
@@ -61,59 +86,41 @@ FIVEETOOLS_ROW_WAIT = 3   # For individual row clicks
 # Testing/Speed controls
 # If > 0, stop after matching this many items from CSV
 TEST_LIMIT_ITEMS = 0  # e.g., set to 10 for a quick run; 0 or None for all
-# ---------------------------------------------------------------------------
-
-
-def make_driver(headless: bool = True, user_agent: Optional[str] = None):
-    """Create Chrome webdriver with reduced logging / push messaging disabled."""
-    opts = Options()
-    if headless:
-        try:
-            opts.add_argument("--headless=new")
-        except Exception:
-            opts.add_argument("--headless")
-    opts.add_argument("--window-size=1200,900")
-    # Lightweight page load
-    opts.add_argument("--blink-settings=imagesEnabled=false")
-    opts.add_experimental_option(
-        "prefs",
-        {
-            "profile.managed_default_content_settings.images": 2,
-            "profile.managed_default_content_settings.fonts": 2,
-        },
-    )
-    # Faster initial page load
-    try:
-        opts.page_load_strategy = "eager"
-    except Exception:
-        pass
-
-    opts.add_argument("--no-sandbox")
-    opts.add_argument("--disable-dev-shm-usage")
-    opts.add_argument("--disable-extensions")
-    opts.add_argument("--disable-gpu")
-    opts.add_argument("--disable-background-networking")
-    opts.add_argument("--disable-features=PushMessaging")
-    opts.add_argument("--disable-notifications")
-    opts.add_argument("--log-level=3")
-    if user_agent:
-        opts.add_argument(f"user-agent={user_agent}")
-    opts.add_experimental_option(
-        "excludeSwitches", ["enable-automation", "enable-logging"]
-    )
-    opts.add_experimental_option("useAutomationExtension", False)
-
-    service = Service(log_path=os.devnull)
-    return webdriver.Chrome(service=service, options=opts)
-
-
-def _clean(txt: str) -> str:
-    return " ".join((txt or "").split()).strip()
-
 
-def _norm_name(name: str) -> str:
-    """Normalize a name for joining: lowercase and strip non-alphanumerics."""
-    return re.sub(r"[^a-z0-9]+", "", (name or "").lower())
+# Streaming mode: whole 5e.tools mapping first, then the input CSV(s) in
+# CHUNK_SIZE-row chunks with constant memory (implied by INPUT_FILES)
+STREAMING = False
+CHUNK_SIZE = 1000
+# More D&D Beyond magic item CSVs to augment against the same mapping (streaming mode)
+INPUT_FILES: Tuple[str, ...] = ()
+# 5e.tools lists to augment from: "spells", "items", "monsters" (see LISTS).
+# Anything but ("items",) runs in streaming mode: every list page is loaded
+# once, in one browser session, and each entity's CSV is augmented
+ENTITIES: Tuple[str, ...] = ("items",)
+SPELLS_INPUT_FILE = "stuff/data/dndbeyond-spells-data.csv"
+SPELLS_OUTPUT_FILE = "stuff/data/spells-with-sources.csv"
+MONSTERS_INPUT_FILE = "stuff/data/dndbeyond-monsters-data.csv"
+MONSTERS_OUTPUT_FILE = "stuff/data/monsters-with-sources.csv"
+# name -> SOURCE_SHORT for every row of a 5e.tools list ({key} = spells /
+# items / monsters), reused while younger than MAPPING_MAX_AGE_DAYS
+# (streaming mode); None always scrapes
+MAPPING_CACHE: Optional[str] = "stuff/data/5etools/{key}-sources.json"
+MAPPING_MAX_AGE_DAYS = 7
+REFRESH_MAPPING = False
+
+# SQLite row store to merge SOURCE_SHORT into; None writes OUTPUT_FILE directly
+ROW_STORE_DB: Optional[str] = "stuff/data/scrapers.sqlite3"
+# Chrome HTTP disk cache kept between runs; None uses a fresh profile
+CACHE_DIR: Optional[str] = None
+# Write WebDriver command counts / latencies as JSON here (see common/commands.py)
+COMMAND_STATS: Optional[str] = None
+# Write a Chrome trace-event JSON timeline of the run here (see common/trace.py)
+TRACE_OUTPUT: Optional[str] = None
+# Write run metrics to <base>.prom (Prometheus textfile) and <base>.json (see common/metrics.py)
+METRICS_OUTPUT: Optional[str] = None
+# Write a cProfile file per phase and a summary.txt to this directory (see common/profiling.py)
+PROFILE_OUTPUT: Optional[str] = None
+# ---------------------------------------------------------------------------
 
 
 def _ensure_parent_dir(path: str):
@@ -151,10 +158,10 @@ def _dismiss_5etools_overlays(driver):
             pass
 
 
-def load_ddb_items(filepath: str, limit: Optional[int] = None) -> Tuple[List[Dict[str, str]], List[str]]:
+def load_ddb_items(filepath: str, limit: Optional[int] = None) -> Tuple[List[ItemRow], List[str]]:
     """Load items from DDB CSV file. Returns (items, fieldnames)."""
     console = Console()
-    items = []
+    items: List[ItemRow] = []
     fieldnames = []
     
     if not os.path.exists(filepath):
@@ -165,7 +172,7 @@ def load_ddb_items(filepath: str, limit: Optional[int] = None) -> Tuple[List[Dic
         reader = csv.DictReader(f)
         fieldnames = reader.fieldnames or []
         for row in reader:
-            items.append(row)
+            items.append(ItemRow.from_mapping(row))
             if limit and len(items) >= limit:
                 break
     
@@ -173,14 +180,51 @@ def load_ddb_items(filepath: str, limit: Optional[int] = None) -> Tuple[List[Dic
     console.print(f"[dim]Fields: {', '.join(fieldnames)}[/dim]")
     return items, fieldnames
 
+
+@dataclasses.dataclass(frozen=True)
+class FiveEToolsList:
+    """One 5e.tools list page and the D&D Beyond table it augments."""
+
+    key: str  # "spells", "items", "monsters"
+    url: str
+    container: str  # present once the list has rendered
+    table: str  # row store table
+    label: str
+
+    @property
+    def row_selector(self) -> str:
+        return f"{self.container} a.lst__row-inner"
+
+
+LISTS: Dict[str, FiveEToolsList] = {
+    "spells": FiveEToolsList("spells", "https://5e.tools/spells.html", "#list", "spells", "spells"),
+    "items": FiveEToolsList(
+        "items", FIVEETOOLS_URL, "div.list.list--stats.magic.ele-magic", "magic_items", "items"
+    ),
+    "monsters": FiveEToolsList("monsters", "https://5e.tools/bestiary.html", "#list", "monsters", "monsters"),
+}
+
+# [name, href] of every rendered row, in one round trip
+ROWS_JS = """
+return Array.from(document.querySelectorAll(arguments[0])).map(function (a) {
+  var s = a.querySelector('span.bold, span.ve-col-3-5');
+  return [s ? s.textContent : '', a.getAttribute('href') || ''];
+});
+"""
+
+
 def collect_5e_tools_sources(
     driver,
-    names_filter: Set[str],
+    names_filter: Optional[Set[str]] = None,
+    source: Optional[FiveEToolsList] = None,
 ) -> Dict[str, str]:
     """
-    Visit 5e.tools/items.html and extract name + source from list rows.
-    No clicking needed - everything is in the href and first span.
+    Visit a 5e.tools list page (items.html by default) and extract name +
+    source from its rows. No clicking needed - everything is in the href
+    and first span, read for all rows in one script call.
+    names_filter None keeps every row (the full mapping).
     """
+    source = source or list_for("items")
     console = Console()
     mapping: Dict[str, str] = {}
     
@@ -194,82 +238,275 @@ def collect_5e_tools_sources(
         transient=False,
     ) as progress:
         
-        load_task = progress.add_task("[cyan]Loading 5e.tools/items.html...", total=None)
+        load_task = progress.add_task(f"[cyan]Loading {source.url}...", total=None)
         
-        driver.get(FIVEETOOLS_URL)
-        time.sleep(2)
+        driver.get(source.url)
 
         try:
-            WebDriverWait(driver, FIVEETOOLS_MAX_WAIT).until(
-                lambda d: d.execute_script("return document.readyState") == "complete"
-            )
-            WebDriverWait(driver, FIVEETOOLS_MAX_WAIT).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div.list.list--stats.magic.ele-magic"))
-            )
-        except TimeoutException:
+            if waits.present(driver, source.container, FIVEETOOLS_MAX_WAIT) is None:
+                raise TimeoutException(source.container)
+        except (TimeoutException, WebDriverException):
             console.print("[yellow]Warning: 5e.tools did not load fully.")
             return mapping
 
         _dismiss_5etools_overlays(driver)
 
-        # Scroll to load all items
-        progress.update(load_task, description="[cyan]Loading all items...")
+        # Scroll to load all rows
+        progress.update(load_task, description=f"[cyan]Loading all {source.label}...")
         last_count = 0
         stagnation = 0
         while stagnation < 3:
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(0.5)
-            rows = driver.find_elements(By.CSS_SELECTOR, "div.list.list--stats.magic.ele-magic a.lst__row-inner")
-            if len(rows) == last_count:
+            # Returns as soon as more rows render (at most the old 0.5s poll)
+            try:
+                waits.count_above(driver, source.row_selector, last_count, 0.5)
+            except WebDriverException:
+                pass
+            count = driver.execute_script("return document.querySelectorAll(arguments[0]).length;", source.row_selector)
+            if count == last_count:
                 stagnation += 1
             else:
                 stagnation = 0
-                progress.update(load_task, description=f"[cyan]Loading... ({len(rows)} items)")
-            last_count = len(rows)
+                progress.update(load_task, description=f"[cyan]Loading... ({count} {source.label})")
+            last_count = count
         
-        rows = driver.find_elements(By.CSS_SELECTOR, "div.list.list--stats.magic.ele-magic a.lst__row-inner")
+        rows = driver.execute_script(ROWS_JS, source.row_selector) or []
         progress.remove_task(load_task)
         
         extract_task = progress.add_task(
             f"[cyan]Extracting sources...",
             total=len(rows)
         )
+        target = len(names_filter) if names_filter is not None else len(rows)
         
-        for idx, row in enumerate(rows):
-            try:
-                # Extract name from first span
-                name_span = row.find_element(By.CSS_SELECTOR, "span.bold, span.ve-col-3-5")
-                name = _clean(name_span.text)
-                
-                # Extract source from href
-                href = row.get_attribute("href") or ""
-                frag = urlsplit(href).fragment or ""
-                frag = unquote(frag)
-                
-                main_part = re.split(r"[,&]", frag)[0]
-                source_short = ""
-                if "_" in main_part:
-                    source_short = main_part.rsplit("_", 1)[1].lower()
-
-                if name and source_short:
-                    key = _norm_name(name)
-                    if key not in mapping and key in names_filter:
-                        mapping[key] = source_short
-                
-                progress.update(
-                    extract_task,
-                    completed=idx + 1,
-                    description=f"[cyan]Matched: {len(mapping)}/{len(names_filter)} | Current: {name[:30]}"
-                )
-                
-            except Exception:
-                continue
+        for name, href in rows:
+            name = clean(name)
+            # Extract source from href
+            frag = unquote(urlsplit(href).fragment or "")
+            source_short = source_short_from_fragment(frag)
+
+            if name and source_short:
+                key = norm_name(name)
+                if key not in mapping and (names_filter is None or key in names_filter):
+                    mapping[key] = source_short
         
-        progress.update(extract_task, description=f"[green]Complete! Matched {len(mapping)}/{len(names_filter)}")
+        progress.update(
+            extract_task,
+            completed=len(rows),
+            description=f"[green]Complete! Matched {len(mapping)}/{target}",
+        )
 
     return mapping
 
+
+def list_for(key: str) -> FiveEToolsList:
+    """LISTS[key]; the items page follows FIVEETOOLS_URL."""
+    if key == "items":
+        return dataclasses.replace(LISTS[key], url=FIVEETOOLS_URL)
+    return LISTS[key]
+
+
+def output_path(input_path: str) -> str:
+    """OUTPUT_FILE for INPUT_FILE, <input>-with-sources.csv for any other input."""
+    if input_path == INPUT_FILE:
+        return OUTPUT_FILE
+    root, ext = os.path.splitext(input_path)
+    return f"{root}-with-sources{ext or '.csv'}"
+
+
+def augment_jobs() -> List[Tuple[FiveEToolsList, str, str]]:
+    """(5e.tools list, input CSV, output CSV) for every entity in ENTITIES."""
+    jobs = []
+    for key in ENTITIES:
+        source = list_for(key)
+        if key == "items":
+            jobs.extend((source, path, output_path(path)) for path in (INPUT_FILE, *INPUT_FILES))
+        elif key == "spells":
+            jobs.append((source, SPELLS_INPUT_FILE, SPELLS_OUTPUT_FILE))
+        else:
+            jobs.append((source, MONSTERS_INPUT_FILE, MONSTERS_OUTPUT_FILE))
+    return jobs
+
+
+def load_mapping_cache(path: str, max_age_days: float) -> Optional[Dict[str, str]]:
+    """The cached name -> SOURCE_SHORT mapping, or None if missing or too old."""
+    try:
+        if time.time() - os.path.getmtime(path) > max_age_days * 86400:
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_mapping_cache(path: str, mapping: Dict[str, str]):
+    _ensure_parent_dir(path)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(mapping, f, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def augment_csv(
+    path: str,
+    out_path: str,
+    sources_map: Dict[str, str],
+    store: Optional[RowStore] = None,
+    chunk_size: int = CHUNK_SIZE,
+    limit: Optional[int] = None,
+    stats: Optional[Counter] = None,
+    table: str = "magic_items",
+) -> int:
+    """Stream path through the SOURCE_SHORT join into out_path, chunk_size rows at a time.
+
+    Keeps every input column. The SOURCE_SHORTs found in each chunk are
+    also merged into store's table (see store_sources). Returns the number
+    of rows written.
+    """
+    _ensure_parent_dir(out_path)
+    tmp = f"{out_path}.{os.getpid()}.tmp"
+    written = 0
+    with open(path, "r", newline="", encoding="utf-8") as f_in, \
+            open(tmp, "w", newline="", encoding="utf-8") as f_out:
+        reader = csv.DictReader(f_in)
+        fieldnames = list(reader.fieldnames or [])
+        if "SOURCE_SHORT" not in fieldnames:
+            fieldnames.append("SOURCE_SHORT")
+        writer = csv.DictWriter(f_out, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        rows = itertools.islice(reader, limit) if limit else reader
+        rows = stream.join(rows, sources_map, "SOURCE_SHORT", key=lambda r: norm_name(r.get("NAME", "")), stats=stats)
+        for chunk in stream.batched(rows, chunk_size):
+            writer.writerows(chunk)
+            if store:
+                store_sources(store, table, chunk, stats)
+            written += len(chunk)
+    os.replace(tmp, out_path)
+    return written
+
+
+def store_sources(store: RowStore, table: str, rows: Sequence[Dict[str, str]], stats: Optional[Counter] = None) -> int:
+    """Merge the rows' SOURCE_SHORT into the stored rows they refer to; returns rows changed.
+
+    Only ID and SOURCE_SHORT are written: the input CSVs are views that
+    rename or drop columns (spells export SLUG as NAME, monsters have no
+    ID), so the rest of a row must not go back into the store. Rows whose
+    stored row cannot be found (RowStore.find_id) are counted in
+    stats["store_skipped"].
+    """
+    updates = []
+    for r in rows:
+        if not r.get("SOURCE_SHORT"):
+            continue
+        row_id = store.find_id(table, r)
+        if row_id is None:
+            if stats is not None:
+                stats["store_skipped"] += 1
+            continue
+        updates.append({"ID": row_id, "SOURCE_SHORT": r["SOURCE_SHORT"]})
+    return store.upsert_many(table, updates)
+
+
+def collect_all_sources(console: Console, sources: Sequence[FiveEToolsList]) -> Dict[str, Dict[str, str]]:
+    """key -> full name -> SOURCE_SHORT mapping for each list.
+
+    Fresh MAPPING_CACHE files are used as they are; the other lists are
+    scraped in one browser session, each page loaded once, and cached.
+    """
+    mappings: Dict[str, Dict[str, str]] = {}
+    todo: List[FiveEToolsList] = []
+    for source in sources:
+        cache = MAPPING_CACHE.format(key=source.key) if MAPPING_CACHE else None
+        cached = None
+        if cache and not REFRESH_MAPPING:
+            cached = load_mapping_cache(cache, MAPPING_MAX_AGE_DAYS)
+        if cached is not None:
+            console.print(f"[dim]Using {len(cached)} cached 5e.tools {source.label} sources from {cache}[/dim]")
+            mappings[source.key] = cached
+        else:
+            todo.append(source)
+    if not todo:
+        return mappings
+
+    driver = make_driver(headless=HEADLESS, user_agent=USER_AGENT, cache_dir=CACHE_DIR)
+    commands = instrument(driver) if COMMAND_STATS else None
+    trace.attach(driver)
+    try:
+        for source in todo:
+            try:
+                mappings[source.key] = collect_5e_tools_sources(driver, source=source)
+            except Exception as e:
+                console.print(f"[red]Warning: 5e.tools {source.label} scraping failed: {e!r}[/red]")
+                console.print("[yellow]Continuing without sources.[/yellow]")
+                mappings[source.key] = {}
+    finally:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+    if commands:
+        commands.report()
+        print(f"Command stats -> {commands.write(COMMAND_STATS)}")
+    for source in todo:
+        if MAPPING_CACHE and mappings[source.key]:
+            cache = MAPPING_CACHE.format(key=source.key)
+            save_mapping_cache(cache, mappings[source.key])
+            console.print(f"[dim]Cached {len(mappings[source.key])} 5e.tools {source.label} sources -> {cache}[/dim]")
+    return mappings
+
+
+def main_streaming(console: Console, jobs: Sequence[Tuple[FiveEToolsList, str, str]]) -> int:
+    """Streaming mode: one mapping per list, every input augmented chunk by chunk. Returns rows written."""
+    missing = [path for _source, path, _out in jobs if not os.path.exists(path)]
+    if missing:
+        console.print(f"[red]Error: Input file not found: {', '.join(missing)}[/red]")
+        sys.exit(1)
+
+    metrics.phase("Phase 1: Collecting SOURCE_SHORT from 5e.tools")
+    console.print("\n[bold]Phase 1: Collecting SOURCE_SHORT from 5e.tools[/bold]")
+    sources = list({source.key: source for source, _path, _out in jobs}.values())
+    mappings = collect_all_sources(console, sources)
+
+    metrics.phase("Phase 2: Augmenting CSV files")
+    console.print("\n[bold]Phase 2: Augmenting CSV files[/bold]")
+    stats: Counter = Counter()
+    store = RowStore(ROW_STORE_DB) if ROW_STORE_DB else None
+    total = 0
+    try:
+        for source, path, out in jobs:
+            before, skipped = stats["matched"], stats["store_skipped"]
+            n = augment_csv(
+                path, out, mappings[source.key], store, CHUNK_SIZE, TEST_LIMIT_ITEMS or None, stats, source.table
+            )
+            total += n
+            console.print(f"{path} -> {out}: {n} {source.label}, {stats['matched'] - before} matched")
+            if stats["store_skipped"] > skipped:
+                console.print(
+                    f"[yellow]  {stats['store_skipped'] - skipped} matched {source.label} not found in the "
+                    f"{source.table} table; SOURCE_SHORT not stored for them[/yellow]"
+                )
+    finally:
+        if store:
+            store.close()
+
+    if stats["rows"]:
+        metrics.set_gauge("5etools_match_ratio", stats["matched"] / stats["rows"])
+    console.print(Panel.fit(
+        f"[bold green]✓ Complete![/bold green]\n\n"
+        f"[cyan]Files:[/cyan] {len(jobs)}\n"
+        f"[cyan]Rows:[/cyan] {total}\n"
+        f"[cyan]Matched:[/cyan] {stats['matched']}/{stats['rows']}",
+        border_style="green",
+        title="Results"
+    ))
+    return total
+
+
 def main():
+    if TRACE_OUTPUT:
+        trace.enable()
+    if PROFILE_OUTPUT:
+        profiling.enable(PROFILE_OUTPUT)
     console = Console()
     start_time = time.perf_counter()
     
@@ -279,8 +516,14 @@ def main():
         f"[dim]Limit: {TEST_LIMIT_ITEMS if TEST_LIMIT_ITEMS else 'All items'}[/dim]",
         border_style="cyan"
     ))
+
+    if STREAMING or INPUT_FILES or tuple(ENTITIES) != ("items",):
+        rows = main_streaming(console, augment_jobs())
+        _write_reports(rows)
+        return
     
     # Load existing DDB data
+    metrics.phase("Phase 1: Loading D&D Beyond data")
     console.print("\n[bold]Phase 1: Loading D&D Beyond data[/bold]")
     items, fieldnames = load_ddb_items(INPUT_FILE, limit=(TEST_LIMIT_ITEMS or None))
     
@@ -289,12 +532,15 @@ def main():
         sys.exit(1)
     
     # Build filter set of normalized names
-    names_filter = {_norm_name(item.get("NAME", "")) for item in items if item.get("NAME")}
+    names_filter = {norm_name(item.get("NAME", "")) for item in items if item.get("NAME")}
     console.print(f"[dim]Created filter for {len(names_filter)} unique item names[/dim]")
     
     # Scrape 5e.tools for SOURCE_SHORT
+    metrics.phase("Phase 2: Collecting SOURCE_SHORT from 5e.tools")
     console.print("\n[bold]Phase 2: Collecting SOURCE_SHORT from 5e.tools[/bold]")
-    driver = make_driver(headless=HEADLESS, user_agent=USER_AGENT)
+    driver = make_driver(headless=HEADLESS, user_agent=USER_AGENT, cache_dir=CACHE_DIR)
+    commands = instrument(driver) if COMMAND_STATS else None
+    trace.attach(driver)
     try:
         sources_map = collect_5e_tools_sources(driver, names_filter)
     except Exception as e:
@@ -306,18 +552,24 @@ def main():
             driver.quit()
         except Exception:
             pass
+    if commands:
+        commands.report()
+        print(f"Command stats -> {commands.write(COMMAND_STATS)}")
     
     # Augment items with SOURCE_SHORT
+    metrics.phase("Phase 3: Post-processing data")
     console.print("\n[bold]Phase 3: Post-processing data[/bold]")
     missing_source_short = 0
     for item in items:
         name = item.get("NAME", "")
-        name_key = _norm_name(name)
+        name_key = norm_name(name)
         src_short = sources_map.get(name_key, "")
         if not src_short:
             missing_source_short += 1
         item["SOURCE_SHORT"] = src_short
     
+    if items:
+        metrics.set_gauge("5etools_match_ratio", 1 - missing_source_short / len(items))
     if missing_source_short:
         console.print(
             f"[yellow]Note: {missing_source_short}/{len(items)} items had no matching "
@@ -327,6 +579,7 @@ def main():
         console.print(f"[green]All {len(items)} items matched successfully![/green]")
     
     # Save output CSV with all original fields + SOURCE_SHORT
+    metrics.phase("Phase 4: Saving CSV file")
     console.print("\n[bold]Phase 4: Saving CSV file[/bold]")
     _ensure_parent_dir(OUTPUT_FILE)
     
@@ -336,11 +589,20 @@ def main():
         output_fieldnames.append("SOURCE_SHORT")
     
     try:
-        with open(OUTPUT_FILE, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=output_fieldnames)
-            writer.writeheader()
-            for item in items:
-                writer.writerow(item)
+        if ROW_STORE_DB:
+            store = RowStore(ROW_STORE_DB)
+            try:
+                changed = store.upsert_many("magic_items", items)
+                console.print(f"[dim]Row store: {changed} rows changed in {ROW_STORE_DB}[/dim]")
+                store.export_view("magicitems_with_sources", OUTPUT_FILE)
+            finally:
+                store.close()
+        else:
+            with open(OUTPUT_FILE, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=output_fieldnames)
+                writer.writeheader()
+                for item in items:
+                    writer.writerow(item)
     except Exception as e:
         import traceback
         console.print(f"[red]ERROR saving CSV: {e!r}[/red]")
@@ -366,6 +628,17 @@ def main():
         border_style="green",
         title="Results"
     ))
+    _write_reports(len(items))
+
+
+def _write_reports(rows: int):
+    if TRACE_OUTPUT:
+        print(f"Trace -> {trace.save(TRACE_OUTPUT)}")
+    if PROFILE_OUTPUT:
+        print(f"Profile -> {profiling.save()}")
+    if METRICS_OUTPUT:
+        written = metrics.write(METRICS_OUTPUT, job="updating_ddb_items_with_5etools", rows=rows)
+        print(f"Metrics -> {', '.join(written)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end benchmark: the real collection code against bench/fakesite.py.
+
+Starts the fake D&D Beyond / 5e.tools server in-process, opens one Chrome
+(make_driver, as the scripts do) and runs each scenario's collection
+function against it:
+
+    ddb-spells       ListingCrawler + SPELLS       (panel per row)
+    ddb-items        ListingCrawler + MAGIC_ITEMS  (panel per row)
+    ddb-monsters     ListingCrawler + MONSTERS     (source in the row)
+    5etools-spells   5etools_spell_scraper.collect_5e_tools_sources        (click per row)
+    5etools-items    5etools_magic_items_scraper.collect_5e_tools_sources  (click per row)
+    augment          updating_ddb_items_with_5etools.collect_5e_tools_sources (hrefs only)
+    5etools-lookup   5etools_spell_scraper.lookup_5e_tools_sources: the last 10
+                     spells in the list, one search-box lookup each
+
+For each it reports rows, wall time, rows/s, per-row latency percentiles
+(from the trace spans: a listing row, or one 5e.tools click), more-info
+panel latency and WebDriver round-trip latency. Nothing touches the
+network, latency comes from --latency / --panel-latency, and the jitter and
+the crawl's random pauses are seeded, so two runs on one machine are
+comparable:
+
+    python stuff/scrapers/bench/e2e.py --pages 5 --output stuff/data/logs/bench-e2e.json
+    python stuff/scrapers/bench/e2e.py --only ddb-items --latency 150 --baseline stuff/data/logs/bench-e2e.json
+
+Pacing meant for the live sites is off by default (--page-delay 0 0) so the
+numbers measure the scraper, not its politeness. Needs Chrome, like the
+scrapers. Run from the repo root.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from rich.console import Console
+from rich.table import Table
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+from common import trace  # noqa: E402
+from common.commands import instrument  # noqa: E402
+from common.crawl import DEFAULT_USER_AGENT, CrawlTuning, EntitySpec, ListingCrawler, make_driver  # noqa: E402
+from common.specs import MAGIC_ITEMS, MONSTERS, SPELLS  # noqa: E402
+from common.text import norm_name  # noqa: E402
+from fakesite import FakeSite, add_site_arguments, site_config  # noqa: E402
+from scrape import load_script, script_for  # noqa: E402
+
+PERCENTILES = (0.50, 0.90, 0.95, 0.99)
+
+
+def percentiles(values: Sequence[float]) -> Dict[str, float]:
+    """p50/p90/p95/p99/max of values (ms), nearest-rank."""
+    if not values:
+        return {}
+    s = sorted(values)
+    out = {f"p{int(q * 100)}": round(s[min(len(s) - 1, int(q * len(s)))], 2) for q in PERCENTILES}
+    out["max"] = round(s[-1], 2)
+    return out
+
+
+# --- scenarios -------------------------------------------------------------
+def _listing(spec: EntitySpec) -> Callable:
+    def run(driver, site: FakeSite, args) -> Dict[str, Any]:
+        tuning = CrawlTuning(
+            page_delay_min=args.page_delay[0],
+            page_delay_max=args.page_delay[1],
+            item_delay=args.item_delay,
+            toggle_wait=args.toggle_wait,
+        )
+        rows, pages = ListingCrawler(driver, spec, tuning).run(
+            time.perf_counter(), start_url=f"{site.url}/{spec.path}"
+        )
+        return {"rows": len(rows), "pages": pages, "row_cat": "row"}
+
+    return run
+
+
+def _fiveetools(target: str, page: str, listing: str, clicks: bool = True) -> Callable:
+    def run(driver, site: FakeSite, args) -> Dict[str, Any]:
+        if target == "augment":
+            module = load_script(script_for("augment"))
+        else:
+            module = load_script(script_for(target, fiveetools=True))
+        module.FIVEETOOLS_URL = f"{site.url}/5e.tools/{page}"
+        names = {norm_name(r["NAME"]) for r in site.rows[listing]}
+        mapping = module.collect_5e_tools_sources(driver, names)
+        out: Dict[str, Any] = {"matched": len(mapping), "names": len(names)}
+        if clicks:
+            out["row_cat"] = "5etools"
+        else:
+            out["rows"] = len(mapping)
+        return out
+
+    return run
+
+
+def _lookup(count: int = 10) -> Callable:
+    def run(driver, site: FakeSite, args) -> Dict[str, Any]:
+        module = load_script(script_for("spells", fiveetools=True))
+        module.FIVEETOOLS_URL = f"{site.url}/5e.tools/spells.html"
+        # The end of the list: the walk would click every row above them
+        tail = sorted(site.rows["spells"], key=lambda r: r["NAME"].lower())[-count:]
+        names = {norm_name(r["NAME"]): r["NAME"] for r in tail}
+        mapping = module.lookup_5e_tools_sources(driver, names)
+        return {"matched": len(mapping), "names": len(names), "row_cat": "5etools"}
+
+    return run
+
+
+SCENARIOS: Dict[str, Callable] = {
+    "ddb-spells": _listing(SPELLS),
+    "ddb-items": _listing(MAGIC_ITEMS),
+    "ddb-monsters": _listing(MONSTERS),
+    "5etools-spells": _fiveetools("spells", "spells.html", "spells"),
+    "5etools-items": _fiveetools("items", "items.html", "magic-items"),
+    "augment": _fiveetools("augment", "items.html", "magic-items", clicks=False),
+    "5etools-lookup": _lookup(),
+}
+
+
+def run_scenario(name: str, driver, site: FakeSite, args) -> Dict[str, Any]:
+    """Run one scenario and summarize its spans, commands and requests."""
+    log = driver.command_log
+    n_events, n_records, n_served = len(trace.enable().events), len(log.records), len(site.served)
+    t = time.perf_counter()
+    result = SCENARIOS[name](driver, site, args)
+    wall = time.perf_counter() - t
+
+    events = trace.enable().events[n_events:]
+    row_cat = result.pop("row_cat", None)
+    row_ms = [e["dur"] / 1000 for e in events if row_cat and e["cat"] == row_cat]
+    if "rows" not in result:
+        result["rows"] = len(row_ms)
+    panel_ms = [e["dur"] / 1000 for e in events if e["cat"] == "panel"]
+    commands = [r for r in log.records[n_records:] if r[1] != "wait"]
+    served = site.served[n_served:]
+    rows = result["rows"]
+    result.update(
+        seconds=round(wall, 3),
+        rows_per_second=round(rows / wall, 3) if wall else 0.0,
+        row_ms=percentiles(row_ms),
+        panels=len(panel_ms),
+        panel_ms=percentiles(panel_ms),
+        commands=len(commands),
+        commands_per_row=round(len(commands) / rows, 2) if rows else 0.0,
+        command_ms=percentiles([r[3] * 1000 for r in commands]),
+        requests=len(served),
+        request_ms=percentiles([s * 1000 for _, s in served]),
+    )
+    return result
+
+
+# --- report ----------------------------------------------------------------
+def report(results: Dict[str, Dict[str, Any]], baseline: Optional[Dict[str, Any]], console: Console):
+    table = Table(title="End-to-end benchmark (fake site)")
+    cols = ("Scenario", "Rows", "Seconds", "Rows/s", "Row p50", "Row p95", "Row p99",
+            "Panel p95", "Cmds/row", "Cmd p95")
+    for col in cols:
+        table.add_column(col, justify="left" if col == "Scenario" else "right")
+    if baseline:
+        table.add_column("Δ rows/s", justify="right")
+    for name, r in results.items():
+        cells = [
+            name, str(r["rows"]), f"{r['seconds']:.1f}", f"{r['rows_per_second']:.2f}",
+            f"{r['row_ms'].get('p50', 0):.0f}", f"{r['row_ms'].get('p95', 0):.0f}",
+            f"{r['row_ms'].get('p99', 0):.0f}", f"{r['panel_ms'].get('p95', 0):.0f}",
+            f"{r['commands_per_row']:.1f}", f"{r['command_ms'].get('p95', 0):.1f}",
+        ]
+        if baseline:
+            old = baseline.get("scenarios", {}).get(name, {}).get("rows_per_second")
+            if old:
+                change = 100 * (r["rows_per_second"] - old) / old
+                colour = "green" if change >= 0 else "red"
+                cells.append(f"[{colour}]{change:+.1f}%[/{colour}]")
+            else:
+                cells.append("")
+        table.add_row(*cells)
+    console.print(table)
+    console.print("[dim]Latencies in ms; row = one listing row (DDB) or one 5e.tools click / lookup.[/dim]")
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="Benchmark the scrapers against a local fake site.")
+    ap.add_argument("--only", nargs="+", choices=list(SCENARIOS), metavar="SCENARIO",
+                    help="run these scenarios: " + ", ".join(SCENARIOS))
+    ap.add_argument("--output", metavar="JSON", help="write the results here")
+    ap.add_argument("--baseline", metavar="JSON", help="earlier --output to compare rows/s against")
+    ap.add_argument("--headful", action="store_true", help="show the browser window")
+    crawl = ap.add_argument_group("crawl tuning (seconds)")
+    crawl.add_argument("--page-delay", type=float, nargs=2, default=(0.0, 0.0), metavar=("MIN", "MAX"))
+    crawl.add_argument("--item-delay", type=float, default=CrawlTuning.item_delay)
+    crawl.add_argument("--toggle-wait", type=float, default=CrawlTuning.toggle_wait)
+    add_site_arguments(ap)
+    args = ap.parse_args(argv)
+
+    console = Console()
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    random.seed(args.seed)
+    site = FakeSite(site_config(args), args.data_dir)
+    url = site.start()
+    console.print(f"[dim]Fake site on {url}: {args.pages} pages x {args.rows_per_page} rows, "
+                  f"{args.latency:g}ms latency, {args.panel_latency:g}ms panels[/dim]")
+    trace.enable()
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        driver = make_driver(headless=not args.headful, user_agent=DEFAULT_USER_AGENT)
+        instrument(driver)
+        trace.attach(driver)
+        try:
+            for name in args.only or list(SCENARIOS):
+                console.print(f"\n[bold]{name}[/bold]")
+                results[name] = run_scenario(name, driver, site, args)
+        finally:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+    finally:
+        site.stop()
+
+    report(results, baseline, console)
+    if args.output:
+        d = os.path.dirname(args.output)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        doc = {"config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+               "scenarios": results}
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+        console.print(f"Results -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for D&D Beyond and 5e.tools, for offline benchmarks.
+
+Serves the markup the scrapers actually read, built from the CSVs in
+stuff/data so names, sources and stat values are realistic:
+
+    /spells?page=N, /magic-items?page=N, /monsters?page=N
+        D&D Beyond listings: `.info[data-slug]` rows, an empty more-info
+        panel after each row (filled by fetching /<path>/<id>-<slug>/more-info
+        when the row's toggle or name is clicked) and b-pagination links.
+    /5e.tools/spells.html, /5e.tools/items.html
+        5e.tools-like virtualized #list: rows are rendered in batches as the
+        list (or the window) is scrolled to the bottom; clicking a row sets
+        the #name_source hash and renders its h1.stats__h-name after a delay.
+
+Every response is delayed by --latency ms (± --jitter, deterministic per
+path) so page loads and panel fetches cost what they cost on the real
+sites; --pages and --rows-per-page size the listings.
+
+    python stuff/scrapers/bench/fakesite.py --port 8765 --latency 80 --pages 5
+    open http://127.0.0.1:8765/spells
+
+The benchmark runner (bench/e2e.py) starts the same server in-process.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import html
+import json
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+DATA_DIR = "stuff/data"
+
+# path -> (fixture CSV under DATA_DIR, listing_class, more_info_class, indicator)
+LISTINGS: Dict[str, Tuple[str, str, str, str]] = {
+    "spells": ("5etools/spells.csv", "rpgspell", "more-info-spell", "spell"),
+    "magic-items": ("magicitems-with-sources.csv", "rpgmagic-item", "more-info-magic-item", "item"),
+    "monsters": ("dndbeyond-monsters-data.csv", "rpgmonster", "more-info-monster", "monster"),
+}
+# 5e.tools page -> (listing it mirrors, list container classes)
+FIVEETOOLS_PAGES: Dict[str, Tuple[str, str]] = {
+    "spells.html": ("spells", "list list--stats spells"),
+    "items.html": ("magic-items", "list list--stats magic ele-magic"),
+}
+
+_URL_ID_SLUG_RE = re.compile(r"/(\d+)-([^/?#]+)")
+_MORE_INFO_RE = re.compile(r"^/([\w-]+)/(\d+)-([^/?#]+)/more-info$")
+
+
+@dataclass
+class SiteConfig:
+    pages: int = 3  # listing pages per entity
+    rows_per_page: int = 20
+    latency_ms: float = 50  # added to every response
+    jitter_ms: float = 10
+    panel_latency_ms: float = 80  # more-info fetch (on top of latency_ms)
+    fiveetools_batch: int = 50  # rows rendered per scroll on 5e.tools
+    fiveetools_render_ms: float = 30  # hash change -> stat block rendered; search -> rows filtered
+    seed: int = 0
+
+
+def _slug(row: Dict[str, str]) -> Tuple[str, str]:
+    m = _URL_ID_SLUG_RE.search(row.get("URL", ""))
+    if m:
+        return m.group(1), m.group(2)
+    name = re.sub(r"[^a-z0-9]+", "-", row.get("NAME", "").lower()).strip("-")
+    return row.get("ID", "0"), row.get("SLUG") or name
+
+
+def load_fixtures(data_dir: str, config: SiteConfig) -> Dict[str, List[Dict[str, str]]]:
+    """Rows per listing path, cycled (with fresh IDs) to pages * rows_per_page."""
+    want = config.pages * config.rows_per_page
+    out: Dict[str, List[Dict[str, str]]] = {}
+    for path, (name, *_rest) in LISTINGS.items():
+        with open(os.path.join(data_dir, name), encoding="utf-8") as f:
+            base = [r for r in csv.DictReader(f) if r.get("NAME")]
+        rows: List[Dict[str, str]] = []
+        for i in range(want):
+            src = dict(base[i % len(base)])
+            cycle = i // len(base)
+            id_, slug = _slug(src)
+            if cycle:
+                id_, slug = str(int(id_) + 10_000_000 * cycle), f"{slug}-{cycle}"
+                src["NAME"] = f"{src['NAME']} {cycle}"
+            src["ID"], src["SLUG"] = id_, slug
+            rows.append(src)
+        out[path] = rows
+    return out
+
+
+# --- D&D Beyond markup -----------------------------------------------------
+def _e(value) -> str:
+    return html.escape(str(value or ""), quote=True)
+
+
+def _classes_list(raw: str) -> List[str]:
+    try:
+        return [c.title() for c in json.loads(raw or "[]")]
+    except ValueError:
+        return [c.strip().title() for c in (raw or "").split(";") if c.strip()]
+
+
+def _row_html(path: str, r: Dict[str, str]) -> str:
+    id_, slug = r["ID"], r["SLUG"]
+    href = f"/{path}/{id_}-{slug}"
+    ind = LISTINGS[path][3]
+    cells = [f'<div class="row {ind}-indicator"><i class="{ind}-color">&#9656;</i></div>']
+    if path == "spells":
+        comp = r.get("COMPONENTS", "")
+        cells += [
+            f'<div class="row spell-level"><span>{_e(r.get("LEVEL"))}</span></div>',
+            f'<div class="row spell-name"><span class="name"><a class="link" href="{href}">{_e(r["NAME"])}</a></span>'
+            f'<span class="school">{_e(r.get("SCHOOL"))}</span> <span>{_e(comp)}</span></div>',
+            f'<div class="row spell-cast-time"><span>{_e(r.get("CASTING_TIME"))}</span></div>',
+            f'<div class="row spell-duration"><span>{_e(r.get("DURATION"))}</span></div>',
+            f'<div class="row spell-range"><span class="range-distance">{_e(r.get("RANGE"))}</span>'
+            + (f' <span class="aoe-size">({_e(r.get("AREA"))}<i class="i-aoe-{_e(r.get("AREA_SHAPE"))}"></i>)</span>'
+               if r.get("AREA") else "")
+            + "</div>",
+            f'<div class="row spell-attack-save"><span>{_e(r.get("ATTACK_SAVE"))}</span></div>',
+            f'<div class="row spell-damage-effect"><span>{_e(r.get("DAMAGE_EFFECT"))}</span></div>',
+        ]
+    elif path == "magic-items":
+        rarity = r.get("RARITY", "")
+        cells += [
+            f'<div class="row item-name"><a class="link" href="{href}">'
+            f'<span class="{_e(rarity.lower().replace(" ", "-"))}">{_e(r["NAME"])}</span></a>'
+            f'<span class="rarity">{_e(rarity)}</span></div>',
+            f'<div class="row item-type"><span class="type">{_e(r.get("TYPE"))}</span></div>',
+            f'<div class="row requires-attunement"><span>{_e(r.get("ATTUNEMENT") or "——")}</span></div>',
+            f'<div class="row notes"><span>{_e(r.get("NOTES"))}</span></div>',
+        ]
+    else:
+        cells += [
+            f'<div class="row monster-challenge"><span>{_e(r.get("CR"))}</span></div>',
+            f'<div class="row monster-name"><a class="link" href="{href}">{_e(r["NAME"])}</a>'
+            f'<span class="source">{_e(r.get("SOURCE"))}</span></div>',
+            f'<div class="row monster-type"><span class="type">{_e(r.get("TYPE"))}</span></div>',
+            f'<div class="row monster-size"><span>{_e(r.get("SIZE"))}</span></div>',
+            f'<div class="row monster-alignment"><span>{_e(r.get("ALIGNMENT"))}</span></div>',
+            f'<div class="row monster-environment"><span title="{_e(r.get("HABITAT"))}">'
+            f'{_e(r.get("HABITAT"))}</span></div>',
+        ]
+    panel = LISTINGS[path][2]
+    return (
+        f'<li><div class="info" data-slug="{id_}-{_e(slug)}">{"".join(cells)}</div>'
+        f'<div class="more-info {panel} {panel}-{id_}-{_e(slug)}" data-src="{href}/more-info"></div></li>'
+    )
+
+
+def _panel_html(path: str, r: Dict[str, str]) -> str:
+    source = f'<p class="more-info-footer-source">{_e(r.get("SOURCE"))}</p>'
+    if path != "spells":
+        return f'<div class="more-info-content"><div class="more-info-body-description"><p></p></div>{source}</div>'
+    stats = "".join(
+        f'<div class="ddb-statblock-item"><div class="ddb-statblock-item-label">{label}</div>'
+        f'<div class="ddb-statblock-item-value">{_e(r.get(key))}</div></div>'
+        for label, key in (
+            ("Level", "LEVEL"), ("Casting Time", "CASTING_TIME"), ("Components", "COMPONENTS"),
+            ("Duration", "DURATION"), ("School", "SCHOOL"), ("Attack/Save", "ATTACK_SAVE"),
+            ("Damage/Effect", "DAMAGE_EFFECT"),
+        )
+    )
+    area = r.get("AREA")
+    rng = _e(r.get("RANGE")) + (
+        f' <span class="aoe-size">({_e(area)}<i class="i-aoe-{_e(r.get("AREA_SHAPE"))}"></i>)</span>'
+        if area else ""
+    )
+    stats += (
+        '<div class="ddb-statblock-item"><div class="ddb-statblock-item-label">Range/Area</div>'
+        f'<div class="ddb-statblock-item-value">{rng}</div></div>'
+    )
+    tags = "".join(f'<span class="tag">{_e(c)}</span>' for c in _classes_list(r.get("CLASSES", "")))
+    blurb = (
+        f'<div class="components-blurb">* - ({_e(r.get("MATERIAL_COMPONENTS"))})</div>'
+        if r.get("MATERIAL_COMPONENTS") else ""
+    )
+    return (
+        f'<div class="more-info-content"><div class="ddb-statblock">{stats}</div>'
+        f'<div class="more-info-body-description"><p>{_e(r["NAME"])} description.</p></div>{blurb}'
+        f'<div class="more-info-footer-classes">{tags}</div>{source}</div>'
+    )
+
+
+_LISTING_JS = """
+document.addEventListener('click', function (e) {
+  var t = e.target.closest('.info [class$="-indicator"], .info a.link');
+  if (!t) return;
+  e.preventDefault();
+  var panel = t.closest('li').querySelector('.more-info');
+  if (panel.dataset.state) return;
+  panel.dataset.state = 'loading';
+  fetch(panel.dataset.src).then(function (r) { return r.text(); }).then(function (h) {
+    panel.innerHTML = h;
+    panel.dataset.state = 'ready';
+  });
+});
+"""
+
+
+def listing_page(path: str, rows: List[Dict[str, str]], page: int, pages: int) -> str:
+    listing_class = LISTINGS[path][1]
+    links = "".join(f'<li><a href="/{path}?page={n}">{n}</a></li>' for n in range(1, pages + 1))
+    if page < pages:
+        links += f'<li class="b-pagination-item-next"><a rel="next" href="/{path}?page={page + 1}">Next</a></li>'
+    body = "".join(_row_html(path, r) for r in rows)
+    return (
+        f"<!doctype html><html><head><title>{path} page {page}</title></head><body>"
+        f'<div class="listing-body"><ul class="listing listing-{listing_class}">{body}</ul></div>'
+        f'<div class="b-pagination"><ul class="b-pagination-list">{links}</ul></div>'
+        f"<script>{_LISTING_JS}</script></body></html>"
+    )
+
+
+# --- 5e.tools markup -------------------------------------------------------
+_FIVEETOOLS_JS = """
+var list = document.getElementById('list');
+var content = document.getElementById('pagecontent');
+var search = document.getElementById('lst__search');
+var view = ROWS, rendered = 0, query = '';
+function renderMore() {
+  var end = Math.min(view.length, rendered + BATCH);
+  var frag = document.createDocumentFragment();
+  for (; rendered < end; rendered++) {
+    var r = view[rendered];
+    var row = document.createElement('div');
+    row.className = 'lst__row';
+    row.innerHTML = '<a class="lst__row-inner" href="#' + encodeURIComponent(r[2]) + '"><span class="bold ve-col-3-5"></span>'
+      + '<span class="ve-col-2 ve-text-center">' + r[1].toUpperCase() + '</span></a>';
+    row.firstChild.firstChild.textContent = r[0];
+    frag.appendChild(row);
+  }
+  list.appendChild(frag);
+}
+function nearBottom() {
+  return list.scrollTop + list.clientHeight >= list.scrollHeight - 20
+    || window.innerHeight + window.scrollY >= document.body.scrollHeight - 20;
+}
+setTimeout(function () {
+  renderMore();
+  setInterval(function () { if (rendered < view.length && nearBottom()) renderMore(); }, 50);
+}, INITIAL_MS);
+// The list search box: re-render only the rows whose name contains the query
+function filter() {
+  var q = search.value.trim().toLowerCase();
+  if (q === query) return;
+  query = q;
+  setTimeout(function () {
+    if (query !== q) return;
+    view = q ? ROWS.filter(function (r) { return r[0].toLowerCase().indexOf(q) >= 0; }) : ROWS;
+    list.innerHTML = '';
+    rendered = 0;
+    renderMore();
+  }, RENDER_MS);
+}
+search.addEventListener('input', filter);
+search.addEventListener('keyup', filter);
+window.addEventListener('hashchange', function () {
+  var hash = decodeURIComponent(location.hash.slice(1));
+  content.innerHTML = '';
+  setTimeout(function () {
+    var r = BY_HASH[hash];
+    if (!r || decodeURIComponent(location.hash.slice(1)) !== hash) return;
+    var h = document.createElement('h1');
+    h.className = 'stats__h-name';
+    h.textContent = r[0];
+    content.appendChild(h);
+  }, RENDER_MS);
+});
+"""
+
+
+def fiveetools_page(page: str, rows: List[Dict[str, str]], config: SiteConfig) -> str:
+    _, list_class = FIVEETOOLS_PAGES[page]
+    entries = []
+    for r in sorted(rows, key=lambda r: r["NAME"].lower()):
+        src = (r.get("SOURCE_SHORT") or "phb").lower()
+        entries.append([r["NAME"], src, f"{r['NAME'].lower()}_{src}"])
+    data = json.dumps(entries).replace("</", "<\\/")
+    by_hash = "var BY_HASH = {}; ROWS.forEach(function (r) { BY_HASH[r[2]] = r; });"
+    return (
+        f"<!doctype html><html><head><title>5e.tools {page}</title></head><body>"
+        f'<input id="lst__search" class="search lst__search" type="search">'
+        f'<div id="list" class="{list_class}" style="height:600px;overflow-y:auto"></div>'
+        f'<div id="pagecontent"></div>'
+        f"<script>var ROWS = {data}; {by_hash} var BATCH = {int(config.fiveetools_batch)};"
+        f" var INITIAL_MS = {int(config.latency_ms)}; var RENDER_MS = {int(config.fiveetools_render_ms)};"
+        f"{_FIVEETOOLS_JS}</script></body></html>"
+    )
+
+
+# --- server ----------------------------------------------------------------
+class FakeSite:
+    """Threaded HTTP server for the fake D&D Beyond / 5e.tools pages."""
+
+    def __init__(self, config: Optional[SiteConfig] = None, data_dir: str = DATA_DIR):
+        self.config = config or SiteConfig()
+        self.rows = load_fixtures(data_dir, self.config)
+        self.by_id = {
+            path: {(r["ID"], r["SLUG"]): r for r in rows} for path, rows in self.rows.items()
+        }
+        # (path, seconds) per response, for server-side stats
+        self.served: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def delay(self, path: str, extra_ms: float = 0.0) -> float:
+        """Response delay in seconds; the jitter is fixed per (seed, path) so runs repeat."""
+        c = self.config
+        jitter = random.Random(f"{c.seed}:{path}").uniform(-c.jitter_ms, c.jitter_ms)
+        return max(0.0, c.latency_ms + extra_ms + jitter) / 1000
+
+    def render(self, raw_path: str) -> Tuple[int, str, float]:
+        """(status, html, delay) for a request path."""
+        parts = urlsplit(raw_path)
+        path = parts.path.rstrip("/") or "/"
+        c = self.config
+        name = path.strip("/")
+        if name in LISTINGS:
+            try:
+                page = int(parse_qs(parts.query).get("page", ["1"])[0])
+            except ValueError:
+                page = 1
+            page = max(1, min(page, c.pages))
+            rows = self.rows[name][(page - 1) * c.rows_per_page: page * c.rows_per_page]
+            return 200, listing_page(name, rows, page, c.pages), self.delay(raw_path)
+        m = _MORE_INFO_RE.match(path)
+        if m and m.group(1) in LISTINGS:
+            row = self.by_id[m.group(1)].get((m.group(2), m.group(3)))
+            if row is not None:
+                return 200, _panel_html(m.group(1), row), self.delay(raw_path, c.panel_latency_ms)
+        if path.startswith("/5e.tools/") and path[len("/5e.tools/"):] in FIVEETOOLS_PAGES:
+            page = path[len("/5e.tools/"):]
+            rows = self.rows[FIVEETOOLS_PAGES[page][0]]
+            return 200, fiveetools_page(page, rows, c), self.delay(raw_path)
+        return 404, "not found", 0.0
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve in a daemon thread; returns the base URL."""
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                t = time.perf_counter()
+                status, body, delay = site.render(self.path)
+                if delay:
+                    time.sleep(delay)
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(data)
+                with site._lock:
+                    site.served.append((urlsplit(self.path).path, time.perf_counter() - t))
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="fakesite", daemon=True).start()
+        return self.url
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+def add_site_arguments(ap: argparse.ArgumentParser):
+    """--pages, --latency, ... (shared with bench/e2e.py)."""
+    d = SiteConfig()
+    g = ap.add_argument_group("fake site")
+    g.add_argument("--pages", type=int, default=d.pages, help=f"listing pages (default: {d.pages})")
+    g.add_argument("--rows-per-page", type=int, default=d.rows_per_page,
+                   help=f"(default: {d.rows_per_page})")
+    g.add_argument("--latency", type=float, default=d.latency_ms, metavar="MS",
+                   help=f"added to every response (default: {d.latency_ms:g})")
+    g.add_argument("--jitter", type=float, default=d.jitter_ms, metavar="MS",
+                   help=f"± per path, repeatable across runs (default: {d.jitter_ms:g})")
+    g.add_argument("--panel-latency", type=float, default=d.panel_latency_ms, metavar="MS",
+                   help=f"extra delay of a more-info fetch (default: {d.panel_latency_ms:g})")
+    g.add_argument("--batch", type=int, default=d.fiveetools_batch,
+                   help=f"5e.tools rows rendered per scroll (default: {d.fiveetools_batch})")
+    g.add_argument("--render", type=float, default=d.fiveetools_render_ms, metavar="MS",
+                   help=f"5e.tools stat block render delay (default: {d.fiveetools_render_ms:g})")
+    g.add_argument("--seed", type=int, default=d.seed)
+    g.add_argument("--data-dir", default=DATA_DIR, help=f"fixture CSVs (default: {DATA_DIR})")
+
+
+def site_config(args: argparse.Namespace) -> SiteConfig:
+    return SiteConfig(
+        pages=args.pages,
+        rows_per_page=args.rows_per_page,
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        panel_latency_ms=args.panel_latency,
+        fiveetools_batch=args.batch,
+        fiveetools_render_ms=args.render,
+        seed=args.seed,
+    )
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve fake D&D Beyond / 5e.tools pages.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    add_site_arguments(ap)
+    args = ap.parse_args()
+    site = FakeSite(site_config(args), args.data_dir)
+    url = site.start(args.host, args.port)
+    print(f"Serving on {url}  (/spells, /magic-items, /monsters, /5e.tools/spells.html, /5e.tools/items.html)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        site.stop()
+
+
+if __name__ == "__main__":
+    main()
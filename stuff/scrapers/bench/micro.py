@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the pure parsing helpers (common/text.py) on real data.
+
+Every listing row goes through these helpers (range/area parsing, material
+text, components, school, name normalization, 5e.tools fragments and the
+CLASSES / SLUG post-processing in the 5e.tools scripts), so they are timed
+over the values in the stuff/data CSVs, repeated up to --values inputs
+per case.
+
+Times are also divided by a calibration loop (str.lower over the
+fixture names, run alternately with each case), so the committed baselines (bench/baselines.json) carry over
+between machines roughly; a case fails when its calibrated time is more
+than --threshold times its baseline:
+
+    python stuff/scrapers/bench/micro.py                  # compare with the baselines
+    python stuff/scrapers/bench/micro.py --only norm_name clean
+    python stuff/scrapers/bench/micro.py --record         # after an intended change
+
+Exit status is 1 when a case regressed. Run from the repo root.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from rich.console import Console
+from rich.table import Table
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+from common.text import (  # noqa: E402
+    classes_json,
+    clean,
+    clean_material_text,
+    clean_school,
+    components_from_text,
+    is_dash_placeholder,
+    norm_name,
+    order_classes,
+    parse_id_slug,
+    parse_range_area,
+    rarity_from_class,
+    school_from_name_span,
+    source_short_from_fragment,
+)
+
+DATA_DIR = "stuff/data"
+BASELINES = os.path.join(HERE, "baselines.json")
+DEFAULT_VALUES = 50_000
+DEFAULT_REPEAT = 7
+DEFAULT_THRESHOLD = 1.5
+
+
+class Case(NamedTuple):
+    name: str
+    func: Callable
+    inputs: Callable[["Fixtures"], List[tuple]]  # argument tuples
+
+
+class Fixtures:
+    """Rows of the stuff/data CSVs, grouped by entity."""
+
+    def __init__(self, data_dir: str = DATA_DIR):
+        self.spells: List[Dict[str, str]] = []
+        self.items: List[Dict[str, str]] = []
+        self.all: List[Dict[str, str]] = []
+        for path in sorted(glob.glob(os.path.join(data_dir, "**", "*.csv"), recursive=True)):
+            with open(path, encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+            self.all += rows
+            if rows and "CASTING_TIME" in rows[0]:
+                self.spells += rows
+            elif rows and "RARITY" in rows[0]:
+                self.items += rows
+
+    def column(self, rows: List[Dict[str, str]], key: str) -> List[str]:
+        return [r[key] for r in rows if r.get(key)]
+
+
+def _url_path(url: str) -> str:
+    parts = url.split("/")
+    return parts[-2] if len(parts) > 2 else ""
+
+
+def _class_list(raw: str) -> List[str]:
+    try:
+        return list(json.loads(raw))
+    except ValueError:
+        return [p.strip() for p in raw.split(";") if p.strip()]
+
+
+def spell_postprocess(row: Dict[str, str]) -> Dict[str, str]:
+    """The per-row Phase 3 work of 5etools_spell_scraper.main() (on a copy)."""
+    row = dict(row)
+    row["CLASSES"] = classes_json(row.get("CLASSES"))
+    row["NAME_LOWER"] = (row.get("NAME") or "").lower()
+    row["KEY"] = norm_name(row.get("NAME", ""))
+    if not row.get("SLUG"):
+        row["SLUG"] = parse_id_slug("", row.get("URL", ""), "spells")[1] or ""
+    return row
+
+
+def _spell_rows(fx: Fixtures) -> List[tuple]:
+    out = []
+    for r in fx.spells:
+        row = {k: r.get(k, "") for k in ("NAME", "URL")}
+        row["CLASSES"] = "; ".join(_class_list(r.get("CLASSES") or "[]"))
+        out.append((row,))
+    return out
+
+
+CASES: List[Case] = [
+    Case("clean", clean, lambda fx: [(v,) for r in fx.all for v in r.values() if v]),
+    Case("norm_name", norm_name, lambda fx: [(v,) for v in fx.column(fx.all, "NAME")]),
+    Case("parse_id_slug", parse_id_slug,
+         lambda fx: [("", u, _url_path(u)) for u in fx.column(fx.all, "URL")]),
+    Case("parse_range_area", parse_range_area, lambda fx: [
+        (f"{r['RANGE']} ({r['AREA']})" if r.get("AREA") else r["RANGE"],) for r in fx.spells
+    ]),
+    Case("components_from_text", components_from_text, lambda fx: [
+        (f"{r['NAME']} {r['SCHOOL']} • {r['COMPONENTS']}",) for r in fx.spells
+    ]),
+    Case("clean_material_text", clean_material_text,
+         lambda fx: [(f"* - ({v})",) for v in fx.column(fx.spells, "MATERIAL_COMPONENTS")]),
+    Case("school_from_name_span", school_from_name_span,
+         lambda fx: [(f"{r['SCHOOL']} • {r['COMPONENTS']}",) for r in fx.spells]),
+    Case("clean_school", clean_school,
+         lambda fx: [(f"{r['SCHOOL']} • {r['COMPONENTS']}",) for r in fx.spells]),
+    Case("order_classes", order_classes,
+         lambda fx: [(_class_list(v),) for v in fx.column(fx.spells, "CLASSES")]),
+    Case("classes_json", classes_json,
+         lambda fx: [("; ".join(_class_list(v)),) for v in fx.column(fx.spells, "CLASSES")]),
+    Case("source_short_from_fragment", source_short_from_fragment, lambda fx: [
+        (f"{r['NAME'].lower()}_{r['SOURCE_SHORT']}" + (",st:1" if i % 3 == 0 else ""),)
+        for i, r in enumerate(fx.all) if r.get("SOURCE_SHORT")
+    ]),
+    Case("rarity_from_class", rarity_from_class,
+         lambda fx: [(v.lower().replace(" ", "-"),) for v in fx.column(fx.items, "RARITY")]),
+    Case("is_dash_placeholder", is_dash_placeholder,
+         lambda fx: [(r.get("ATTUNEMENT") or "——",) for r in fx.items]),
+    Case("spell_postprocess", spell_postprocess, _spell_rows),
+]
+
+
+def _scale(inputs: List[tuple], n: int) -> List[tuple]:
+    if not inputs:
+        return []
+    return [inputs[i % len(inputs)] for i in range(n)]
+
+
+def time_case(func: Callable, inputs: List[tuple], repeat: int, yardstick: List[tuple]) -> tuple:
+    """Best-of-repeat ns per call for func and for str.lower over yardstick.
+
+    The two loops alternate so both see the same machine load; their ratio
+    is what the baselines keep.
+    """
+    best = best_ref = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter_ns()
+        for args in yardstick:
+            str.lower(*args)
+        best_ref = min(best_ref, time.perf_counter_ns() - t)
+        t = time.perf_counter_ns()
+        for args in inputs:
+            func(*args)
+        best = min(best, time.perf_counter_ns() - t)
+    return best / len(inputs), best_ref / len(yardstick)
+
+
+def run(
+    cases: Sequence[Case], fx: Fixtures, n: int = DEFAULT_VALUES, repeat: int = DEFAULT_REPEAT
+) -> Dict[str, Dict[str, float]]:
+    # str.lower() on the fixture names is the machine's yardstick
+    yardstick = _scale([(v,) for v in fx.column(fx.all, "NAME")], n)
+    results: Dict[str, Dict[str, float]] = {}
+    refs: List[float] = []
+    for case in cases:
+        inputs = _scale(case.inputs(fx), n)
+        if not inputs:
+            continue
+        ns, ref = time_case(case.func, inputs, repeat, yardstick)
+        refs.append(ref)
+        results[case.name] = {"ns": round(ns, 1), "relative": round(ns / ref, 3)}
+    results["_calibration"] = {"ns": round(min(refs, default=0.0), 1), "relative": 1.0}
+    return results
+
+
+def report(
+    results: Dict[str, Dict[str, float]],
+    baselines: Optional[Dict[str, Dict[str, float]]],
+    threshold: float,
+    console: Console,
+) -> List[str]:
+    """Print the table; return the names of regressed cases."""
+    table = Table(title="Parsing helper microbenchmarks")
+    for col in ("Case", "ns/call", "x calib", "Baseline", "Ratio", ""):
+        table.add_column(col, justify="left" if col == "Case" else "right", no_wrap=True)
+    regressed: List[str] = []
+    for name, r in results.items():
+        if name.startswith("_"):
+            continue
+        base = (baselines or {}).get(name)
+        if base:
+            ratio = r["relative"] / base["relative"]
+            bad = ratio > threshold
+            status = "[red]REGRESSED[/red]" if bad else ("[green]faster[/green]" if ratio < 1 / threshold else "ok")
+            if bad:
+                regressed.append(name)
+            cells = [f"{base['relative']:.2f}", f"{ratio:.2f}", status]
+        else:
+            cells = ["", "", "[dim]new[/dim]"]
+        table.add_row(name, f"{r['ns']:.0f}", f"{r['relative']:.2f}", *cells)
+    console.print(table)
+    console.print(f"[dim]Calibration: {results['_calibration']['ns']:.0f} ns per str.lower(); "
+                  f"fail above {threshold:g}x baseline.[/dim]")
+    return regressed
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="Microbenchmark the parsing helpers on stuff/data.")
+    ap.add_argument("--only", nargs="+", metavar="CASE", choices=[c.name for c in CASES],
+                    help="run these cases: " + ", ".join(c.name for c in CASES))
+    ap.add_argument("--values", type=int, default=DEFAULT_VALUES,
+                    help=f"inputs per case (default: {DEFAULT_VALUES})")
+    ap.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="best of N runs")
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                    help=f"allowed slowdown vs baseline (default: {DEFAULT_THRESHOLD})")
+    ap.add_argument("--baselines", default=BASELINES, help="baseline JSON (default: bench/baselines.json)")
+    ap.add_argument("--record", action="store_true", help="write the results as the new baselines")
+    ap.add_argument("--data-dir", default=DATA_DIR)
+    args = ap.parse_args(argv)
+
+    console = Console()
+    fx = Fixtures(args.data_dir)
+    cases = [c for c in CASES if not args.only or c.name in args.only]
+    results = run(cases, fx, args.values, args.repeat)
+
+    baselines = None
+    if os.path.exists(args.baselines):
+        with open(args.baselines, encoding="utf-8") as f:
+            baselines = json.load(f)
+    regressed = report(results, baselines, args.threshold, console)
+
+    if args.record:
+        merged = dict(baselines or {})
+        merged.update(results)
+        with open(args.baselines, "w", encoding="utf-8") as f:
+            json.dump(merged, f, indent=2, sort_keys=True)
+            f.write("\n")
+        console.print(f"Baselines -> {args.baselines}")
+    elif regressed:
+        console.print(f"[red]Regressed: {', '.join(regressed)}[/red]")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""
+Shared helpers for the D&D Beyond / 5e.tools scrapers.
+
+The scraper scripts live in sibling folders (dndbeyond/, 5etools/,
+appending_data/) and are run directly, e.g.
+
+    python stuff/scrapers/dndbeyond/dndbeyond_spell_scraper.py
+
+Each script puts stuff/scrapers on sys.path so `import common...` works
+without installing anything.
+"""
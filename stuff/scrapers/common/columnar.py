@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Typed columnar (Parquet / Arrow IPC) export for scraped datasets.
+
+The CSVs keep everything as strings, so every consumer re-parses LEVEL
+("8th"), CR ("1/4") and the CLASSES JSON-in-CSV. This module writes the same
+rows as typed columns next to the CSV:
+
+ - ID                  -> int64
+ - LEVEL               -> int8 ("Cantrip" -> 0, "8th" -> 8)
+ - CR                  -> float32 ("1/4" -> 0.25)
+ - CLASSES             -> list<dictionary<string>>
+ - NAME, SLUG, URL ... -> plain string (high cardinality)
+ - everything else     -> dictionary-encoded string (SOURCE, SCHOOL, TYPE, ...)
+
+Empty values become nulls.
+
+Usage from a scraper:
+    write_columnar(rows, "stuff/data/x-data.csv", header, ("parquet",))
+    -> writes stuff/data/x-data.parquet
+
+Or convert an existing CSV:
+    python stuff/scrapers/common/columnar.py stuff/data/dndbeyond-monsters-data.csv
+
+Requires: pyarrow (only when a columnar format is requested)
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+FORMAT_EXTENSIONS = {
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+
+INT_COLUMNS = {"ID"}
+LIST_COLUMNS = {"CLASSES"}
+# Mostly-unique text; dictionary encoding would only add overhead
+PLAIN_COLUMNS = {
+    "NAME",
+    "NAME_LOWER",
+    "SLUG",
+    "URL",
+    "DESCRIPTION",
+    "MATERIAL_COMPONENTS",
+}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError(
+            "Columnar export needs pyarrow (pip install pyarrow)."
+        ) from e
+
+
+_LEADING_INT_RE = re.compile(r"^(\d+)")
+
+
+def parse_level(text: Optional[str]) -> Optional[int]:
+    """'Cantrip' -> 0, '8th' -> 8, '' -> None."""
+    t = (text or "").strip().lower()
+    if not t:
+        return None
+    if "cantrip" in t:
+        return 0
+    m = _LEADING_INT_RE.match(t)
+    return int(m.group(1)) if m else None
+
+
+def parse_cr(text: Optional[str]) -> Optional[float]:
+    """'1/4' -> 0.25, '8' -> 8.0, '' / '—' -> None."""
+    t = (text or "").strip()
+    if not t:
+        return None
+    if "/" in t:
+        a, _, b = t.partition("/")
+        try:
+            d = float(b)
+            return float(a) / d if d else None
+        except ValueError:
+            return None
+    try:
+        return float(t)
+    except ValueError:
+        return None
+
+
+def parse_classes(value: Any) -> Optional[List[str]]:
+    """Accept a list, a JSON array string, or the '; '-joined listing text."""
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value if v]
+    t = str(value).strip()
+    if not t:
+        return None
+    if t.startswith("["):
+        try:
+            parsed = json.loads(t)
+            if isinstance(parsed, list):
+                return [str(v) for v in parsed if v]
+        except ValueError:
+            pass
+    return [p.strip() for p in t.split(";") if p.strip()]
+
+
+def _parse_int(text: Any) -> Optional[int]:
+    try:
+        return int(str(text).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def _nullable(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    s = str(value)
+    return s if s else None
+
+
+def build_table(rows: Iterable[Mapping[str, Any]], columns: Sequence[str]):
+    """Build a typed pyarrow.Table from row mappings, in `columns` order."""
+    _require_pyarrow()
+    import pyarrow as pa
+
+    rows = list(rows)
+    arrays = []
+    fields = []
+    for col in columns:
+        values = [r.get(col) for r in rows]
+        if col in INT_COLUMNS:
+            arr = pa.array([_parse_int(v) for v in values], type=pa.int64())
+        elif col == "LEVEL":
+            arr = pa.array([parse_level(v) for v in values], type=pa.int8())
+        elif col == "CR":
+            arr = pa.array([parse_cr(v) for v in values], type=pa.float32())
+        elif col in LIST_COLUMNS:
+            arr = pa.array(
+                [parse_classes(v) for v in values], type=pa.list_(pa.string())
+            )
+            # dictionary-encode the list values (a handful of class names)
+            arr = pa.ListArray.from_arrays(
+                arr.offsets, arr.flatten().dictionary_encode(), mask=arr.is_null()
+            )
+        elif col in PLAIN_COLUMNS:
+            arr = pa.array([_nullable(v) for v in values], type=pa.string())
+        else:
+            arr = pa.array(
+                [_nullable(v) for v in values], type=pa.string()
+            ).dictionary_encode()
+        arrays.append(arr)
+        fields.append(pa.field(col, arr.type))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def columnar_path(csv_path: str, fmt: str) -> str:
+    """stuff/data/x-data.csv + 'parquet' -> stuff/data/x-data.parquet"""
+    if fmt not in FORMAT_EXTENSIONS:
+        raise ValueError(f"Unknown columnar format: {fmt!r}")
+    return os.path.splitext(csv_path)[0] + FORMAT_EXTENSIONS[fmt]
+
+
+def write_columnar(
+    rows: Iterable[Mapping[str, Any]],
+    csv_path: str,
+    columns: Sequence[str],
+    formats: Sequence[str] = ("parquet",),
+) -> List[str]:
+    """Write rows as typed columnar files next to csv_path. Returns paths written."""
+    if not formats:
+        return []
+    _require_pyarrow()
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    table = build_table(rows, columns)
+    written: List[str] = []
+    for fmt in formats:
+        path = columnar_path(csv_path, fmt)
+        if fmt == "parquet":
+            pq.write_table(table, path, compression="zstd", use_dictionary=True)
+        else:
+            feather.write_feather(table, path, compression="zstd")
+        written.append(path)
+    return written
+
+
+def read_csv_rows(path: str) -> Tuple[List[Dict[str, str]], List[str]]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        return list(reader), list(reader.fieldnames or [])
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="Convert scraped CSVs to Parquet/Arrow.")
+    ap.add_argument("csv", nargs="+", help="input CSV file(s)")
+    ap.add_argument(
+        "--format",
+        dest="formats",
+        action="append",
+        choices=sorted(FORMAT_EXTENSIONS),
+        help="output format (repeatable, default: parquet)",
+    )
+    args = ap.parse_args(argv)
+    formats = args.formats or ["parquet"]
+    for path in args.csv:
+        rows, header = read_csv_rows(path)
+        for out in write_columnar(rows, path, header, formats):
+            print(f"{path} -> {out} ({len(rows)} rows)")
+
+
+if __name__ == "__main__":
+    main()
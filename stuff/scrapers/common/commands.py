@@ -0,0 +1,225 @@
+"""
+WebDriver command latency instrumentation.
+
+instrument(driver) wraps driver.command_executor.execute, which every
+WebDriver and WebElement call ends up in, and records each round-trip:
+
+ - command  the wire command ("findElements", "executeScript", ...)
+ - api      the selenium method the scraper called (find_element,
+            get_attribute, text, click, execute_script, ...)
+ - origin   the scraper function that made the call (parse_spell,
+            ensure_more_info, _source_from_more, ...)
+ - duration and the listing row it belongs to
+
+Event-driven waits (common/waits.py) are recorded under api "wait", with
+the scraper function that waited as their origin, so time spent waiting for
+a panel shows up next to the commands, but is not counted as one of the
+row's commands.
+
+ListingCrawler marks row boundaries (CommandLog.start_row) when the driver
+carries a log, so the report can say how many round-trips one spell costs:
+
+    log = instrument(driver)
+    rows, pages = ListingCrawler(driver, SPELLS).run(time.perf_counter())
+    log.report(Console())
+    log.write("stuff/data/logs/spells-commands.json")
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Sequence
+
+from rich.console import Console
+from rich.table import Table
+import selenium
+
+# Latency histogram bucket upper bounds, in milliseconds
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+_SELENIUM_DIR = os.path.dirname(os.path.dirname(os.path.abspath(selenium.__file__)))
+_SELENIUM_DIR = os.path.join(_SELENIUM_DIR, "selenium") + os.sep
+_HERE = os.path.dirname(os.path.abspath(__file__))
+# Commands issued from common/waits.py are waits (api "wait")
+_WAITS = os.path.join(_HERE, "waits.py")
+# Wrappers around the executor (this module, common/trace.py, common/waits.py) are not callers
+_WRAPPERS = {
+    os.path.abspath(__file__),
+    os.path.join(_HERE, "trace.py"),
+    _WAITS,
+}
+# Selenium plumbing that sits between the scraper's call and the wire
+_PLUMBING = {"execute", "_execute", "__getattribute__", "wrapper"}
+
+
+def _percentile(values: Sequence[float], q: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    return s[min(len(s) - 1, int(q * len(s)))]
+
+
+def _histogram(durations_ms: Sequence[float]) -> Dict[str, int]:
+    counts = Counter()
+    for d in durations_ms:
+        for b in BUCKETS_MS:
+            if d <= b:
+                counts[f"<={b}ms"] += 1
+                break
+        else:
+            counts[f">{BUCKETS_MS[-1]}ms"] += 1
+    labels = [f"<={b}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+    return {label: counts[label] for label in labels}
+
+
+def _caller(frame) -> tuple:
+    """(api, origin) for a command issued below frame."""
+    api = ""
+    while frame is not None:
+        path = frame.f_code.co_filename
+        if path.startswith(_SELENIUM_DIR):
+            name = frame.f_code.co_name
+            if name not in _PLUMBING and not name.startswith("<"):
+                api = name
+        else:
+            path = os.path.abspath(path)
+            if path == _WAITS:
+                api = "wait"
+            elif path not in _WRAPPERS:
+                return api or "?", frame.f_code.co_name
+        frame = frame.f_back
+    return api or "?", "?"
+
+
+class CommandLog:
+    """Per-command records for one driver, grouped into listing rows."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # (command, api, origin, duration_s, row) per round-trip
+        self.records: List[tuple] = []
+        self.row: Optional[int] = None
+        self.rows = 0
+
+    def start_row(self):
+        """Attribute the following commands to a new listing row."""
+        self.row = self.rows
+        self.rows += 1
+
+    def end_rows(self):
+        """Commands after this (pagination, 5e.tools) are outside any row."""
+        self.row = None
+
+    def record(self, command: str, api: str, origin: str, duration: float):
+        self.records.append((command, api, origin, duration, self.row))
+
+    # -- summaries -------------------------------------------------------------
+    def per_row_counts(self) -> List[int]:
+        counts = [0] * self.rows
+        for rec in self.records:
+            if rec[4] is not None and rec[1] != "wait":
+                counts[rec[4]] += 1
+        return counts
+
+    def _group(self, index: int) -> Dict[str, Dict[str, Any]]:
+        groups: Dict[str, List[float]] = defaultdict(list)
+        in_rows: Counter = Counter()
+        for rec in self.records:
+            groups[rec[index]].append(rec[3] * 1000)
+            if rec[4] is not None:
+                in_rows[rec[index]] += 1
+        out = {}
+        for key, ms in sorted(groups.items(), key=lambda kv: -sum(kv[1])):
+            out[key] = {
+                "count": len(ms),
+                "per_row": in_rows[key] / self.rows if self.rows else 0.0,
+                "total_s": round(sum(ms) / 1000, 3),
+                "p50_ms": round(_percentile(ms, 0.50), 2),
+                "p95_ms": round(_percentile(ms, 0.95), 2),
+                "max_ms": round(max(ms), 2),
+                "histogram": _histogram(ms),
+            }
+        return out
+
+    def summary(self) -> Dict[str, Any]:
+        wall = time.perf_counter() - self.started
+        commands = [r for r in self.records if r[1] != "wait"]
+        per_row = self.per_row_counts()
+        row_time: Dict[int, float] = defaultdict(float)
+        for rec in commands:
+            if rec[4] is not None:
+                row_time[rec[4]] += rec[3]
+        return {
+            "wall_s": round(wall, 3),
+            "commands": len(commands),
+            "command_s": round(sum(r[3] for r in commands), 3),
+            "rows": self.rows,
+            "per_row": {
+                "mean": round(sum(per_row) / len(per_row), 2) if per_row else 0.0,
+                "p50": _percentile(per_row, 0.50),
+                "p95": _percentile(per_row, 0.95),
+                "max": max(per_row, default=0),
+                "mean_ms": round(1000 * sum(row_time.values()) / self.rows, 2) if self.rows else 0.0,
+                "histogram": dict(sorted(Counter(per_row).items())),
+            },
+            "histogram": _histogram([r[3] * 1000 for r in commands]),
+            "by_api": self._group(1),
+            "by_origin": self._group(2),
+            "by_command": self._group(0),
+        }
+
+    def report(self, console: Optional[Console] = None):
+        """Print per-row counts and the slowest APIs / origins."""
+        console = console or Console()
+        s = self.summary()
+        pr = s["per_row"]
+        share = 100 * s["command_s"] / s["wall_s"] if s["wall_s"] else 0.0
+        console.print(
+            f"[bold]WebDriver commands:[/bold] {s['commands']} in {s['command_s']:.1f}s "
+            f"({share:.0f}% of {s['wall_s']:.1f}s wall), {s['rows']} rows: "
+            f"{pr['mean']} per row (p50 {pr['p50']}, p95 {pr['p95']}, max {pr['max']}), "
+            f"{pr['mean_ms']:.0f}ms per row"
+        )
+        for title, key in (("By API", "by_api"), ("By origin", "by_origin")):
+            table = Table(title=title)
+            for col in (title.split()[-1].title(), "Count", "Per row", "Total s", "p50 ms", "p95 ms", "Max ms"):
+                table.add_column(col, justify="left" if col in ("Api", "Origin") else "right")
+            for name, g in list(s[key].items())[:15]:
+                table.add_row(
+                    name, str(g["count"]), f"{g['per_row']:.2f}", f"{g['total_s']:.2f}",
+                    f"{g['p50_ms']:.1f}", f"{g['p95_ms']:.1f}", f"{g['max_ms']:.1f}",
+                )
+            console.print(table)
+        hist = "  ".join(f"{k}:{v}" for k, v in s["histogram"].items() if v)
+        console.print(f"[dim]Latency histogram: {hist}[/dim]")
+
+    def write(self, path: str) -> str:
+        """Write the summary as JSON. Returns the path."""
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+        return path
+
+
+def instrument(driver) -> CommandLog:
+    """Record every command sent through driver; the log is also driver.command_log."""
+    log = CommandLog()
+    executor = driver.command_executor
+    send = executor.execute
+
+    def execute(command, params):
+        t = time.perf_counter()
+        try:
+            return send(command, params)
+        finally:
+            api, origin = _caller(sys._getframe(1))
+            log.record(command, api, origin, time.perf_counter() - t)
+
+    executor.execute = execute
+    driver.command_log = log
+    return log
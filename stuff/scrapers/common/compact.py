@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Compact, dictionary-encoded export profile for scraped datasets.
+
+The CSVs repeat long strings thousands of times (book titles, HABITAT and
+NOTES lists, "1 Action") and carry columns that can be derived (URL from ID +
+slug, NAME_LOWER from NAME). The *-urls.csv files repeat ID/NAME/URL again.
+A compact bundle stores one JSON document per data CSV instead:
+
+    {
+      "format": "compact/1",
+      "columns": ["ID", "NAME", "CR", ...],       # original CSV column order
+      "count": 3329,
+      "dicts": {"SOURCE": ["Monster Manual (2014)", ...], ...},
+      "lists": {"HABITAT": ", ", "CLASSES": "json"},
+      "derived": {"URL": "https://www.dndbeyond.com/monsters/{ID}-{SLUG}",
+                  "NAME_LOWER": "lower(NAME)", "SLUG": "slug(NAME)"},
+      "data": {"ID": [582125, ...], "SOURCE": [3, ...], "HABITAT": [[0, 4], ...]},
+      "overrides": {"URL": {"17": "https://..."}}
+    }
+
+ - dictionary columns hold integer codes into "dicts"; list columns hold a
+   list of codes per row (null for an empty cell)
+ - derived columns are not stored; "overrides" keeps the row index -> value
+   for the few rows where the derivation does not reproduce the CSV exactly
+ - the *-urls.csv content is a projection (ID, NAME, URL) of the same rows
+
+read_compact() reconstructs the original rows (all values as strings, exactly
+as in the CSV); stuff/scripts/compact.ts does the same for the TS scripts.
+
+Usage from a scraper:
+    write_compact(rows, "stuff/data/x-data.csv", header)
+    -> writes stuff/data/x-data.compact.json
+
+CLI:
+    python stuff/scrapers/common/compact.py encode stuff/data/dndbeyond-monsters-data.csv
+    python stuff/scrapers/common/compact.py decode stuff/data/dndbeyond-monsters-data.compact.json out.csv
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import gzip
+import json
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+FORMAT = "compact/1"
+EXTENSION = ".compact.json"
+
+# Cells that hold a list; "json" for a JSON array, otherwise the separator
+LIST_COLUMNS: Dict[str, str] = {
+    "CLASSES": "json",
+    "HABITAT": ", ",
+    "NOTES": ", ",
+}
+# Dictionary-encode a column when it has at most this share of distinct values
+DICT_MAX_DISTINCT = 0.5
+
+_URL_RE = re.compile(r"^(?P<prefix>https?://.+)/(?P<id>\d+)-(?P<slug>[^/?#]+)$")
+_SLUG_SEP_RE = re.compile(r"[^a-z0-9]+")
+
+
+def slugify(name: str) -> str:
+    """D&D Beyond style slug: "Abi-Dalzim's Horrid Wilting" -> "abi-dalzims-horrid-wilting"."""
+    t = name.lower().replace("'", "").replace("’", "")
+    return _SLUG_SEP_RE.sub("-", t).strip("-")
+
+
+def _split_list(value: str, how: str) -> Optional[List[str]]:
+    if value == "":
+        return None
+    if how == "json":
+        parsed = json.loads(value)
+        if not isinstance(parsed, list) or not all(isinstance(v, str) for v in parsed):
+            raise ValueError(value)
+        return parsed
+    return value.split(how)
+
+
+def _join_list(values: Optional[List[str]], how: str) -> str:
+    if values is None:
+        return ""
+    if how == "json":
+        return json.dumps(values, ensure_ascii=False)
+    return how.join(values)
+
+
+def _list_codec(values: Sequence[str], how: str) -> bool:
+    """True when every cell survives split -> join unchanged."""
+    try:
+        return all(_join_list(_split_list(v, how), how) == v for v in values)
+    except ValueError:
+        return False
+
+
+def _derive(col: str, row: Mapping[str, str], url_template: Optional[str]) -> Optional[str]:
+    if col == "NAME_LOWER":
+        return row.get("NAME", "").lower()
+    if col == "SLUG":
+        return slugify(row.get("NAME", ""))
+    if col == "URL" and url_template:
+        slug = row["SLUG"] if "SLUG" in row else slugify(row.get("NAME", ""))
+        return url_template.format(ID=row.get("ID", ""), SLUG=slug)
+    return None
+
+
+_DERIVATIONS = {
+    "NAME_LOWER": "lower(NAME)",
+    "SLUG": "slug(NAME)",
+}
+
+
+def _url_template(urls: Iterable[str]) -> Optional[str]:
+    prefixes = Counter()
+    for u in urls:
+        m = _URL_RE.match(u or "")
+        if m:
+            prefixes[m.group("prefix")] += 1
+    if not prefixes:
+        return None
+    prefix = prefixes.most_common(1)[0][0]
+    return prefix + "/{ID}-{SLUG}"
+
+
+def encode(rows: Sequence[Mapping[str, Any]], columns: Sequence[str]) -> Dict[str, Any]:
+    """Build a compact bundle from CSV-shaped rows."""
+    cells = [{c: "" if r.get(c) is None else str(r.get(c)) for c in columns} for r in rows]
+    n = len(cells)
+    bundle: Dict[str, Any] = {
+        "format": FORMAT,
+        "columns": list(columns),
+        "count": n,
+        "dicts": {},
+        "lists": {},
+        "derived": {},
+        "data": {},
+        "overrides": {},
+    }
+
+    url_template = _url_template(c.get("URL", "") for c in cells) if "URL" in columns else None
+    # Derived columns are rebuilt in this order, so SLUG exists before URL
+    for col in ("NAME_LOWER", "SLUG", "URL"):
+        if col not in columns or (col != "URL" and "NAME" not in columns):
+            continue
+        if col == "URL" and not url_template:
+            continue
+        bundle["derived"][col] = url_template if col == "URL" else _DERIVATIONS[col]
+        overrides = {}
+        for i, c in enumerate(cells):
+            if _derive(col, c, url_template) != c[col]:
+                overrides[str(i)] = c[col]
+        if overrides:
+            bundle["overrides"][col] = overrides
+
+    for col in columns:
+        if col in bundle["derived"]:
+            continue
+        values = [c[col] for c in cells]
+        if col == "ID" and all(v.isdigit() and str(int(v)) == v for v in values):
+            bundle["data"][col] = [int(v) for v in values]
+            continue
+        how = LIST_COLUMNS.get(col)
+        if how and _list_codec(values, how):
+            lists = [_split_list(v, how) for v in values]
+            lookup = sorted({x for lst in lists if lst for x in lst})
+            index = {v: i for i, v in enumerate(lookup)}
+            bundle["dicts"][col] = lookup
+            bundle["lists"][col] = how
+            bundle["data"][col] = [None if lst is None else [index[x] for x in lst] for lst in lists]
+            continue
+        distinct = set(values)
+        if n and len(distinct) <= n * DICT_MAX_DISTINCT:
+            # Most frequent values get the smallest codes
+            lookup = [v for v, _ in Counter(values).most_common()]
+            index = {v: i for i, v in enumerate(lookup)}
+            bundle["dicts"][col] = lookup
+            bundle["data"][col] = [index[v] for v in values]
+        else:
+            bundle["data"][col] = values
+    return bundle
+
+
+def decode(bundle: Mapping[str, Any]) -> List[Dict[str, str]]:
+    """Reconstruct the original CSV rows (all values as strings) from a bundle."""
+    if bundle.get("format") != FORMAT:
+        raise ValueError(f"Not a {FORMAT} bundle: {bundle.get('format')!r}")
+    columns: List[str] = bundle["columns"]
+    dicts: Dict[str, List[str]] = bundle.get("dicts", {})
+    lists: Dict[str, str] = bundle.get("lists", {})
+    derived: Dict[str, str] = bundle.get("derived", {})
+    overrides: Dict[str, Dict[str, str]] = bundle.get("overrides", {})
+    data: Dict[str, List[Any]] = bundle["data"]
+
+    decoded: Dict[str, List[str]] = {}
+    for col, values in data.items():
+        lookup = dicts.get(col)
+        if col in lists:
+            how = lists[col]
+            decoded[col] = [
+                _join_list(None if v is None else [lookup[x] for x in v], how) for v in values
+            ]
+        elif lookup is not None:
+            decoded[col] = [lookup[v] for v in values]
+        else:
+            decoded[col] = [str(v) for v in values]
+
+    rows: List[Dict[str, str]] = []
+    for i in range(bundle["count"]):
+        rows.append({col: vals[i] for col, vals in decoded.items()})
+
+    url_template = derived.get("URL")
+    for col in ("NAME_LOWER", "SLUG", "URL"):
+        if col not in derived:
+            continue
+        col_overrides = overrides.get(col, {})
+        for i, row in enumerate(rows):
+            value = col_overrides.get(str(i))
+            row[col] = value if value is not None else _derive(col, row, url_template)
+
+    return [{c: row.get(c, "") for c in columns} for row in rows]
+
+
+def compact_path(csv_path: str, gz: bool = False) -> str:
+    """stuff/data/x-data.csv -> stuff/data/x-data.compact.json[.gz]"""
+    return os.path.splitext(csv_path)[0] + EXTENSION + (".gz" if gz else "")
+
+
+def write_bundle(bundle: Mapping[str, Any], path: str):
+    text = json.dumps(bundle, ensure_ascii=False, separators=(",", ":"))
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        f.write(text)
+
+
+def load_bundle(path: str) -> Dict[str, Any]:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_compact(path: str) -> List[Dict[str, str]]:
+    """Load a .compact.json(.gz) bundle and return the full rows."""
+    return decode(load_bundle(path))
+
+
+def write_compact(
+    rows: Sequence[Mapping[str, Any]],
+    csv_path: str,
+    columns: Sequence[str],
+    gz: bool = False,
+) -> str:
+    """Write rows as a compact bundle next to csv_path. Returns the path written."""
+    path = compact_path(csv_path, gz)
+    write_bundle(encode(rows, columns), path)
+    return path
+
+
+def _read_csv(path: str) -> Tuple[List[Dict[str, str]], List[str]]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        return list(reader), list(reader.fieldnames or [])
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="Compact dictionary-encoded export for scraped CSVs.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    enc = sub.add_parser("encode", help="CSV -> .compact.json")
+    enc.add_argument("csv", nargs="+")
+    enc.add_argument("--gzip", action="store_true", help="write .compact.json.gz")
+    dec = sub.add_parser("decode", help=".compact.json -> CSV")
+    dec.add_argument("bundle")
+    dec.add_argument("out")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "encode":
+        for path in args.csv:
+            rows, header = _read_csv(path)
+            out = write_compact(rows, path, header, gz=args.gzip)
+            if read_compact(out) != rows:
+                raise SystemExit(f"{path}: round-trip mismatch, not using {out}")
+            before, after = os.path.getsize(path), os.path.getsize(out)
+            print(f"{path} -> {out} ({len(rows)} rows, {before:,} -> {after:,} bytes, "
+                  f"{1 - after / before:.0%} smaller)")
+    else:
+        bundle = load_bundle(args.bundle)
+        rows = decode(bundle)
+        with open(args.out, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=bundle["columns"])
+            w.writeheader()
+            w.writerows(rows)
+        print(f"{args.bundle} -> {args.out} ({len(rows)} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,954 @@
+"""
+Shared D&D Beyond listing-crawl engine.
+
+Every listing (spells, magic items, monsters) works the same way: a paginated
+list of `.info` rows, each with an inline "more-info" panel that is toggled
+open when the compact row lacks a field. ListingCrawler owns the driver-side
+mechanics: finding rows, opening panels, pagination, pacing and progress.
+It is driven by an EntitySpec (see common/specs.py) that declares the listing
+URL, the row and panel selectors, the field extractor and the record type.
+
+    crawler = ListingCrawler(driver, SPELLS, CrawlTuning())
+    driver.get(SPELLS.start_url)
+    rows, pages = crawler.crawl(time.perf_counter(), limit=10, on_row=print)
+
+run() wraps the same with resume support: with a RowStore, the URL of each
+page reached is saved as a checkpoint and resume=True starts from there.
+crawl_iter() / run_iter() are the same crawls as generators that yield each
+row as it is parsed (compose them with the stages in common/stream.py).
+
+Requires: selenium, rich
+"""
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
+from urllib.parse import urlencode, urljoin, urlsplit
+
+from rich.console import Console
+from rich.progress import (
+    BarColumn,
+    MofNCompleteColumn,
+    Progress,
+    SpinnerColumn,
+    TextColumn,
+    TimeElapsedColumn,
+)
+from selenium import webdriver
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+
+from common import metrics, trace, waits
+from common.filters import ListingFilter, form_options
+from common.pacing import AimdPacer, page_problem
+from common.retry import CircuitBreaker, breaker, retry
+from common.records import Record
+from common.text import clean, format_elapsed, page_numbers, page_url, parse_id_slug
+
+BASE_URL = "https://www.dndbeyond.com"
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/121.0.0.0 Safari/537.36"
+)
+
+NEXT_SELECTOR = (
+    "ul.b-pagination-list a[rel='next'], .b-pagination a[rel='next'], "
+    ".b-pagination .b-pagination-item-next a, a[data-next-page]"
+)
+PAGINATION_SELECTOR = "ul.b-pagination-list a, .b-pagination a"
+
+
+@dataclass(frozen=True)
+class CrawlTuning:
+    """Pacing and timeouts, shared by every entity."""
+
+    delay_min: float = 0.05  # scroll rounds; delay_max bounds the wait for new rows
+    delay_max: float = 0.20
+    page_delay_min: float = 2.0  # starting delay between pages (respectful)
+    page_delay_max: float = 4.0
+    # AIMD pacing (common/pacing.py): adapt the page delay within
+    # [pacing_floor, pacing_ceiling]; False keeps the fixed random range
+    adaptive_pacing: bool = True
+    pacing_floor: float = 0.5
+    pacing_ceiling: float = 30.0
+    item_delay: float = 0.01  # between rows on the same page
+    max_wait: float = 20  # listing load / page change
+    toggle_wait: float = 5  # more-info panel after a toggle click
+    max_scroll_rounds: int = 5
+    # Navigate straight to ?page=N once the page count is known, prefetching
+    # the next page while this one is parsed; False clicks Next instead
+    plan_pages: bool = True
+    # Tabs for planned pages: the next pages load in the others while one is
+    # parsed (1 = a single tab with prefetch)
+    tabs: int = 2
+    # Retries (common/retry.py): attempts per page load / more-info panel,
+    # with full-jitter backoff from backoff_base up to backoff_cap seconds
+    page_attempts: int = 3
+    panel_attempts: int = 2
+    backoff_base: float = 1.0
+    backoff_cap: float = 30.0
+    # Per-host circuit breaker: pause breaker_cooldown seconds (doubling while
+    # the site stays down) after breaker_threshold failures in a row
+    breaker_threshold: int = 5
+    breaker_cooldown: float = 30.0
+    # Reload rounds at the end of the crawl for rows that went stale or came
+    # out incomplete (see EntitySpec.required); 0 keeps them as they are
+    deferred_rounds: int = 2
+
+
+@dataclass(frozen=True)
+class EntitySpec:
+    """Declarative description of one D&D Beyond listing."""
+
+    key: str  # row store table, e.g. "spells"
+    label: str  # progress label, e.g. "spells"
+    path: str  # URL path segment, e.g. "spells"
+    listing_class: str  # ul.listing-<listing_class>
+    more_info_class: str  # .<more_info_class>-<id>-<slug>
+    toggle_selector: str  # in-row control that opens the panel
+    name_selector: str  # row's name anchor (fallback toggle)
+    ready_selector: str  # present once the panel is loaded
+    parse_row: Callable[["ListingCrawler", Any], Record]
+    record: type
+    # Also accept the next generic .more-info sibling as the row's panel
+    loose_more_info: bool = False
+    # Optional extra columns the extractor should fill, e.g. {"DESCRIPTION"}
+    extras: FrozenSet[str] = field(default_factory=frozenset)
+    # Columns every complete row has; a row missing one (its panel timed out)
+    # is deferred and parsed again from a reload of its page
+    required: FrozenSet[str] = frozenset({"SOURCE"})
+
+    @property
+    def start_url(self) -> str:
+        return f"{BASE_URL}/{self.path}"
+
+    @property
+    def row_selectors(self) -> List[str]:
+        return [
+            f"ul.listing-{self.listing_class} .info",
+            "ul.listing .info",
+            ".listing-body .listing .info",
+            "div.info[data-slug]",
+        ]
+
+    def url_for(self, id_: str, slug: str) -> str:
+        return urljoin(BASE_URL, f"/{self.path}/{id_}-{slug}")
+
+
+def make_driver(
+    headless: bool = True, user_agent: Optional[str] = None, cache_dir: Optional[str] = None
+):
+    """Create Chrome webdriver: no images/fonts, eager page load, quiet logs.
+
+    cache_dir keeps Chrome's HTTP disk cache between runs, so scripts and
+    stylesheets are not downloaded again on every start.
+    """
+    opts = Options()
+    if headless:
+        try:
+            opts.add_argument("--headless=new")
+        except Exception:
+            opts.add_argument("--headless")
+    opts.add_argument("--window-size=1200,900")
+    # Lightweight page load
+    opts.add_argument("--blink-settings=imagesEnabled=false")
+    opts.add_experimental_option(
+        "prefs",
+        {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.fonts": 2,
+        },
+    )
+    # Faster initial page load
+    try:
+        opts.page_load_strategy = "eager"
+    except Exception:
+        pass
+
+    opts.add_argument("--no-sandbox")
+    opts.add_argument("--disable-dev-shm-usage")
+    opts.add_argument("--disable-extensions")
+    opts.add_argument("--disable-gpu")
+    opts.add_argument("--disable-background-networking")
+    opts.add_argument("--disable-features=PushMessaging")
+    opts.add_argument("--disable-notifications")
+    opts.add_argument("--log-level=3")
+    if user_agent:
+        opts.add_argument(f"user-agent={user_agent}")
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        opts.add_argument(f"--disk-cache-dir={os.path.abspath(cache_dir)}")
+    opts.add_experimental_option(
+        "excludeSwitches", ["enable-automation", "enable-logging"]
+    )
+    opts.add_experimental_option("useAutomationExtension", False)
+
+    service = Service(log_path=os.devnull)
+    return webdriver.Chrome(service=service, options=opts)
+
+
+class ListingCrawler:
+    """Crawl one D&D Beyond listing according to an EntitySpec."""
+
+    def __init__(
+        self,
+        driver,
+        spec: EntitySpec,
+        tuning: Optional[CrawlTuning] = None,
+        listing_filter: Optional[ListingFilter] = None,
+    ):
+        self.driver = driver
+        self.spec = spec
+        self.tuning = tuning or CrawlTuning()
+        # Pushed down to the listing URL by run(); rows that fail it are dropped
+        self.listing_filter = listing_filter or None
+        self.pacer = AimdPacer.from_tuning(self.tuning)
+        # True once the last page was processed (not stopped by a limit)
+        self.complete = False
+        # Window handles of the tabs used for planned pages (see _open_tabs)
+        self._tabs: List[str] = []
+        self.pages_processed = 0
+
+    def incomplete(self, row: Record) -> bool:
+        """True when the row lacks one of the spec's required columns."""
+        return any(not row.get(column) for column in self.spec.required)
+
+    # --- row helpers (used by the field extractors) -------------------------
+    def text(self, root, selector: str) -> str:
+        """Cleaned text of the first match under root, or ''."""
+        try:
+            return clean(root.find_element(By.CSS_SELECTOR, selector).text)
+        except Exception:
+            return ""
+
+    def parse_id_slug(self, el) -> Tuple[Optional[str], Optional[str]]:
+        """Return (id, slug) using data-slug or anchor href."""
+        data_slug = href = ""
+        try:
+            data_slug = el.get_attribute("data-slug") or ""
+        except Exception:
+            pass
+        if not data_slug:
+            try:
+                href = el.find_element(By.CSS_SELECTOR, "a.link, a").get_attribute("href") or ""
+            except Exception:
+                pass
+        return parse_id_slug(data_slug, href, self.spec.path)
+
+    def more_info(self, info_el, id_: str, slug: str):
+        """Try class selector, then following-sibling fallback for the 'more info' block."""
+        cls = self.spec.more_info_class
+        try:
+            els = self.driver.find_elements(By.CSS_SELECTOR, f".{cls}-{id_}-{slug}")
+            if els:
+                return els[0]
+        except Exception:
+            pass
+        xpaths = [f"./following-sibling::div[contains(@class,'{cls}')][1]"]
+        if self.spec.loose_more_info:
+            xpaths.append("./following-sibling::div[contains(@class,'more-info')][1]")
+        for xp in xpaths:
+            try:
+                return info_el.find_element(By.XPATH, xp)
+            except Exception:
+                pass
+        return None
+
+    def is_ready(self, more) -> bool:
+        """True when the panel holds the content the extractor needs."""
+        try:
+            return bool(more.find_elements(By.CSS_SELECTOR, self.spec.ready_selector))
+        except Exception:
+            return False
+
+    def _click(self, el):
+        self.driver.execute_script("arguments[0].scrollIntoView({block:'center'});", el)
+        try:
+            el.click()
+        except Exception:
+            metrics.inc("retries")
+            self.driver.execute_script("arguments[0].click();", el)
+
+    def ensure_more_info(self, info_el, id_: str, slug: str):
+        """
+        Ensure the inline 'more-info' panel exists and is populated by clicking
+        the row's toggle if needed. Returns the 'more' element (or None).
+        """
+        more = self.more_info(info_el, id_, slug)
+        if more is not None and self.is_ready(more):
+            return more
+        metrics.inc("panel_expansions")
+        with trace.span("expand panel", "panel", ID=id_):
+            return self._expand(info_el, id_, slug, more)
+
+    def _click_toggle(self, info_el) -> bool:
+        """Click the row's toggle, or its name as a fallback; False if neither worked."""
+        try:
+            self._click(info_el.find_element(By.CSS_SELECTOR, self.spec.toggle_selector))
+        except Exception:
+            metrics.inc("retries")
+            try:
+                self._click(info_el.find_element(By.CSS_SELECTOR, self.spec.name_selector))
+            except Exception:
+                return False
+        return True
+
+    def _expand(self, info_el, id_: str, slug: str, more):
+        """Click the row's toggle (or name) and wait for the panel to be ready.
+
+        A panel that does not load is waited for again after a backoff
+        (tuning.panel_attempts). The toggle is only clicked again when no
+        panel element appeared, since a second click would close a slow one.
+        """
+        if not self._click_toggle(info_el):
+            return more
+        spec = self.spec
+        tries = []
+
+        def attempt():
+            if tries and self.more_info(info_el, id_, slug) is None:
+                self._click_toggle(info_el)
+            tries.append(True)
+            panel = waits.panel_ready(
+                self.driver, info_el, spec.more_info_class, f"{spec.more_info_class}-{id_}-{slug}",
+                spec.loose_more_info, spec.ready_selector, self.tuning.toggle_wait,
+            )
+            if panel is None:
+                metrics.inc("panel_timeouts")
+            return panel
+
+        # No host breaker: a slow or missing panel says little about the host,
+        # and rows that need no expansion would never reset its count
+        try:
+            panel = retry(
+                attempt, self.tuning.panel_attempts, self.tuning.backoff_base / 4, self.tuning.backoff_cap / 4,
+                None, "panel", fatal=(StaleElementReferenceException,),
+            )
+        except StaleElementReferenceException:
+            raise
+        except WebDriverException:
+            panel = None
+        return panel if panel is not None else self.more_info(info_el, id_, slug)
+
+    # --- pagination ----------------------------------------------------------
+    def find_rows(self) -> list:
+        for s in self.spec.row_selectors:
+            try:
+                els = self.driver.find_elements(By.CSS_SELECTOR, s)
+            except Exception:
+                els = []
+            if els:
+                return els
+        return []
+
+    def total_pages(self) -> Optional[int]:
+        try:
+            links = self.driver.find_elements(By.CSS_SELECTOR, PAGINATION_SELECTOR)
+            nums = page_numbers((e.text, e.get_attribute("href")) for e in links)
+            return max(nums) if nums else None
+        except Exception:
+            return None
+
+    def _click_next(self) -> Optional[float]:
+        """Pace, then click Next; perf_counter() at the click, or None if there is no Next."""
+        try:
+            el = self.driver.find_element(By.CSS_SELECTOR, NEXT_SELECTOR)
+        except NoSuchElementException:
+            return None
+        except Exception:
+            return None
+        try:
+            aria = (el.get_attribute("aria-disabled") or "").lower()
+            cls = (el.get_attribute("class") or "").lower()
+            href = el.get_attribute("href") or ""
+        except Exception:
+            return None
+        if aria == "true" or "disabled" in cls:
+            return None
+        # Delay between pages to be respectful (adapted by self.pacer)
+        self.pacer.pause()
+        clicked = time.perf_counter()
+        try:
+            self._click(el)
+        except Exception:
+            if not href:
+                return None
+            metrics.inc("retries")
+            self.driver.get(urljoin(self.driver.current_url, href))
+        return clicked
+
+    def _wait_page_change(self, prev_url: str, prev_count: int, prev_first: Optional[str]) -> bool:
+        return waits.page_changed(
+            self.driver, prev_url, ", ".join(self.spec.row_selectors), prev_first, prev_count,
+            self.tuning.max_wait,
+        )
+
+    def _prefetch(self, url: str):
+        """Have Chrome fetch url into its cache while the current page is parsed."""
+        try:
+            self.driver.execute_script(
+                "var l = document.createElement('link'); l.rel = 'prefetch'; l.href = arguments[0];"
+                "document.head.appendChild(l);",
+                url,
+            )
+        except Exception:
+            pass
+
+    def _breaker(self, url: str) -> CircuitBreaker:
+        """The circuit breaker for url's host (reports opening and recovery)."""
+        b = breaker(
+            urlsplit(url).hostname or "",
+            threshold=self.tuning.breaker_threshold,
+            cooldown=self.tuning.breaker_cooldown,
+        )
+        if b.on_change is None:
+            def report(host: str, state: str, cooldown: float):
+                if state == "open":
+                    Console().print(f"[red]{host}: failures keep coming; pausing {cooldown:.0f}s (circuit open)")
+                elif state == "closed":
+                    Console().print(f"[green]{host}: recovered (circuit closed)")
+            b.on_change = report
+        return b
+
+    def _load(self, url: str) -> bool:
+        """driver.get(url); True once its listing rows are present."""
+        self.driver.get(url)
+        return waits.present(self.driver, ", ".join(self.spec.row_selectors), self.tuning.max_wait) is not None
+
+    def _goto_page(self, url: str) -> bool:
+        """Pace, then load url directly, with retries; True once its listing rows are present."""
+        host = urlsplit(url).hostname or ""
+
+        def attempt() -> bool:
+            self.pacer.pause()
+            started = time.perf_counter()
+            try:
+                loaded = self._load(url)
+            except WebDriverException:
+                loaded = False
+            problem = page_problem(self.driver, host)
+            self.pacer.observe(time.perf_counter() - started if loaded else None, problem)
+            return loaded and problem is None
+
+        return bool(retry(
+            attempt, self.tuning.page_attempts, self.tuning.backoff_base, self.tuning.backoff_cap,
+            self._breaker(url), "page load",
+        ))
+
+    def _open_tabs(self):
+        """Add tuning.tabs - 1 tabs next to the current one, which stays active."""
+        current = self.driver.current_window_handle
+        self._tabs = [current]
+        try:
+            for _ in range(self.tuning.tabs - 1):
+                self.driver.switch_to.new_window("tab")
+                self._tabs.append(self.driver.current_window_handle)
+        except Exception:
+            pass
+        self.driver.switch_to.window(current)
+        if len(self._tabs) == 1:
+            self._tabs = []
+
+    def _close_tabs(self):
+        """Close every tab but the active one."""
+        if not self._tabs:
+            return
+        tabs, self._tabs = self._tabs, []
+        try:
+            current = self.driver.current_window_handle
+            for handle in tabs:
+                if handle != current:
+                    try:
+                        self.driver.switch_to.window(handle)
+                        self.driver.close()
+                    except Exception:
+                        pass
+            self.driver.switch_to.window(current)
+        except WebDriverException:
+            pass  # the browser is gone (this also runs while an error propagates)
+
+    def _preload(self, planned: Dict[int, str], page: int, loading: Dict[int, str]):
+        """Start loading the pages after page in the idle tabs, without waiting for them."""
+        current = self.driver.current_window_handle
+        idle = [h for h in self._tabs if h != current and h not in loading.values()]
+        for n in range(page + 1, page + len(self._tabs)):
+            if not idle:
+                break
+            if n not in planned or n in loading:
+                continue
+            handle = idle.pop(0)
+            self.pacer.pause()
+            try:
+                self.driver.switch_to.window(handle)
+                # The flag marks the old document, so _switch_to_loaded can tell it apart
+                self.driver.execute_script(
+                    "window.__preloadStale = true; window.location.href = arguments[0];", planned[n]
+                )
+                loading[n] = handle
+            except Exception:
+                pass
+        self.driver.switch_to.window(current)
+
+    def _switch_to_loaded(self, handle: str, url: str) -> bool:
+        """Activate the tab preloading url; True once its listing rows are present."""
+        self.driver.switch_to.window(handle)
+        rows = ", ".join(self.spec.row_selectors)
+        loaded = False
+        load_seconds = None
+        for _ in range(2):  # the old document can unload under the first wait
+            try:
+                loaded = waits.until(
+                    self.driver, "return !window.__preloadStale && document.querySelector(args[0]);", rows,
+                    timeout=self.tuning.max_wait, label="wait tab",
+                ) is not None
+                break
+            except WebDriverException:
+                continue
+        if loaded:
+            try:
+                load_seconds = self.driver.execute_script(
+                    "var n = performance.getEntriesByType('navigation')[0];"
+                    "return n ? n.responseEnd / 1000 : null;"
+                )
+            except Exception:
+                pass
+        problem = page_problem(self.driver, urlsplit(url).hostname or "")
+        self.pacer.observe(load_seconds if loaded else None, problem)
+        return loaded and problem is None
+
+    def _scroll_for_more(self, count: int) -> bool:
+        """Infinite-scroll fallback: True if more rows appeared."""
+        for _ in range(self.tuning.max_scroll_rounds):
+            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            try:
+                if waits.count_above(self.driver, self.spec.row_selectors[0], count, self.tuning.delay_max):
+                    return True
+            except Exception:
+                pass
+        return False
+
+    def crawl(
+        self,
+        start_time: float,
+        limit: Optional[int] = None,
+        on_row: Optional[Callable[[Record], None]] = None,
+        start_page: int = 1,
+        on_page: Optional[Callable[[int, str], None]] = None,
+    ) -> Tuple[List[Record], int]:
+        """crawl_iter() collected into a list: (rows, pages_processed).
+
+        on_row, if given, is called with each new row as soon as it is parsed.
+        """
+        results: List[Record] = []
+        for row in self.crawl_iter(start_time, limit=limit, start_page=start_page, on_page=on_page):
+            results.append(row)
+            if on_row:
+                on_row(row)
+        return results, self.pages_processed
+
+    def crawl_iter(
+        self,
+        start_time: float,
+        limit: Optional[int] = None,
+        start_page: int = 1,
+        on_page: Optional[Callable[[int, str], None]] = None,
+    ) -> Iterator[Record]:
+        """Navigate pages, yielding per-row data from the listing (no detail pages).
+
+        The driver must already be on the listing (page start_page). Rows are
+        yielded as soon as they are parsed, so downstream stages (see
+        common/stream.py) run while the crawl goes on; on_page is called with
+        (page, url) whenever a Next click lands on a new URL.
+
+        Once the page count is known (and tuning.plan_pages), later pages are
+        loaded directly as ?page=N and the crawl ends at the last page without
+        probing for infinite scroll. With tuning.tabs > 1 the next pages load
+        in other tabs of the same Chrome while the current one is parsed;
+        with one tab the next page is prefetched into the cache instead.
+        Rows that go stale or lack a required column are deferred and parsed
+        again from reloads of their pages once the listing is done (_drain).
+        self.pages_processed counts the pages so far.
+        """
+        spec = self.spec
+        console = Console()
+        collected = 0
+        seen_ids = set()
+        self.pages_processed = 0
+        # Set by common.commands.instrument(); groups commands per row
+        commands = getattr(self.driver, "command_log", None)
+
+        if waits.present(self.driver, f".listing, .listing-{spec.listing_class}", self.tuning.max_wait) is None:
+            raise TimeoutException(f"No .listing on {self.driver.current_url}")
+        total_pages = self.total_pages()
+        # page -> URL for every remaining page, when the page count is known
+        planned = {}
+        if self.tuning.plan_pages and total_pages and total_pages > start_page:
+            here = self.driver.current_url
+            planned = {n: page_url(here, n) for n in range(start_page + 1, total_pages + 1)}
+            if self.tuning.tabs > 1:
+                self._open_tabs()
+        loading: Dict[int, str] = {}  # page -> tab it is preloading in
+        # (page, ID) -> incomplete row, or None for rows that went stale (ID "")
+        deferred: Dict[Tuple[int, str], Optional[Record]] = {}
+        page_urls: Dict[int, str] = {}  # pages with deferred rows
+
+        def defer(page: int, id_: str, row: Optional[Record]):
+            metrics.inc("deferred_rows")
+            deferred[(page, id_)] = row
+            if page not in page_urls:
+                page_urls[page] = planned.get(page) or self.driver.current_url
+
+        # Preload tabs are closed however the loop ends, even on close() or an error
+        try:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[bold blue]{task.description}"),
+                BarColumn(),
+                MofNCompleteColumn(),
+                TextColumn("•"),
+                TimeElapsedColumn(),
+                console=console,
+                transient=False,
+            ) as progress:
+                page_task = progress.add_task(
+                    "[cyan]D&D Beyond Pages", total=total_pages if total_pages else None
+                )
+                item_task = None  # Will be created per-page
+
+                page = start_page
+                while True:
+                    with trace.span(f"page {page}", "page"):
+                        self.pages_processed += 1
+                        elapsed_str = format_elapsed(time.perf_counter() - start_time)
+                        total_str = str(total_pages) if total_pages else "?"
+                        progress.update(
+                            page_task,
+                            description=f"[cyan]DDB Page {page}/{total_str} | Total {spec.label}: {collected}",
+                            completed=page,
+                        )
+
+                        info_els = self.find_rows()
+                        items_total = len(info_els)
+                        if page + 1 in planned:
+                            if self._tabs:
+                                self._preload(planned, page, loading)
+                            else:
+                                self._prefetch(planned[page + 1])
+                        if items_total > 0:
+                            item_task = progress.add_task(
+                                f"[yellow]  → Page {page} items", total=items_total
+                            )
+
+                        stop_all = False
+                        new_here = 0
+                        fresh_here = 0  # unseen IDs, including rows the filter dropped
+                        parsed_here = 0  # rows that did not go stale
+                        for info_el in info_els:
+                            if commands is not None:
+                                commands.start_row()
+                            try:
+                                with trace.span("row", "row") as span_args:
+                                    row = spec.parse_row(self, info_el)
+                                    span_args.update(ID=row.get("ID", ""), NAME=row.get("NAME", ""))
+                                trace.sleep(self.tuning.item_delay, "item delay")
+                            except StaleElementReferenceException:
+                                metrics.inc("stale_skips")
+                                defer(page, "", None)
+                                if item_task is not None:
+                                    progress.update(item_task, advance=1)
+                                continue
+
+                            parsed_here += 1
+                            if not row.get("ID") or row["ID"] in seen_ids:
+                                if item_task is not None:
+                                    progress.update(item_task, advance=1)
+                                continue
+
+                            seen_ids.add(row["ID"])
+                            fresh_here += 1
+                            if self.incomplete(row) and self.tuning.deferred_rounds > 0:
+                                defer(page, row["ID"], row)
+                            if (page, row["ID"]) in deferred or not self._wanted(row):
+                                if item_task is not None:
+                                    progress.update(item_task, advance=1)
+                                continue
+                            collected += 1
+                            new_here += 1
+                            yield row
+
+                            if item_task is not None:
+                                progress.update(
+                                    item_task,
+                                    advance=1,
+                                    description=(
+                                        f"[yellow]  → Page {page} items | New: {new_here} "
+                                        f"| Current: {row.get('NAME', '')[:30]}"
+                                    ),
+                                )
+
+                            # test/limit early exit
+                            if limit and collected >= limit:
+                                stop_all = True
+                                break
+
+                        if commands is not None:
+                            commands.end_rows()
+                        if item_task is not None:
+                            progress.remove_task(item_task)
+                            item_task = None
+
+                        if stop_all:
+                            progress.update(
+                                page_task,
+                                description=f"[green]Reached limit ({limit} {spec.label}) | Total: {collected}",
+                            )
+                            console.print("[yellow]Reached the test limit; stopping DDB pagination.")
+                            break
+
+                        console.print(
+                            f"[dim]{elapsed_str}[/dim]  "
+                            f"Page {page}/{total_str}: {items_total} items, "
+                            f"{new_here} new, total [bold]{collected}[/bold]"
+                        )
+
+                        if planned and page > start_page and parsed_here and not fresh_here:
+                            # ?page=N showed rows we already have: the site ignores it
+                            # (a page whose rows all went stale says nothing either way)
+                            console.print("[yellow]?page=N not honoured; following Next links instead.")
+                            planned = {}
+                            total_pages = None
+                            loading.clear()
+
+                        if total_pages and page >= total_pages:
+                            progress.update(
+                                page_task,
+                                description=f"[green]Complete! Scraped {collected} {spec.label} from {self.pages_processed} pages",
+                            )
+                            console.print(f"[green]Last page ({total_pages}) done. Finished.")
+                            self.complete = True
+                            break
+
+                        if page + 1 in planned:
+                            loaded = False
+                            if page + 1 in loading:
+                                loaded = self._switch_to_loaded(loading.pop(page + 1), planned[page + 1])
+                            if not loaded:
+                                loaded = self._goto_page(planned[page + 1])
+                            if not loaded:
+                                console.print(f"[yellow]Page {page + 1}: no listing rows at {planned[page + 1]}")
+                            page += 1
+                            if on_page:
+                                on_page(page, self.driver.current_url)
+                            continue
+
+                        # snapshot before navigation
+                        prev_url = self.driver.current_url
+                        prev_first = None
+                        if info_els:
+                            try:
+                                prev_first = info_els[0].get_attribute("data-slug")
+                            except Exception:
+                                prev_first = None
+
+                        clicked = self._click_next()
+                        if clicked is not None:
+                            with trace.span("wait page change", "wait"):
+                                changed = self._wait_page_change(prev_url, items_total, prev_first)
+                            signal = self.pacer.observe(
+                                time.perf_counter() - clicked if changed else None,
+                                page_problem(self.driver, urlsplit(prev_url).hostname or ""),
+                            )
+                            if signal in (None, "slow"):
+                                self._breaker(prev_url).success()
+                            else:
+                                self._breaker(prev_url).failure()
+                            if signal:
+                                console.print(
+                                    f"[yellow]Page {page + 1}: {signal}; page delay now {self.pacer.delay:.1f}s"
+                                )
+                            page += 1
+                            if on_page and self.driver.current_url != prev_url:
+                                on_page(page, self.driver.current_url)
+                            continue
+
+                        if self._scroll_for_more(items_total):
+                            page += 1
+                            continue
+
+                        progress.update(
+                            page_task,
+                            description=f"[green]Complete! Scraped {collected} {spec.label} from {self.pages_processed} pages",
+                        )
+                        console.print("[green]No 'Next' control and no additional items loaded. Finished.")
+                        self.complete = True
+                        break
+        finally:
+            self._close_tabs()
+
+        # The deferred rows count against the limit too
+        remaining = limit - collected if limit else None
+        if deferred and remaining != 0:
+            yield from self._drain(deferred, page_urls, seen_ids, remaining)
+
+    def _wanted(self, row: Record) -> bool:
+        """False (and counted) when the listing filter drops the row."""
+        if self.listing_filter and not self.listing_filter.matches(row):
+            metrics.inc("filtered_out")
+            return False
+        return True
+
+    def _drain(
+        self,
+        deferred: Dict[Tuple[int, str], Optional[Record]],
+        page_urls: Dict[int, str],
+        seen_ids: set,
+        limit: Optional[int] = None,
+    ) -> Iterator[Record]:
+        """Reload the pages of deferred rows, parse those rows again and yield them.
+
+        Up to tuning.deferred_rounds rounds, one load per page and round. An
+        incomplete row is replaced by the first complete parse; one that stays
+        incomplete is kept as it is. A stale row (ID "") is looked for among
+        the page's rows whose IDs were never seen. Stops after limit rows.
+        """
+        console = Console()
+        spec = self.spec
+        yielded = 0
+        for _ in range(self.tuning.deferred_rounds):
+            if not deferred:
+                break
+            pages = sorted({page for page, _id in deferred})
+            console.print(
+                f"[yellow]Retrying {len(deferred)} stale or incomplete {spec.label} "
+                f"on {len(pages)} pages"
+            )
+            for page in pages:
+                with trace.span(f"retry page {page}", "page"):
+                    if not self._goto_page(page_urls[page]):
+                        continue
+                    pending = {id_ for p, id_ in deferred if p == page}
+                    stale = (page, "") in deferred
+                    deferred.pop((page, ""), None)
+                    for info_el in self.find_rows():
+                        id_, _slug = self.parse_id_slug(info_el)
+                        if not id_ or not (id_ in pending or (stale and id_ not in seen_ids)):
+                            continue
+                        try:
+                            row = spec.parse_row(self, info_el)
+                        except StaleElementReferenceException:
+                            metrics.inc("stale_skips")
+                            deferred.setdefault((page, "" if id_ not in pending else id_), None)
+                            continue
+                        if self.incomplete(row):
+                            if deferred.get((page, id_)) is None:
+                                deferred[(page, id_)] = row
+                            continue
+                        deferred.pop((page, id_), None)
+                        seen_ids.add(id_)
+                        metrics.inc("deferred_recovered")
+                        if self._wanted(row):
+                            yield row
+                            yielded += 1
+                            if limit and yielded >= limit:
+                                return
+        kept = [row for row in deferred.values() if row is not None]
+        for row in kept:
+            if self._wanted(row):
+                yield row
+                yielded += 1
+                if limit and yielded >= limit:
+                    return
+        lost = len(deferred) - len(kept)
+        if lost:
+            metrics.inc("deferred_lost", lost)
+            console.print(f"[red]{lost} pages still had stale {spec.label} after the retries")
+        if kept:
+            console.print(f"[yellow]{len(kept)} {spec.label} kept without their panel fields")
+
+    def _filtered_url(self, url: str) -> str:
+        """url with the filter's DDB query parameters (labels looked up on the listing's form)."""
+        options = None
+        if self.listing_filter.needs_form():
+            self.driver.get(url)
+            options = form_options(self.driver)
+        params, missed = self.listing_filter.query(options)
+        if missed:
+            Console().print(f"[yellow]Not pushed down (checked per row only): {', '.join(missed)}")
+        if params:
+            url += ("&" if "?" in url else "?") + urlencode(params)
+        return url
+
+    def run(
+        self,
+        start_time: float,
+        start_url: Optional[str] = None,
+        limit: Optional[int] = None,
+        on_row: Optional[Callable[[Record], None]] = None,
+        store=None,
+        resume: bool = False,
+    ) -> Tuple[List[Record], int]:
+        """run_iter() collected into a list: (rows, pages_processed).
+
+        on_row, if given, is called with each new row as soon as it is parsed.
+        """
+        results: List[Record] = []
+        for row in self.run_iter(start_time, start_url=start_url, limit=limit, store=store, resume=resume):
+            results.append(row)
+            if on_row:
+                on_row(row)
+        return results, self.pages_processed
+
+    def run_iter(
+        self,
+        start_time: float,
+        start_url: Optional[str] = None,
+        limit: Optional[int] = None,
+        store=None,
+        resume: bool = False,
+    ) -> Iterator[Record]:
+        """Open the listing and yield its rows, checkpointing pages in store (a RowStore).
+
+        With resume=True the crawl starts at the last checkpointed page; the
+        checkpoint is cleared once the listing has been crawled to the end.
+        A listing_filter is applied to the start URL as DDB query parameters
+        (a filtered crawl keeps its own checkpoint).
+        """
+        key = self.spec.key
+        if self.listing_filter:
+            key = f"{key}:{self.listing_filter.slug()}"
+        saved = store.checkpoint(key) if (store is not None and resume) else None
+        if saved:
+            Console().print(f"[yellow]Resuming {self.spec.label} at page {saved[0]}: {saved[1]}")
+            self.driver.get(saved[1])
+        else:
+            url = start_url or self.spec.start_url
+            if self.listing_filter:
+                url = self._filtered_url(url)
+            retry(
+                lambda: self._load(url), self.tuning.page_attempts, self.tuning.backoff_base,
+                self.tuning.backoff_cap, self._breaker(url), "page load",
+            )
+
+        on_page = None
+        if store is not None:
+            def on_page(page: int, url: str):
+                store.save_checkpoint(key, page, url)
+
+        yield from self.crawl_iter(
+            start_time,
+            limit=limit,
+            start_page=saved[0] if saved else 1,
+            on_page=on_page,
+        )
+        if store is not None and self.complete:
+            store.clear_checkpoint(key)
@@ -0,0 +1,200 @@
+"""
+Listing filters: pushed down to D&D Beyond's query parameters, re-checked per row.
+
+A targeted dataset (one source book, a spell level, a rarity, a CR range)
+used to mean crawling the whole listing and filtering afterwards. A
+ListingFilter turns into the listing's own filter-* query parameters, so
+DDB only serves the matching pages:
+
+    ListingFilter(sources=("Monster Manual (2024)",))   # filter-source=<id>
+    ListingFilter(levels=(0, 1))                        # spells: filter-level
+    ListingFilter(rarities=("Rare", "Very Rare"))       # items: filter-rarity=<id>
+    ListingFilter(cr_min="1/4", cr_max="5")             # monsters: filter-cr-min / -max
+    ListingFilter(params=(("filter-type", "7"),))       # any other parameter, as is
+
+Most DDB filter values are numeric IDs. Labels ("Monster Manual (2024)",
+"Very Rare", "1/4") are mapped to IDs with the listing's own filter form
+(form_options() reads its filter-* selects and checkboxes once); source
+IDs and spell levels are passed through as given. matches() then checks every parsed row
+against SOURCE / LEVEL / RARITY / CR. A parameter DDB ignores, or a label
+the form does not list, therefore costs extra pages but never lets in
+wrong rows. Sources given as numeric IDs cannot be checked per row.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from fractions import Fraction
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from common.text import clean
+
+# Field -> (DDB query parameter, record column it is checked against)
+PARAMS = {
+    "sources": ("filter-source", "SOURCE"),
+    "levels": ("filter-level", "LEVEL"),
+    "rarities": ("filter-rarity", "RARITY"),
+    "cr_min": ("filter-cr-min", "CR"),
+    "cr_max": ("filter-cr-max", "CR"),
+}
+
+# {name: [[label, value], ...]} for every filter-* control on the page
+FORM_OPTIONS_JS = """
+var out = {};
+function add(name, label, value) {
+  if (!name || name.indexOf('filter-') !== 0 || value === '') return;
+  (out[name] = out[name] || []).push([label.trim(), value]);
+}
+document.querySelectorAll('select[name^="filter-"] option').forEach(function (o) {
+  add(o.closest('select').name, o.textContent, o.value);
+});
+document.querySelectorAll('input[name^="filter-"][type=checkbox], input[name^="filter-"][type=radio]')
+  .forEach(function (i) {
+    var l = (i.id && document.querySelector('label[for="' + i.id + '"]')) || i.closest('label');
+    add(i.name, l ? l.textContent : '', i.value);
+  });
+return out;
+"""
+
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+_LEVEL_RE = re.compile(r"\d+")
+
+
+def _norm(text: str) -> str:
+    return clean(text).lower()
+
+
+def parse_cr(text: Optional[str]) -> Optional[Fraction]:
+    """'1/4' -> 1/4, '5' -> 5; None when not a challenge rating."""
+    try:
+        return Fraction(clean(text or ""))
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def spell_level(text: Optional[str]) -> Optional[int]:
+    """'Cantrip' -> 0, '3rd' -> 3; None when there is no level."""
+    t = _norm(text or "")
+    if t.startswith("cantrip"):
+        return 0
+    m = _LEVEL_RE.search(t)
+    return int(m.group()) if m else None
+
+
+def _level_label(level: int) -> str:
+    if level == 0:
+        return "cantrip"
+    suffix = {1: "st", 2: "nd", 3: "rd"}.get(level, "th")
+    return f"{level}{suffix}"
+
+
+@dataclass(frozen=True)
+class ListingFilter:
+    sources: Tuple[str, ...] = ()  # book names or DDB source IDs
+    levels: Tuple[int, ...] = ()  # spells; 0 = cantrip
+    rarities: Tuple[str, ...] = ()  # magic items
+    cr_min: Optional[str] = None  # monsters, e.g. "1/4"
+    cr_max: Optional[str] = None
+    params: Tuple[Tuple[str, str], ...] = ()  # extra DDB query parameters
+
+    def __bool__(self) -> bool:
+        return any((self.sources, self.levels, self.rarities, self.cr_min, self.cr_max, self.params))
+
+    def unsupported(self, fields) -> List[str]:
+        """Filter fields this listing's records (with fields) have no column for."""
+        return [
+            name for name, (_param, column) in PARAMS.items()
+            if getattr(self, name) not in (None, ()) and column not in fields
+        ]
+
+    def needs_form(self) -> bool:
+        """True when some value is a label that has to be looked up in the page's form."""
+        return bool(
+            self.rarities or self.cr_min or self.cr_max or any(not s.isdigit() for s in self.sources)
+        )
+
+    def query(self, options: Optional[Mapping[str, List[List[str]]]] = None) -> Tuple[List[Tuple[str, str]], List[str]]:
+        """(DDB query parameters, values that could not be mapped to one).
+
+        options is form_options() of the listing. Without it only source IDs
+        and spell levels are pushed down: a bare number is not trusted to be
+        DDB's ID for a rarity or a challenge rating.
+        """
+        options = options or {}
+        params: List[Tuple[str, str]] = []
+        missed: List[str] = []
+
+        def push(name: str, wanted: str, label: Optional[str] = None, raw: bool = False):
+            choices = options.get(name) or []
+            values = {value for _label, value in choices}
+            if wanted in values or (raw and wanted.isdigit() and not choices):
+                params.append((name, wanted))
+                return
+            label = _norm(label or wanted)
+            for text, value in choices:
+                if _norm(text) == label:
+                    params.append((name, value))
+                    return
+            missed.append(f"{name}={wanted}")
+
+        for s in self.sources:
+            push("filter-source", s, raw=True)
+        for level in self.levels:
+            push("filter-level", str(level), _level_label(level), raw=True)
+        for r in self.rarities:
+            push("filter-rarity", r)
+        if self.cr_min:
+            push("filter-cr-min", self.cr_min)
+        if self.cr_max:
+            push("filter-cr-max", self.cr_max)
+        params.extend(self.params)
+        return params, missed
+
+    def matches(self, row: Mapping[str, str]) -> bool:
+        """True if the parsed row satisfies every filter that can be checked client-side."""
+        names = [_norm(s) for s in self.sources if not s.isdigit()]
+        if names and _norm(row.get("SOURCE", "")) not in names:
+            return False
+        if self.levels and spell_level(row.get("LEVEL")) not in self.levels:
+            return False
+        if self.rarities and _norm(row.get("RARITY", "")) not in {_norm(r) for r in self.rarities}:
+            return False
+        if self.cr_min or self.cr_max:
+            cr = parse_cr(row.get("CR"))
+            if cr is None:
+                return False
+            if self.cr_min and cr < (parse_cr(self.cr_min) or 0):
+                return False
+            if self.cr_max and parse_cr(self.cr_max) is not None and cr > parse_cr(self.cr_max):
+                return False
+        return True
+
+    def slug(self) -> str:
+        """Short file-name tag, e.g. 'source-monster-manual-2024_cr-1-4-5'."""
+        parts = []
+        if self.sources:
+            parts.append("source-" + "-".join(self.sources))
+        if self.levels:
+            parts.append("level-" + "-".join(str(n) for n in self.levels))
+        if self.rarities:
+            parts.append("rarity-" + "-".join(self.rarities))
+        if self.cr_min or self.cr_max:
+            parts.append(f"cr-{self.cr_min or 'min'}-{self.cr_max or 'max'}")
+        if self.params:
+            parts.append("-".join(f"{k}-{v}" for k, v in self.params))
+        return "_".join(_SLUG_RE.sub("-", p.lower()).strip("-") for p in parts)
+
+
+def form_options(driver) -> Dict[str, List[List[str]]]:
+    """Labels and values of the filter-* controls on the current listing page."""
+    try:
+        return driver.execute_script(FORM_OPTIONS_JS) or {}
+    except Exception:
+        return {}
+
+
+def filtered_path(path: str, listing_filter: ListingFilter) -> str:
+    """path with the filter's slug before the extension: x-data.csv -> x-data-<slug>.csv."""
+    root, ext = path.rsplit(".", 1) if "." in path.rsplit("/", 1)[-1] else (path, "")
+    tagged = f"{root}-{listing_filter.slug()}"
+    return f"{tagged}.{ext}" if ext else tagged
@@ -0,0 +1,76 @@
+"""
+Targeted 5e.tools lookups through a list page's search box.
+
+Walking a 5e.tools list to match a few names clicks every row above them;
+here each name is typed into the list's search box instead, and the href
+of the row it filters down to is read (the source is in its fragment,
+'#fireball_xphb'). Nothing is clicked, so N names cost N searches
+wherever they sit in the list:
+
+    driver.get("https://5e.tools/spells.html")
+    waits.present(driver, "#list", 20)
+    for key, source_short in search_sources(driver, {"fireball": "Fireball"}, "#list a.lst__row-inner", 3):
+        ...
+
+A search shows up as a "5e.tools lookup" span on the trace and in the
+metrics (scrape_5etools_lookups_total, scrape_5etools_lookup_misses_total).
+"""
+from __future__ import annotations
+
+from typing import Iterator, Mapping, Tuple
+from urllib.parse import unquote, urlsplit
+
+from selenium.common.exceptions import TimeoutException
+
+from common import metrics, trace, waits
+from common.text import clean, source_short_from_fragment
+
+# The list search box (5e.tools: #lst__search)
+SEARCH_INPUT = "#lst__search, input.lst__search, input.search"
+
+# Set the query and fire the events the list filters on
+_SEARCH_JS = """
+var ipt = arguments[0];
+ipt.value = arguments[1];
+['input', 'keyup', 'change', 'search'].forEach(function (type) {
+  ipt.dispatchEvent(new Event(type, {bubbles: true}));
+});
+"""
+
+# href of the first rendered row whose name normalizes (as norm_name) to args[1]
+_ROW_HREF = """
+var rows = document.querySelectorAll(args[0]);
+for (var i = 0; i < rows.length; i++) {
+  var s = rows[i].querySelector('span.bold, span.ve-col-3-5');
+  var name = (s ? s.textContent : '').toLowerCase().replace(/[^a-z0-9]+/g, '');
+  if (name === args[1]) return rows[i].getAttribute('href') || null;
+}
+return null;
+"""
+
+
+def search_sources(
+    driver, names: Mapping[str, str], row_selector: str, timeout: float
+) -> Iterator[Tuple[str, str]]:
+    """(normalized name, SOURCE_SHORT) for each of names found via the search box.
+
+    names maps normalized name -> the name to type (the D&D Beyond name).
+    Names with no matching row within timeout are skipped. Raises
+    TimeoutException when the page has no search box.
+    """
+    ipt = waits.present(driver, SEARCH_INPUT, timeout)
+    if ipt is None:
+        raise TimeoutException(SEARCH_INPUT)
+    for key, name in names.items():
+        query = clean(name).replace("’", "'").replace("‘", "'")
+        with trace.span("5e.tools lookup", "5etools", query=query) as span:
+            metrics.inc("5etools_lookups")
+            driver.execute_script(_SEARCH_JS, ipt, query)
+            href = waits.until(driver, _ROW_HREF, row_selector, key, timeout=timeout, label="wait lookup")
+            source_short = source_short_from_fragment(unquote(urlsplit(href or "").fragment))
+            span["found"] = bool(source_short)
+        if source_short:
+            yield key, source_short
+        else:
+            metrics.inc("5etools_lookup_misses")
+    driver.execute_script(_SEARCH_JS, ipt, "")
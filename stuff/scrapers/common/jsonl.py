@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+JSON Lines streaming output for the scrapers.
+
+With JSONL_OUTPUT set, a scraper writes one JSON object per row as soon as
+the row is parsed, so a loader can start inserting while the crawl is still
+running:
+
+    JSONL_OUTPUT = "-"                      # stdout; progress moves to stderr
+    JSONL_OUTPUT = "/tmp/spells.pipe"       # file or named pipe (mkfifo)
+
+    python stuff/scrapers/dndbeyond/dndbeyond_spell_scraper.py | node load.js
+
+Objects use the CSV column names. ID is an integer and CLASSES is a real
+array instead of JSON-in-CSV. Scrapers that fill columns in a later phase
+(SOURCE_SHORT from 5e.tools) emit the row again once it is complete, so a
+later line for the same ID supersedes an earlier one; loaders should upsert
+by ID.
+
+Opening a named pipe blocks until a reader opens the other end. Close the
+sink (or use it as a context manager) on every path, errors included: with
+"-" it is what puts sys.stdout back.
+"""
+from __future__ import annotations
+
+import json
+import sys
+from typing import Any, Dict, Iterable, Mapping, Optional, TextIO
+
+from common.columnar import LIST_COLUMNS, parse_classes
+
+
+def to_record(row: Mapping[str, Any]) -> Dict[str, Any]:
+    """CSV-shaped row -> JSON-ready dict (ID as int, CLASSES as a list)."""
+    out: Dict[str, Any] = dict(row)
+    try:
+        out["ID"] = int(str(row.get("ID", "")).strip())
+    except (TypeError, ValueError):
+        pass
+    for col in LIST_COLUMNS:
+        if col in out:
+            out[col] = parse_classes(out[col]) or []
+    return out
+
+
+class JsonlSink:
+    """Line-buffered JSONL writer to stdout ("-") or a file / named pipe."""
+
+    def __init__(self, target: str):
+        self.target = target
+        self.count = 0
+        self._saved_stdout: Optional[TextIO] = None
+        if target == "-":
+            # Keep the real stdout for rows; everything else printed (rich,
+            # print(), tracebacks) goes to stderr so the stream stays clean
+            self._stream: TextIO = sys.stdout
+            self._saved_stdout = sys.stdout
+            sys.stdout = sys.stderr
+        else:
+            self._stream = open(target, "w", encoding="utf-8", buffering=1)
+
+    def write(self, row: Mapping[str, Any]):
+        self._stream.write(json.dumps(to_record(row), ensure_ascii=False) + "\n")
+        self._stream.flush()
+        self.count += 1
+
+    def write_many(self, rows: Iterable[Mapping[str, Any]]):
+        for r in rows:
+            self.write(r)
+
+    def __enter__(self) -> "JsonlSink":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        if self._saved_stdout is not None:
+            sys.stdout = self._saved_stdout
+            self._saved_stdout = None
+            self._stream.flush()
+        elif not self._stream.closed:
+            self._stream.close()
@@ -0,0 +1,207 @@
+"""
+Machine-readable run metrics for scheduled scrapes.
+
+Counters are module-level and always on (an increment is a dict update), so
+the crawl code bumps them unconditionally; a script writes them only when
+METRICS_OUTPUT is set:
+
+    metrics.phase("Phase 1: Scraping D&D Beyond")   # also a trace / profile phase
+    metrics.inc("panel_expansions")
+    metrics.set_gauge("5etools_match_ratio", matched / total)
+    metrics.write("stuff/data/logs/spells", job="5etools_spells", rows=512, pages=11)
+
+write() produces <base>.prom (Prometheus textfile collector format, written
+atomically) and <base>.json with the same numbers:
+
+    scrape_duration_seconds            wall time since the process started
+    scrape_rows_total / _pages_total   rows and listing pages collected
+    scrape_rows_per_second / _pages_per_second
+    scrape_panel_expansions_total      more-info panels that needed a click
+    scrape_panel_timeouts_total        ... that never became ready
+    scrape_retries_total               fallback clicks, href navigation, reloads
+    scrape_stale_skips_total           rows that went stale (StaleElementReferenceException)
+    scrape_deferred_rows_total         stale or incomplete rows queued for a reload of their page
+    scrape_deferred_recovered_total    ... parsed complete on a reload
+    scrape_5etools_clicks_total        5e.tools rows clicked
+    scrape_5etools_lookups_total       5e.tools search-box lookups (common/fiveetools.py)
+    scrape_5etools_lookup_misses_total ... that found no matching row
+    scrape_pacing_backoffs_total       page delay increases (timeout, redirect, error or slow page)
+    scrape_page_delay_seconds          page delay the pacer ended on
+    scrape_filtered_out_total          rows a listing filter dropped client-side
+    scrape_invalid_rows_total          rows stream.validate() found a required column empty in
+    scrape_breaker_opens_total         circuit breaker openings (see common/retry.py)
+    scrape_breaker_wait_seconds_total  time paused by open breakers
+    scrape_5etools_match_ratio         rows that got a SOURCE_SHORT
+    scrape_peak_rss_bytes              peak resident memory of the Python process
+    scrape_phase_duration_seconds{phase="..."}
+    scrape_last_run_timestamp_seconds  when the run finished (alert on staleness)
+
+All series carry a job="<script>" label.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from common import profiling, trace
+
+_started = time.time()
+_counters: Counter = Counter()
+_gauges: Dict[str, float] = {}
+_phases: List[Tuple[str, float, Optional[float]]] = []  # (name, start, end)
+
+# Counters always present in the output, even when zero
+COUNTERS = (
+    "panel_expansions",
+    "panel_timeouts",
+    "retries",
+    "stale_skips",
+    "deferred_rows",
+    "5etools_clicks",
+    "pacing_backoffs",
+)
+
+HELP = {
+    "duration_seconds": "Wall time of the run.",
+    "rows_total": "Rows collected.",
+    "pages_total": "Listing pages processed.",
+    "rows_per_second": "Rows collected per second of wall time.",
+    "pages_per_second": "Listing pages processed per second of wall time.",
+    "panel_expansions_total": "More-info panels that had to be opened with a click.",
+    "panel_timeouts_total": "More-info panels that never became ready.",
+    "retries_total": "Fallback clicks, href navigations and page reloads.",
+    "stale_skips_total": "Rows that went stale (StaleElementReferenceException) while parsed.",
+    "deferred_rows_total": "Stale or incomplete rows queued for a reload of their page.",
+    "deferred_recovered_total": "Deferred rows parsed complete on a reload.",
+    "deferred_lost_total": "Pages whose stale rows were still missing after the reloads.",
+    "5etools_clicks_total": "5e.tools rows clicked.",
+    "5etools_lookups_total": "Names looked up through a 5e.tools list's search box.",
+    "5etools_lookup_misses_total": "5e.tools lookups that found no row with the name.",
+    "pacing_backoffs_total": "Times the adaptive page delay backed off.",
+    "breaker_opens_total": "Times a host's circuit breaker opened and paused the crawl.",
+    "breaker_wait_seconds_total": "Time spent waiting for open circuit breakers.",
+    "invalid_rows_total": "Rows with an empty required column (common/stream.py validate()).",
+    "filtered_out_total": "Listing rows dropped by the listing filter's per-row check.",
+    "pacing_timeout_total": "Pages that did not load in time.",
+    "pacing_redirect_total": "Pages that landed off the expected host.",
+    "pacing_error_total": "Pages whose title reads like an error or throttle page.",
+    "pacing_slow_total": "Pages that loaded much slower than usual.",
+    "page_delay_seconds": "Delay between page loads at the end of the run.",
+    "5etools_match_ratio": "Share of rows that got a SOURCE_SHORT from 5e.tools.",
+    "peak_rss_bytes": "Peak resident set size of the scraper process.",
+    "phase_duration_seconds": "Duration of each phase of the run.",
+    "last_run_timestamp_seconds": "Unix time the run finished.",
+}
+
+
+def inc(name: str, n: int = 1):
+    _counters[name] += n
+
+
+def set_gauge(name: str, value: float):
+    _gauges[name] = value
+
+
+def phase(name: Optional[str]):
+    """End the current phase and start the next (None just ends it).
+
+    Also the phase boundary for the trace and the per-phase profiles.
+    """
+    now = time.time()
+    if _phases and _phases[-1][2] is None:
+        _phases[-1] = (_phases[-1][0], _phases[-1][1], now)
+    if name:
+        _phases.append((name, now, None))
+    trace.phase(name)
+    profiling.phase(name)
+
+
+def peak_rss_bytes() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil
+
+            info = psutil.Process().memory_info()
+            return int(getattr(info, "peak_wset", info.rss))
+        except Exception:
+            return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+def snapshot(job: str, rows: int = 0, pages: int = 0) -> Dict[str, Any]:
+    """Current values as a flat dict (the JSON document)."""
+    phase(None)
+    end = time.time()
+    duration = end - _started
+    data: Dict[str, Any] = {
+        "job": job,
+        "duration_seconds": round(duration, 3),
+        "rows_total": rows,
+        "pages_total": pages,
+        "rows_per_second": round(rows / duration, 4) if duration else 0.0,
+        "pages_per_second": round(pages / duration, 4) if duration else 0.0,
+    }
+    for name in sorted(set(COUNTERS) | set(_counters)):
+        data[f"{name}_total"] = _counters[name]
+    for name, value in sorted(_gauges.items()):
+        data[name] = round(value, 4)
+    rss = peak_rss_bytes()
+    if rss is not None:
+        data["peak_rss_bytes"] = rss
+    data["phase_duration_seconds"] = {
+        name: round((stop or end) - start, 3) for name, start, stop in _phases
+    }
+    data["last_run_timestamp_seconds"] = int(end)
+    return data
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(data: Dict[str, Any]) -> str:
+    """Render a snapshot in the Prometheus text exposition format."""
+    job = _escape(data["job"])
+    lines: List[str] = []
+    for key, value in data.items():
+        if key == "job":
+            continue
+        metric = "scrape_" + key
+        kind = "counter" if key.endswith("_total") else "gauge"
+        if key in HELP:
+            lines.append(f"# HELP {metric} {HELP[key]}")
+        lines.append(f"# TYPE {metric} {kind}")
+        if isinstance(value, dict):
+            for label, v in value.items():
+                lines.append(f'{metric}{{job="{job}",phase="{_escape(label)}"}} {v}')
+        else:
+            lines.append(f'{metric}{{job="{job}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def _write_atomic(path: str, text: str):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def write(base: str, job: str, rows: int = 0, pages: int = 0) -> List[str]:
+    """Write <base>.prom and <base>.json. Returns the paths written."""
+    base = base[: -len(".prom")] if base.endswith(".prom") else base
+    base = base[: -len(".json")] if base.endswith(".json") else base
+    d = os.path.dirname(base)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    data = snapshot(job, rows, pages)
+    _write_atomic(base + ".prom", prometheus_text(data))
+    _write_atomic(base + ".json", json.dumps(data, indent=2) + "\n")
+    return [base + ".prom", base + ".json"]
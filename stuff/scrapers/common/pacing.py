@@ -0,0 +1,141 @@
+"""
+Adaptive page pacing: an AIMD controller on the delay between page loads.
+
+A fixed 2-4s random delay is too slow while the site answers quickly and too
+eager once it starts throttling. AimdPacer treats 1 / delay as a request
+rate and runs additive-increase / multiplicative-decrease on it, like TCP
+congestion control:
+
+ - each healthy page adds `increase` pages/s to the rate (the delay shrinks
+   towards `floor`);
+ - a congestion signal multiplies the rate by `decrease` (the delay grows
+   towards `ceiling`).
+
+Congestion signals, from observe() / page_problem():
+
+    timeout    the next page never showed up
+    redirect   the browser ended up off the expected host (login, captcha)
+    error      the page title reads like a throttle / error page
+    slow       the load took more than slow_factor x the usual load time
+
+The usual load time is an exponential moving average of past loads, so a
+site that is slow all the time is not treated as throttling forever.
+
+pause() counts from the end of the previous pause, i.e. from the previous
+request, so time spent parsing a page already counts towards the delay.
+A fixed pacer (tuning.adaptive_pacing False, --fixed-pacing) always sleeps
+the whole delay, as the old fixed random range did.
+
+    pacer = AimdPacer.from_tuning(tuning)
+    pacer.pause()                                   # before navigating
+    ... navigate, t = load seconds ...
+    pacer.observe(t, page_problem(driver, "www.dndbeyond.com"))
+"""
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+from urllib.parse import urlsplit
+
+from common import metrics, trace
+
+# Title fragments of rate-limit, WAF and server error pages
+ERROR_MARKERS = (
+    "too many requests",
+    "rate limit",
+    "access denied",
+    "attention required",
+    "just a moment",
+    "service unavailable",
+    "bad gateway",
+    "gateway time",
+    "error 429",
+    "error 503",
+    "error 1015",
+)
+
+
+def page_problem(driver, expected_host: str) -> Optional[str]:
+    """"redirect" / "error" when the loaded page is not a normal page of expected_host."""
+    try:
+        host = urlsplit(driver.current_url).hostname or ""
+        title = (driver.title or "").lower()
+    except Exception:
+        return "error"
+    if expected_host and host != expected_host and not host.endswith("." + expected_host):
+        return "redirect"
+    if any(m in title for m in ERROR_MARKERS):
+        return "error"
+    return None
+
+
+@dataclass
+class AimdPacer:
+    """Delay between page loads, adapted within [floor, ceiling] seconds."""
+
+    floor: float
+    ceiling: float
+    delay: float
+    increase: float = 0.05  # pages/s added to the rate per healthy page
+    decrease: float = 0.5  # rate multiplier on a congestion signal
+    slow_factor: float = 2.0  # a load this many times the usual one is "slow"
+    jitter: float = 0.25  # each pause is delay * (1 +/- jitter)
+    smoothing: float = 0.2  # weight of the newest load in the usual load time
+    usual_load: Optional[float] = None
+    fixed: bool = False  # sleep the whole delay on every pause
+    _last: Optional[float] = field(default=None, repr=False)  # end of the previous pause
+
+    @classmethod
+    def from_tuning(cls, tuning) -> "AimdPacer":
+        """Start at the configured page delay range; adapt within the pacing bounds.
+
+        Without tuning.adaptive_pacing the bounds are page_delay_min/max and
+        the delay never moves and every pause sleeps all of it, which is the
+        old fixed random range.
+        """
+        start = (tuning.page_delay_min + tuning.page_delay_max) / 2
+        if not tuning.adaptive_pacing:
+            spread = (tuning.page_delay_max - tuning.page_delay_min) / 2
+            return cls(start, start, start, increase=0.0, decrease=1.0,
+                       jitter=spread / start if start else 0.0, fixed=True)
+        floor = min(tuning.pacing_floor, tuning.page_delay_min)
+        ceiling = max(tuning.pacing_ceiling, tuning.page_delay_max)
+        return cls(floor, ceiling, start)
+
+    def pause(self, name: str = "page delay"):
+        """Sleep until the current delay (with jitter) has passed since the previous pause.
+
+        A fixed pacer sleeps the whole delay, however long ago that was.
+        """
+        metrics.set_gauge("page_delay_seconds", round(self.delay, 3))
+        seconds = self.delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+        if self._last is not None and not self.fixed:
+            seconds -= time.perf_counter() - self._last
+        if seconds > 0:
+            trace.sleep(seconds, name)
+        self._last = time.perf_counter()
+
+    def observe(self, load_seconds: Optional[float], problem: Optional[str] = None) -> Optional[str]:
+        """Feed one page load (None = timed out); returns the congestion signal, if any."""
+        if problem is None and load_seconds is None:
+            problem = "timeout"
+        if problem is None and self.usual_load and load_seconds > self.slow_factor * self.usual_load:
+            problem = "slow"
+        if load_seconds is not None:
+            self.usual_load = (
+                load_seconds if self.usual_load is None
+                else self.smoothing * load_seconds + (1 - self.smoothing) * self.usual_load
+            )
+        if problem:
+            metrics.inc("pacing_backoffs")
+            metrics.inc(f"pacing_{problem}")
+            if self.delay > 0:
+                self.delay = min(self.ceiling, self.delay / self.decrease)
+            else:
+                self.delay = min(self.ceiling, max(self.floor, 1.0))
+        elif self.delay > 0:
+            self.delay = max(self.floor, 1 / (1 / self.delay + self.increase))
+        metrics.set_gauge("page_delay_seconds", round(self.delay, 3))
+        return problem
@@ -0,0 +1,168 @@
+"""
+Per-phase cProfile profiles of scrape runs.
+
+Profiling is off unless enable() is called. metrics.phase() (which every
+script already calls at each "Phase N: ..." boundary) then stops the
+previous phase's profiler and starts a new one, so each phase gets its own
+file:
+
+    profiling.enable("stuff/data/logs/profile-spells")
+    metrics.phase("Phase 1: Scraping D&D Beyond")     # -> 01-phase-1-scraping-d-d-beyond.prof
+    ...
+    profiling.save()                                  # closes the phase, writes summary.txt
+
+The .prof files open with `python -m pstats`, snakeviz or tuna. summary.txt
+(also printed) splits each phase's time into waiting (socket reads to
+chromedriver, sleeps, lock/select waits) and Python, and lists the top
+Python functions by own time. That shows whether a phase is bound by the
+browser or by our own code (regexes, progress descriptions, CSV writing).
+
+Only the main thread is profiled; rich's refresh thread is not.
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import os
+import pstats
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from rich.console import Console
+from rich.table import Table
+
+TOP = 15
+
+# Built-ins where the main thread is blocked rather than running Python
+WAIT_FUNCTIONS = (
+    "<method 'recv_into' of '_socket.socket' objects>",
+    "<method 'recv' of '_socket.socket' objects>",
+    "<built-in method time.sleep>",
+    "<built-in method select.select>",
+    "<method 'poll' of 'select.poll' objects>",
+    "<method 'acquire' of '_thread.lock' objects>",
+    "<method 'acquire' of '_thread.RLock' objects>",
+)
+
+_profiler: Optional["PhaseProfiler"] = None
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "phase"
+
+
+def _label(key: Tuple[str, int, str]) -> str:
+    filename, line, func = key
+    if filename == "~":
+        return func
+    return f"{os.path.basename(filename)}:{line}({func})"
+
+
+class PhaseProfiler:
+    """One cProfile.Profile per phase, written to out_dir."""
+
+    def __init__(self, out_dir: str, top: int = TOP):
+        self.out_dir = out_dir
+        self.top = top
+        # (name, path, wall seconds, stats)
+        self.phases: List[Tuple[str, str, float, pstats.Stats]] = []
+        self._current: Optional[Tuple[str, cProfile.Profile, float]] = None
+
+    def phase(self, name: Optional[str]):
+        if self._current is not None:
+            label, prof, started = self._current
+            prof.disable()
+            wall = time.perf_counter() - started
+            os.makedirs(self.out_dir, exist_ok=True)
+            path = os.path.join(self.out_dir, f"{len(self.phases) + 1:02d}-{_slug(label)}.prof")
+            prof.dump_stats(path)
+            self.phases.append((label, path, wall, pstats.Stats(prof)))
+            self._current = None
+        if name:
+            prof = cProfile.Profile()
+            self._current = (name, prof, time.perf_counter())
+            prof.enable()
+
+    def summary(self) -> List[Dict[str, Any]]:
+        out = []
+        for name, path, wall, stats in self.phases:
+            wait = 0.0
+            funcs = []
+            for key, (_cc, ncalls, tottime, cumtime, _callers) in stats.stats.items():
+                if key[0] == "~" and key[2] in WAIT_FUNCTIONS:
+                    wait += tottime
+                else:
+                    funcs.append((tottime, cumtime, ncalls, _label(key)))
+            funcs.sort(reverse=True)
+            python = max(0.0, stats.total_tt - wait)
+            out.append({
+                "phase": name,
+                "file": path,
+                "wall_s": round(wall, 3),
+                "wait_s": round(wait, 3),
+                "python_s": round(python, 3),
+                "top": [
+                    {"function": label, "calls": n, "tottime_s": round(tt, 4), "cumtime_s": round(ct, 4)}
+                    for tt, ct, n, label in funcs[: self.top]
+                ],
+            })
+        return out
+
+    def text(self, summary: List[Dict[str, Any]]) -> str:
+        buf = io.StringIO()
+        for p in summary:
+            share = 100 * p["wait_s"] / p["wall_s"] if p["wall_s"] else 0.0
+            buf.write(
+                f"== {p['phase']}: {p['wall_s']:.2f}s wall, {p['wait_s']:.2f}s waiting "
+                f"({share:.0f}%), {p['python_s']:.2f}s Python  [{os.path.basename(p['file'])}]\n"
+            )
+            buf.write(f"   {'calls':>9} {'tottime':>9} {'cumtime':>9}  function\n")
+            for f in p["top"]:
+                buf.write(
+                    f"   {f['calls']:>9} {f['tottime_s']:>9.3f} {f['cumtime_s']:>9.3f}  {f['function']}\n"
+                )
+            buf.write("\n")
+        return buf.getvalue()
+
+
+def enable(out_dir: str, top: int = TOP) -> PhaseProfiler:
+    """Profile each phase from the next phase() call on (once per process)."""
+    global _profiler
+    if _profiler is None:
+        _profiler = PhaseProfiler(out_dir, top)
+    return _profiler
+
+
+def enabled() -> bool:
+    return _profiler is not None
+
+
+def phase(name: Optional[str]):
+    """Close the current phase's profile and start the next one (None just closes it)."""
+    if _profiler is not None:
+        _profiler.phase(name)
+
+
+def save(console: Optional[Console] = None) -> Optional[str]:
+    """Close the open phase, print the wait/Python split and write summary.txt.
+
+    Returns the summary path, or None if profiling is off.
+    """
+    if _profiler is None:
+        return None
+    _profiler.phase(None)
+    summary = _profiler.summary()
+    console = console or Console()
+    table = Table(title="Profile by phase")
+    for col in ("Phase", "Wall s", "Waiting s", "Python s", "Top Python function"):
+        table.add_column(col, justify="left" if col in ("Phase", "Top Python function") else "right")
+    for p in summary:
+        top = p["top"][0]["function"] if p["top"] else ""
+        table.add_row(p["phase"], f"{p['wall_s']:.2f}", f"{p['wait_s']:.2f}", f"{p['python_s']:.2f}", top)
+    console.print(table)
+    os.makedirs(_profiler.out_dir, exist_ok=True)
+    path = os.path.join(_profiler.out_dir, "summary.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(_profiler.text(summary))
+    return path
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Compact row records for scraped spells, magic items and monsters.
+
+A parsed row used to be a 17-19 key dict of strings. SpellRow, ItemRow and
+MonsterRow store the same columns in __slots__ instead, and intern the
+values of low-cardinality columns (SOURCE, SCHOOL, TYPE, SIZE, RARITY, ...)
+so thousands of rows share one string per distinct value.
+
+Records behave like the dicts they replace: r["NAME"], r.get("SLUG", ""),
+r["SOURCE_SHORT"] = "xphb", "SLUG" in r, dict(r) and csv.DictWriter all
+work. Only columns that were set count as present, exactly like dict keys;
+assigning a column the record type does not have raises KeyError.
+
+Compare the footprint against plain dicts on the committed CSVs:
+    python stuff/scrapers/common/records.py
+"""
+from __future__ import annotations
+
+import csv
+import gc
+import sys
+import tracemalloc
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Mapping, Optional, Tuple
+
+# Repeated across many rows; interned on assignment
+INTERNED_COLUMNS: FrozenSet[str] = frozenset({
+    "LEVEL",
+    "CASTING_TIME",
+    "RANGE",
+    "AREA",
+    "AREA_SHAPE",
+    "COMPONENTS",
+    "DURATION",
+    "SCHOOL",
+    "ATTACK_SAVE",
+    "DAMAGE_EFFECT",
+    "CLASSES",
+    "RARITY",
+    "TYPE",
+    "ATTUNEMENT",
+    "CR",
+    "SIZE",
+    "ALIGNMENT",
+    "HABITAT",
+    "SOURCE",
+    "SOURCE_SHORT",
+})
+
+
+class Record(MutableMapping):
+    """Dict-like row with a fixed set of columns stored in __slots__."""
+
+    __slots__ = ()
+    FIELDS: Tuple[str, ...] = ()
+    _FIELD_SET: FrozenSet[str] = frozenset()
+    _INTERN: FrozenSet[str] = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.FIELDS = tuple(cls.__slots__)
+        cls._FIELD_SET = frozenset(cls.FIELDS)
+        cls._INTERN = cls._FIELD_SET & INTERNED_COLUMNS
+
+    def __init__(self, **values: Any):
+        for k, v in values.items():
+            self[k] = v
+
+    @classmethod
+    def from_mapping(cls, row: Mapping[str, Any]):
+        """Build from a dict / csv.DictReader row, ignoring unknown columns."""
+        rec = cls()
+        for k, v in row.items():
+            if k in cls._FIELD_SET:
+                rec[k] = v
+        return rec
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._FIELD_SET:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self._FIELD_SET:
+            raise KeyError(f"{type(self).__name__} has no column {key!r}")
+        if key in self._INTERN and type(value) is str:
+            value = sys.intern(value)
+        object.__setattr__(self, key, value)
+
+    def __delitem__(self, key: str):
+        if key not in self._FIELD_SET:
+            raise KeyError(key)
+        try:
+            object.__delattr__(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __iter__(self) -> Iterator[str]:
+        for f in self.FIELDS:
+            if hasattr(self, f):
+                yield f
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+class SpellRow(Record):
+    __slots__ = (
+        "ID",
+        "NAME",
+        "NAME_LOWER",
+        "SLUG",
+        "LEVEL",
+        "CASTING_TIME",
+        "RANGE",
+        "AREA",
+        "AREA_SHAPE",
+        "COMPONENTS",
+        "MATERIAL_COMPONENTS",
+        "DURATION",
+        "SCHOOL",
+        "ATTACK_SAVE",
+        "DAMAGE_EFFECT",
+        "DESCRIPTION",
+        "CLASSES",
+        "SOURCE",
+        "SOURCE_SHORT",
+        "URL",
+    )
+
+
+class ItemRow(Record):
+    __slots__ = (
+        "ID",
+        "NAME",
+        "NAME_LOWER",
+        "SLUG",
+        "RARITY",
+        "TYPE",
+        "ATTUNEMENT",
+        "NOTES",
+        "SOURCE",
+        "SOURCE_SHORT",
+        "URL",
+    )
+
+
+class MonsterRow(Record):
+    __slots__ = (
+        "ID",
+        "NAME",
+        "NAME_LOWER",
+        "SLUG",
+        "CR",
+        "TYPE",
+        "SIZE",
+        "ALIGNMENT",
+        "HABITAT",
+        "SOURCE",
+        "SOURCE_SHORT",
+        "URL",
+    )
+
+
+# --- measurement -----------------------------------------------------------
+MEASURE_FILES: List[Tuple[str, type]] = [
+    ("stuff/data/dndbeyond-spells-data.csv", SpellRow),
+    ("stuff/data/5etools/spells.csv", SpellRow),
+    ("stuff/data/dndbeyond-magicitems-data.csv", ItemRow),
+    ("stuff/data/magicitems-with-sources.csv", ItemRow),
+    ("stuff/data/5etools/magic_items.csv", ItemRow),
+    ("stuff/data/dndbeyond-monsters-data.csv", MonsterRow),
+]
+
+
+def _traced_size(build: Callable[[], List[Any]]) -> Tuple[int, List[Any]]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        rows = build()
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return after - before, rows
+
+
+def measure(path: str, record_cls: type, scale: int = 1) -> Optional[Dict[str, int]]:
+    """Bytes held by the rows of `path` (repeated `scale` times) as dicts vs records."""
+    try:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            lines = f.read().splitlines(keepends=True)
+    except OSError:
+        return None
+    header, body = lines[0], lines[1:] * scale
+
+    def as_dicts():
+        return list(csv.DictReader([header, *body]))
+
+    def as_records():
+        return [record_cls.from_mapping(r) for r in csv.DictReader([header, *body])]
+
+    dict_bytes, rows = _traced_size(as_dicts)
+    del rows
+    rec_bytes, rows = _traced_size(as_records)
+    return {"rows": len(rows), "dict_bytes": dict_bytes, "record_bytes": rec_bytes}
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Compare row memory: dicts vs slotted records.")
+    ap.add_argument("--scale", type=int, default=1, help="repeat each CSV's rows N times")
+    args = ap.parse_args(argv)
+
+    print(f"{'file':48} {'rows':>7} {'dict KiB':>10} {'record KiB':>11} {'saved':>6}")
+    for path, cls in MEASURE_FILES:
+        m = measure(path, cls, args.scale)
+        if m is None:
+            print(f"{path:48} (missing)")
+            continue
+        saved = 1 - m["record_bytes"] / m["dict_bytes"] if m["dict_bytes"] else 0.0
+        print(
+            f"{path:48} {m['rows']:>7} {m['dict_bytes'] / 1024:>10.0f} "
+            f"{m['record_bytes'] / 1024:>11.0f} {saved:>6.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
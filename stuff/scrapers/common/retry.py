@@ -0,0 +1,138 @@
+"""
+Retries with jittered exponential backoff, and a circuit breaker per host.
+
+retry() calls an attempt function until it returns something truthy. Each
+failed attempt (falsy result or exception) is followed by a "full jitter"
+backoff, uniform(0, min(cap, base * 2**n)) seconds, so many rows that fail
+together do not retry in lockstep:
+
+    ok = retry(lambda: load(url), attempts=3, base=1.0, cap=30.0,
+               breaker=breaker("www.dndbeyond.com"), name="page load")
+
+A CircuitBreaker counts consecutive failures for its host. After
+`threshold` in a row it opens: the next attempt first waits out a cooldown
+(doubling, up to max_cooldown, each time a trial after a cooldown fails)
+instead of paying one timeout per row while the site is down. The first
+attempt after the cooldown is the trial (half-open); a success closes the
+breaker again. Openings and waits show up in the metrics
+(scrape_breaker_opens_total, scrape_breaker_wait_seconds_total) and the
+waits as sleep spans in the trace.
+"""
+from __future__ import annotations
+
+import random
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+from common import metrics, trace
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+def backoff(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter delay before retry number attempt (0-based)."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker for one host."""
+
+    def __init__(self, host: str, threshold: int = 5, cooldown: float = 30.0, max_cooldown: float = 300.0):
+        self.host = host
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        # Called with (host, new state, cooldown seconds) on every state change
+        self.on_change: Optional[Callable[[str, str, float], None]] = None
+
+    def _set(self, state: str):
+        self.state = state
+        if self.on_change:
+            self.on_change(self.host, state, self.cooldown)
+
+    def before(self) -> float:
+        """Wait out an open breaker (seconds waited); the next call is the trial."""
+        if self.state != OPEN:
+            return 0.0
+        remaining = self.opened_at + self.cooldown - time.monotonic()
+        if remaining > 0:
+            trace.sleep(remaining, f"breaker open: {self.host}")
+            metrics.inc("breaker_wait_seconds", round(remaining, 3))
+        self._set(HALF_OPEN)
+        return max(0.0, remaining)
+
+    def success(self):
+        self.failures = 0
+        if self.state != CLOSED:
+            self.cooldown = self.base_cooldown
+            self._set(CLOSED)
+
+    def failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+            self._open()
+        elif self.state == CLOSED and self.failures >= self.threshold:
+            self._open()
+
+    def _open(self):
+        self.opened_at = time.monotonic()
+        metrics.inc("breaker_opens")
+        self._set(OPEN)
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def breaker(host: str, **kwargs) -> CircuitBreaker:
+    """The process-wide breaker for host (kwargs only apply when it is created)."""
+    if host not in _breakers:
+        _breakers[host] = CircuitBreaker(host, **kwargs)
+    return _breakers[host]
+
+
+def retry(
+    attempt: Callable[[], Any],
+    attempts: int = 3,
+    base: float = 1.0,
+    cap: float = 30.0,
+    breaker: Optional[CircuitBreaker] = None,
+    name: str = "retry",
+    fatal: Tuple[Type[BaseException], ...] = (),
+) -> Any:
+    """attempt() until it returns something truthy; returns the last result.
+
+    An exception counts as a failed attempt; if the last attempt raises, the
+    exception propagates. Exceptions in fatal (e.g. a stale row element)
+    propagate at once and do not count against the breaker.
+    """
+    result = None
+    for n in range(max(1, attempts)):
+        if n:
+            metrics.inc("retries")
+            trace.sleep(backoff(n - 1, base, cap), f"{name} backoff")
+        if breaker is not None:
+            breaker.before()
+        try:
+            result = attempt()
+        except fatal:
+            raise
+        except Exception:
+            if breaker is not None:
+                breaker.failure()
+            if n == max(1, attempts) - 1:
+                raise
+            continue
+        if result:
+            if breaker is not None:
+                breaker.success()
+            return result
+        if breaker is not None:
+            breaker.failure()
+    return result
@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+"""
+SQLite row store: the scrapers' single system of record.
+
+One table per entity (spells, magic_items, monsters), keyed by the D&D Beyond
+ID, in WAL mode so several scrapers can write while another process reads.
+Scrapers upsert each row as soon as it is parsed; the CSVs under stuff/data
+are then generated from views (see CSV_VIEWS) instead of being written from
+whatever a single run happened to collect.
+
+Merge rules for upserts:
+ - only the columns present in the row are touched
+ - an empty value never overwrites a non-empty one (a timed-out panel does
+   not wipe the SOURCE a previous run found)
+ - unchanged rows are not rewritten, so a re-crawl costs O(changed rows)
+ - NAME_LOWER / SLUG are derived from NAME / URL when not given, and
+   CLASSES is stored as a JSON array whatever shape it arrives in
+
+CLI:
+    python stuff/scrapers/common/rowstore.py import spells stuff/data/5etools/spells.csv
+    python stuff/scrapers/common/rowstore.py export            # all CSV views
+    python stuff/scrapers/common/rowstore.py export dndbeyond_monsters_data
+    python stuff/scrapers/common/rowstore.py stats
+
+The crawl_state table holds one resume checkpoint (last page reached) per
+listing; see ListingCrawler.run in common/crawl.py.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+# Also run directly as a CLI; make `common` importable either way
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import trace  # noqa: E402
+from common.records import ItemRow, MonsterRow, Record, SpellRow  # noqa: E402
+
+DEFAULT_DB = "stuff/data/scrapers.sqlite3"
+
+ENTITY_COLUMNS: Dict[str, List[str]] = {
+    "spells": [
+        "ID",
+        "NAME",
+        "NAME_LOWER",
+        "SLUG",
+        "LEVEL",
+        "CASTING_TIME",
+        "RANGE",
+        "AREA",
+        "AREA_SHAPE",
+        "COMPONENTS",
+        "MATERIAL_COMPONENTS",
+        "DURATION",
+        "SCHOOL",
+        "ATTACK_SAVE",
+        "DAMAGE_EFFECT",
+        "DESCRIPTION",
+        "CLASSES",
+        "SOURCE",
+        "SOURCE_SHORT",
+        "URL",
+    ],
+    "magic_items": [
+        "ID",
+        "NAME",
+        "NAME_LOWER",
+        "SLUG",
+        "RARITY",
+        "TYPE",
+        "ATTUNEMENT",
+        "NOTES",
+        "SOURCE",
+        "SOURCE_SHORT",
+        "URL",
+    ],
+    "monsters": [
+        "ID",
+        "NAME",
+        "NAME_LOWER",
+        "SLUG",
+        "CR",
+        "TYPE",
+        "SIZE",
+        "ALIGNMENT",
+        "HABITAT",
+        "SOURCE",
+        "SOURCE_SHORT",
+        "URL",
+    ],
+}
+
+ENTITY_INDEXES: Dict[str, List[str]] = {
+    "spells": ["NAME_LOWER", "SOURCE_SHORT", "LEVEL"],
+    "magic_items": ["NAME_LOWER", "SOURCE_SHORT", "RARITY"],
+    "monsters": ["NAME_LOWER", "SOURCE_SHORT", "CR"],
+}
+
+RECORD_TYPES: Dict[str, type] = {
+    "spells": SpellRow,
+    "magic_items": ItemRow,
+    "monsters": MonsterRow,
+}
+
+# "; "-joined class list, as the original dndbeyond/ spell CSV had it. CLASSES
+# is '' (not JSON) when the more-info panel timed out, and json_each('') fails
+_CLASSES_JOINED = (
+    "CASE WHEN json_valid(CLASSES) "
+    "THEN (SELECT group_concat(value, '; ') FROM json_each(CLASSES)) ELSE CLASSES END"
+)
+
+# view name -> (table, columns, CSV path). A column is either a table column
+# or (output name, SQL expression).
+Column = Union[str, Tuple[str, str]]
+CSV_VIEWS: Dict[str, Tuple[str, List[Column], str]] = {
+    "dndbeyond_spells_urls": (
+        "spells",
+        ["ID", ("NAME", "SLUG"), "URL"],
+        "stuff/data/dndbeyond-spells-urls.csv",
+    ),
+    "dndbeyond_spells_data": (
+        "spells",
+        [
+            "ID",
+            ("NAME", "SLUG"),
+            "LEVEL",
+            "CASTING_TIME",
+            "RANGE",
+            "AREA",
+            "AREA_SHAPE",
+            "COMPONENTS",
+            "MATERIAL_COMPONENTS",
+            "DURATION",
+            "SCHOOL",
+            "ATTACK_SAVE",
+            "DAMAGE_EFFECT",
+            "DESCRIPTION",
+            ("CLASSES", _CLASSES_JOINED),
+            "SOURCE",
+            "URL",
+        ],
+        "stuff/data/dndbeyond-spells-data.csv",
+    ),
+    "5etools_spells_urls": (
+        "spells",
+        ["ID", "NAME", "URL"],
+        "stuff/data/5etools/spells-urls.csv",
+    ),
+    "5etools_spells_data": (
+        "spells",
+        [
+            "ID",
+            "NAME",
+            "NAME_LOWER",
+            "LEVEL",
+            "CASTING_TIME",
+            "RANGE",
+            "AREA",
+            "AREA_SHAPE",
+            "COMPONENTS",
+            "MATERIAL_COMPONENTS",
+            "DURATION",
+            "SCHOOL",
+            "ATTACK_SAVE",
+            "DAMAGE_EFFECT",
+            "CLASSES",
+            "SOURCE",
+            "URL",
+            "SOURCE_SHORT",
+            "SLUG",
+        ],
+        "stuff/data/5etools/spells-data.csv",
+    ),
+    "dndbeyond_magicitems_urls": (
+        "magic_items",
+        ["ID", "NAME", "URL"],
+        "stuff/data/dndbeyond-magicitems-urls.csv",
+    ),
+    "dndbeyond_magicitems_data": (
+        "magic_items",
+        ["ID", "NAME", "RARITY", "TYPE", "ATTUNEMENT", "NOTES", "SOURCE", "URL"],
+        "stuff/data/dndbeyond-magicitems-data.csv",
+    ),
+    "magicitems_with_sources": (
+        "magic_items",
+        ["ID", "NAME", "RARITY", "TYPE", "ATTUNEMENT", "NOTES", "SOURCE", "URL", "SOURCE_SHORT"],
+        "stuff/data/magicitems-with-sources.csv",
+    ),
+    "5etools_magicitems_urls": (
+        "magic_items",
+        ["ID", "NAME", "URL"],
+        "stuff/data/5etools/magicitems-urls.csv",
+    ),
+    "5etools_magicitems_data": (
+        "magic_items",
+        [
+            "ID",
+            "NAME",
+            "NAME_LOWER",
+            "RARITY",
+            "TYPE",
+            "ATTUNEMENT",
+            "NOTES",
+            "SOURCE",
+            "URL",
+            "SOURCE_SHORT",
+            "SLUG",
+        ],
+        "stuff/data/5etools/magicitems-data.csv",
+    ),
+    "dndbeyond_monsters_urls": (
+        "monsters",
+        ["ID", "NAME", "URL"],
+        "stuff/data/dndbeyond-monsters-urls.csv",
+    ),
+    "dndbeyond_monsters_data": (
+        "monsters",
+        ["NAME", "CR", "TYPE", "SIZE", "ALIGNMENT", "HABITAT", "SOURCE"],
+        "stuff/data/dndbeyond-monsters-data.csv",
+    ),
+}
+
+_SLUG_RE = re.compile(r"/\d+-([^/?#]+)")
+_URL_ID_RE = re.compile(r"/(\d+)-")
+
+
+def _classes_json(value: Any) -> str:
+    """Normalize CLASSES (list, JSON text or '; '-joined text) to a JSON array."""
+    if isinstance(value, (list, tuple)):
+        return json.dumps([str(v) for v in value if v], ensure_ascii=False)
+    t = str(value or "").strip()
+    if not t:
+        return ""
+    if t.startswith("["):
+        try:
+            parsed = json.loads(t)
+            if isinstance(parsed, list):
+                return json.dumps([str(v) for v in parsed if v], ensure_ascii=False)
+        except ValueError:
+            pass
+    return json.dumps([p.strip() for p in t.split(";") if p.strip()], ensure_ascii=False)
+
+
+class RowStore:
+    """Upsert-only row store over a WAL-mode SQLite file."""
+
+    def __init__(self, path: str = DEFAULT_DB):
+        d = os.path.dirname(path)
+        if d and not os.path.exists(d):
+            os.makedirs(d, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=30000")
+        self._stmts: Dict[Tuple[str, FrozenSet[str]], Tuple[str, List[str]]] = {}
+        self._create_schema()
+
+    # -- schema --------------------------------------------------------------
+    def _create_schema(self):
+        with self.conn:
+            for table, cols in ENTITY_COLUMNS.items():
+                col_defs = ", ".join(
+                    "ID INTEGER PRIMARY KEY" if c == "ID" else f"{c} TEXT NOT NULL DEFAULT ''"
+                    for c in cols
+                )
+                self.conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} ({col_defs}, UPDATED_AT REAL)"
+                )
+                for col in ENTITY_INDEXES[table]:
+                    self.conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS idx_{table}_{col.lower()} "
+                        f"ON {table}({col})"
+                    )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS crawl_state "
+                "(KEY TEXT PRIMARY KEY, PAGE INTEGER NOT NULL, URL TEXT NOT NULL, UPDATED_AT REAL)"
+            )
+            for view, (table, cols, _path) in CSV_VIEWS.items():
+                select = ", ".join(
+                    f'{c} AS "{c}"' if isinstance(c, str) else f'{c[1]} AS "{c[0]}"'
+                    for c in cols
+                )
+                self.conn.execute(f'DROP VIEW IF EXISTS "{view}"')
+                self.conn.execute(
+                    f'CREATE VIEW "{view}" AS SELECT {select} FROM {table} '
+                    f"ORDER BY NAME_LOWER, ID"
+                )
+
+    # -- writes --------------------------------------------------------------
+    def _prepare(self, table: str, row: Mapping[str, Any]) -> Dict[str, Any]:
+        known = ENTITY_COLUMNS[table]
+        out: Dict[str, Any] = {}
+        for k in known:
+            if k in row and row[k] is not None:
+                out[k] = row[k]
+        if not str(out.get("ID", "")).strip().isdigit():
+            raise ValueError(f"{table}: row has no numeric ID: {row.get('ID')!r}")
+        out["ID"] = int(str(out["ID"]).strip())
+        if "NAME_LOWER" not in out and out.get("NAME"):
+            out["NAME_LOWER"] = str(out["NAME"]).lower()
+        if "SLUG" not in out and out.get("URL"):
+            m = _SLUG_RE.search(str(out["URL"]))
+            if m:
+                out["SLUG"] = m.group(1)
+        if "CLASSES" in out:
+            out["CLASSES"] = _classes_json(out["CLASSES"])
+        for k, v in out.items():
+            if k != "ID":
+                out[k] = str(v)
+        return out
+
+    def _statement(self, table: str, cols: FrozenSet[str]) -> Tuple[str, List[str]]:
+        key = (table, cols)
+        if key not in self._stmts:
+            ordered = [c for c in ENTITY_COLUMNS[table] if c in cols]
+            data_cols = [c for c in ordered if c != "ID"]
+            merged = {c: f"COALESCE(NULLIF(excluded.{c}, ''), {table}.{c})" for c in data_cols}
+            placeholders = ", ".join(f":{c}" for c in ordered)
+            sql = f"INSERT INTO {table} ({', '.join(ordered)}, UPDATED_AT) VALUES ({placeholders}, :_ts)"
+            if data_cols:
+                sets = ", ".join(f"{c} = {merged[c]}" for c in data_cols)
+                changed = " OR ".join(f"{table}.{c} IS NOT {merged[c]}" for c in data_cols)
+                sql += (
+                    f" ON CONFLICT(ID) DO UPDATE SET {sets}, UPDATED_AT = excluded.UPDATED_AT"
+                    f" WHERE {changed}"
+                )
+            else:
+                sql += " ON CONFLICT(ID) DO NOTHING"
+            self._stmts[key] = (sql, ordered)
+        return self._stmts[key]
+
+    def _upsert_one(self, table: str, row: Mapping[str, Any]) -> bool:
+        values = self._prepare(table, row)
+        sql, _ = self._statement(table, frozenset(values))
+        cur = self.conn.execute(sql, {**values, "_ts": time.time()})
+        return cur.rowcount > 0
+
+    def upsert(self, table: str, row: Mapping[str, Any]) -> bool:
+        """Insert or merge one row in its own transaction. Returns True if it changed."""
+        with self.conn:
+            return self._upsert_one(table, row)
+
+    def upsert_many(self, table: str, rows: Iterable[Mapping[str, Any]]) -> int:
+        """Merge many rows in one transaction, skipping rows without an ID. Returns rows changed."""
+        changed = 0
+        with self.conn:
+            for row in rows:
+                try:
+                    changed += self._upsert_one(table, row)
+                except ValueError:
+                    continue
+        return changed
+
+    def find_id(self, table: str, row: Mapping[str, Any]) -> Optional[int]:
+        """ID of the stored row a CSV row refers to, or None if there is none.
+
+        By the row's ID, else the ID in its URL, else its NAME matched against
+        NAME_LOWER or SLUG (dndbeyond_spells_data exports SLUG as NAME) and
+        narrowed by SOURCE; a name that matches several rows gives None.
+        """
+        ident = str(row.get("ID") or "").strip()
+        if not ident.isdigit():
+            m = _URL_ID_RE.search(str(row.get("URL") or ""))
+            ident = m.group(1) if m else ""
+        if ident:
+            rec = self.conn.execute(f"SELECT ID FROM {table} WHERE ID = ?", (int(ident),)).fetchone()
+            return rec[0] if rec else None
+        name = str(row.get("NAME") or "").strip().lower()
+        if not name:
+            return None
+        sql = f"SELECT ID FROM {table} WHERE (NAME_LOWER = ? OR SLUG = ?)"
+        params = [name, name]
+        if row.get("SOURCE"):
+            sql += " AND SOURCE = ?"
+            params.append(str(row["SOURCE"]))
+        recs = self.conn.execute(sql + " LIMIT 2", params).fetchall()
+        return recs[0][0] if len(recs) == 1 else None
+
+    # -- resume checkpoints --------------------------------------------------
+    def save_checkpoint(self, key: str, page: int, url: str):
+        """Remember the last listing page reached for key (e.g. "spells")."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO crawl_state (KEY, PAGE, URL, UPDATED_AT) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(KEY) DO UPDATE SET PAGE = excluded.PAGE, URL = excluded.URL, "
+                "UPDATED_AT = excluded.UPDATED_AT",
+                (key, page, url, time.time()),
+            )
+
+    def checkpoint(self, key: str) -> Optional[Tuple[int, str]]:
+        """(page, url) saved for key, or None."""
+        rec = self.conn.execute(
+            "SELECT PAGE, URL FROM crawl_state WHERE KEY = ?", (key,)
+        ).fetchone()
+        return (int(rec[0]), rec[1]) if rec else None
+
+    def clear_checkpoint(self, key: str):
+        with self.conn:
+            self.conn.execute("DELETE FROM crawl_state WHERE KEY = ?", (key,))
+
+    # -- reads / export --------------------------------------------------------
+    def count(self, table: str) -> int:
+        return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def rows(self, table: str) -> List[Record]:
+        """All rows of a table as records of strings, in view order."""
+        cols = ENTITY_COLUMNS[table]
+        record_cls = RECORD_TYPES[table]
+        cur = self.conn.execute(
+            f"SELECT {', '.join(cols)} FROM {table} ORDER BY NAME_LOWER, ID"
+        )
+        return [
+            record_cls(**{c: "" if v is None else str(v) for c, v in zip(cols, rec)})
+            for rec in cur
+        ]
+
+    def view_rows(self, view: str) -> List[Dict[str, str]]:
+        """All rows of a CSV view as dicts of strings."""
+        if view not in CSV_VIEWS:
+            raise KeyError(f"Unknown view: {view!r}")
+        cur = self.conn.execute(f'SELECT * FROM "{view}"')
+        cols = [d[0] for d in cur.description]
+        return [{c: "" if v is None else str(v) for c, v in zip(cols, rec)} for rec in cur]
+
+    def export_view(self, view: str, path: Optional[str] = None) -> Tuple[str, int]:
+        """Write a CSV view to disk (default: its stuff/data path). Returns (path, rows)."""
+        if view not in CSV_VIEWS:
+            raise KeyError(f"Unknown view: {view!r}")
+        path = path or CSV_VIEWS[view][2]
+        d = os.path.dirname(path)
+        if d and not os.path.exists(d):
+            os.makedirs(d, exist_ok=True)
+        with trace.span(f"export {view}", "csv") as span_args:
+            cur = self.conn.execute(f'SELECT * FROM "{view}"')
+            header = [d[0] for d in cur.description]
+            n = 0
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                w = csv.writer(f)
+                w.writerow(header)
+                for rec in cur:
+                    w.writerow(["" if v is None else v for v in rec])
+                    n += 1
+            span_args["rows"] = n
+        return path, n
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="Scraper SQLite row store.")
+    ap.add_argument("--db", default=DEFAULT_DB, help=f"database file (default: {DEFAULT_DB})")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p_imp = sub.add_parser("import", help="merge existing CSV rows into a table")
+    p_imp.add_argument("table", choices=sorted(ENTITY_COLUMNS))
+    p_imp.add_argument("csv", nargs="+")
+    p_exp = sub.add_parser("export", help="regenerate CSVs from views")
+    p_exp.add_argument("views", nargs="*", help="view names (default: all)")
+    sub.add_parser("stats", help="row counts per table")
+    args = ap.parse_args(argv)
+
+    store = RowStore(args.db)
+    try:
+        if args.cmd == "import":
+            for path in args.csv:
+                with open(path, "r", encoding="utf-8", newline="") as f:
+                    changed = store.upsert_many(args.table, csv.DictReader(f))
+                print(f"{path} -> {args.table}: {changed} rows changed")
+        elif args.cmd == "export":
+            for view in args.views or list(CSV_VIEWS):
+                path, n = store.export_view(view)
+                print(f"{view} -> {path} ({n} rows)")
+        else:
+            for table in ENTITY_COLUMNS:
+                print(f"{table}: {store.count(table)} rows")
+                saved = store.checkpoint(table)
+                if saved:
+                    print(f"  resume checkpoint: page {saved[0]} ({saved[1]})")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+"""
+Entity specs for the D&D Beyond listing crawl engine (common/crawl.py).
+
+Each spec declares the listing URL, row / panel selectors, the field
+extractor and the record type it produces:
+
+    SPELLS       -> SpellRow   (ID, NAME, SLUG, LEVEL, ..., CLASSES, SOURCE, URL)
+    MAGIC_ITEMS  -> ItemRow    (ID, NAME, SLUG, RARITY, TYPE, ..., SOURCE, URL)
+    MONSTERS     -> MonsterRow (ID, NAME, SLUG, CR, TYPE, SIZE, ..., SOURCE, URL)
+
+Extractors read the compact row first and only open the inline "more-info"
+panel when a must-have field is still missing. Optional columns are enabled
+per run with dataclasses.replace(SPELLS, extras=frozenset({"DESCRIPTION"})).
+"""
+from __future__ import annotations
+
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.common.by import By
+
+from common.crawl import EntitySpec, ListingCrawler
+from common.records import ItemRow, MonsterRow, SpellRow
+from common.text import (
+    aoe_shape_from_class,
+    clean,
+    clean_material_text,
+    clean_school,
+    components_from_text,
+    is_dash_placeholder,
+    looks_like_source,
+    order_classes,
+    parse_range_area,
+    rarity_from_class,
+    school_from_name_span,
+    title_from_slug,
+)
+
+SOURCE_SELECTOR = ".more-info-footer-source"
+BLOCKED_SOURCE_SELECTOR = ".ddb-blocked-content-body-text-main"
+
+
+# --- spells ----------------------------------------------------------------
+def _stat_from_statblock(root, label: str) -> str:
+    """Find ddb-statblock value for label under root WebElement."""
+    lbl = label.lower()
+    xpath = (
+        ".//div[contains(@class,'ddb-statblock-item')]"
+        "[.//div[contains(translate(normalize-space(.),"
+        "'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),"
+        f"'{lbl}')]]//div[contains(@class,'ddb-statblock-item-value')]"
+    )
+    try:
+        return clean(root.find_element(By.XPATH, xpath).text)
+    except Exception:
+        return ""
+
+
+def _aoe_shape(root) -> str:
+    """Extract shape token from <i class='i-aoe-...'>, returning e.g. 'cube'."""
+    try:
+        icon = root.find_element(By.CSS_SELECTOR, ".aoe-size i")
+        return aoe_shape_from_class(icon.get_attribute("class"))
+    except Exception:
+        return ""
+
+
+def _classes(more) -> str:
+    try:
+        tags = more.find_elements(By.CSS_SELECTOR, ".more-info-footer-classes .tag")
+        return order_classes(clean(t.text) for t in tags)
+    except Exception:
+        return ""
+
+
+def _description(more) -> str:
+    """First paragraph of the panel description."""
+    try:
+        desc_container = more.find_element(By.CSS_SELECTOR, ".more-info-body-description")
+        p_els = desc_container.find_elements(By.CSS_SELECTOR, "> p")
+        if not p_els:
+            p_els = desc_container.find_elements(By.CSS_SELECTOR, "p")
+        if p_els:
+            return clean(p_els[0].text)
+    except Exception:
+        pass
+    return ""
+
+
+def _components_from_info(info_el) -> str:
+    """Fallback scraping of components from the compact .info row."""
+    try:
+        name_block = info_el.find_element(By.CSS_SELECTOR, ".row.spell-name")
+        found = components_from_text(name_block.text or "")
+        if found:
+            return found
+    except Exception:
+        pass
+    try:
+        comp = info_el.find_element(By.CSS_SELECTOR, ".row.spell-name span:last-child")
+        return clean(comp.text)
+    except Exception:
+        pass
+    return ""
+
+
+def parse_spell(crawler: ListingCrawler, info_el) -> SpellRow:
+    """Extract spell fields from a single listing row (listing-only)."""
+    spec = crawler.spec
+    id_, slug = crawler.parse_id_slug(info_el)
+    if not id_ or not slug:
+        return SpellRow(ID="")
+    want_description = "DESCRIPTION" in spec.extras
+
+    level = casting_time = range_raw = components = ""
+    duration = school = attack_save = damage_effect = ""
+    description = classes = source = ""
+    material_components = area_shape = name_text = ""
+
+    # Parse whatever is available without expanding
+    more = crawler.more_info(info_el, id_, slug)
+    if more is not None:
+        try:
+            level = _stat_from_statblock(more, "Level")
+            casting_time = _stat_from_statblock(more, "Casting Time")
+            range_raw = _stat_from_statblock(more, "Range/Area")
+            components = _stat_from_statblock(more, "Components")
+            duration = _stat_from_statblock(more, "Duration")
+            school = _stat_from_statblock(more, "School")
+            attack_save = _stat_from_statblock(more, "Attack/Save")
+            damage_effect = _stat_from_statblock(more, "Damage/Effect")
+            if want_description:
+                description = _description(more)
+            classes = _classes(more)
+            source = crawler.text(more, SOURCE_SELECTOR)
+            area_shape = _aoe_shape(more)
+        except StaleElementReferenceException:
+            more = None
+
+    # Extract visible name (exact), prefer anchor within name row
+    try:
+        nb = info_el.find_element(By.CSS_SELECTOR, ".row.spell-name")
+        try:
+            name_text = clean(nb.find_element(By.CSS_SELECTOR, "a.link, a").text)
+        except Exception:
+            # Fallback: text before any "•"
+            name_text = clean(clean(nb.text).split("•")[0])
+    except Exception:
+        name_text = ""
+    if not name_text and more is not None:
+        name_text = crawler.text(more, "h1,h2,h3,.heading")
+    if not name_text:
+        # Absolute last fallback: derive from slug (not preferred)
+        name_text = title_from_slug(slug)
+
+    # Fallbacks from compact row (no expand yet)
+    if not level:
+        level = crawler.text(info_el, ".row.spell-level span")
+    if not casting_time:
+        casting_time = crawler.text(info_el, ".row.spell-cast-time span")
+    if not range_raw:
+        rd = crawler.text(info_el, ".row.spell-range .range-distance") or crawler.text(
+            info_el, ".row.spell-range"
+        )
+        aoe_text = crawler.text(info_el, ".row.spell-range .aoe-size")
+        range_raw = clean(f"{rd} {aoe_text}")
+    if not components:
+        components = _components_from_info(info_el)
+    if not duration:
+        duration = crawler.text(info_el, ".row.spell-duration span")
+    if not school:
+        try:
+            spans = info_el.find_elements(By.CSS_SELECTOR, ".row.spell-name span")
+            if len(spans) >= 2:
+                school = school_from_name_span(spans[1].text)
+        except Exception:
+            pass
+        if not school:
+            school = crawler.text(info_el, ".row.spell-school")
+    if not attack_save:
+        attack_save = crawler.text(info_el, ".row.spell-attack-save span") or crawler.text(
+            info_el, ".row.spell-attack-save"
+        )
+    if not damage_effect:
+        damage_effect = crawler.text(info_el, ".row.spell-damage-effect span") or crawler.text(
+            info_el, ".row.spell-damage-effect"
+        )
+    # Try icon on compact row too
+    if not area_shape:
+        area_shape = _aoe_shape(info_el)
+
+    # If any of the must-have fields are still missing, expand the row and re-read
+    needs_material = "m" in (components or "").lower() and not material_components
+    must_have = [area_shape, classes, source] + ([description] if want_description else [])
+    if any(not v for v in must_have) or needs_material:
+        try:
+            more = crawler.ensure_more_info(info_el, id_, slug)
+            if more is not None:
+                area_shape = _aoe_shape(more) or area_shape
+                if want_description and not description:
+                    description = _description(more)
+                if not classes:
+                    classes = _classes(more)
+                if not source:
+                    source = crawler.text(more, SOURCE_SELECTOR)
+                if needs_material:
+                    cb_text = crawler.text(more, ".components-blurb")
+                    if cb_text:
+                        material_components = clean_material_text(cb_text)
+        except Exception:
+            pass
+
+    # Parse range/area and pick shape from icon first then paren fallback
+    range_part, area, area_shape_from_paren = parse_range_area(range_raw)
+    if not area_shape:
+        area_shape = area_shape_from_paren
+
+    # Final cleanup for SCHOOL (ensure it's only a magic school)
+    if school:
+        school = clean_school(school)
+
+    row = SpellRow(
+        ID=id_,
+        NAME=name_text,
+        LEVEL=level,
+        CASTING_TIME=casting_time,
+        RANGE=range_part,
+        AREA=area,
+        AREA_SHAPE=area_shape,
+        COMPONENTS=components,
+        MATERIAL_COMPONENTS=material_components,
+        DURATION=duration,
+        SCHOOL=school,
+        ATTACK_SAVE=attack_save,
+        DAMAGE_EFFECT=damage_effect,
+        CLASSES=classes,
+        SOURCE=source,
+        URL=spec.url_for(id_, slug),
+        SLUG=slug,
+    )
+    if want_description:
+        row["DESCRIPTION"] = description
+    return row
+
+
+# --- magic items -----------------------------------------------------------
+def _source_from_more(crawler: ListingCrawler, more) -> str:
+    """Source book from the panel footer, blocked-content hint or description header."""
+    source = crawler.text(more, SOURCE_SELECTOR) or crawler.text(more, BLOCKED_SOURCE_SELECTOR)
+    if source:
+        return source
+    # often "Armor (any medium or heavy, except hide armor), uncommon"; only
+    # use it when it looks like a book name
+    upper = crawler.text(more, ".more-info-body-description-upper")
+    return upper if looks_like_source(upper) else ""
+
+
+def parse_magic_item(crawler: ListingCrawler, info_el) -> ItemRow:
+    """Extract magic item fields from a single listing row (listing-only)."""
+    id_, slug = crawler.parse_id_slug(info_el)
+    if not id_ or not slug:
+        return ItemRow(ID="")
+
+    name = crawler.text(info_el, ".row.item-name a.link") or crawler.text(
+        info_el, ".row.item-name .name"
+    )
+    if not name:
+        name = title_from_slug(slug)
+
+    # RARITY: explicit label, else inferred from the name span's class
+    rarity = crawler.text(info_el, ".row.item-name .rarity")
+    if not rarity:
+        try:
+            inner_span = info_el.find_element(By.CSS_SELECTOR, ".row.item-name a.link span")
+            rarity = rarity_from_class(inner_span.get_attribute("class"))
+        except Exception:
+            pass
+
+    itype = crawler.text(info_el, ".row.item-type .type")
+    # treat "——" or em-dash markers as empty
+    attunement = crawler.text(info_el, ".row.requires-attunement span")
+    if is_dash_placeholder(attunement):
+        attunement = ""
+    notes = crawler.text(info_el, ".row.notes span")
+
+    # SOURCE: may require opening the inline more-info
+    source = ""
+    more = crawler.ensure_more_info(info_el, id_, slug)
+    if more is not None:
+        source = _source_from_more(crawler, more)
+
+    return ItemRow(
+        ID=id_,
+        NAME=name,
+        RARITY=rarity,
+        TYPE=itype,
+        ATTUNEMENT=attunement,
+        NOTES=notes,
+        SOURCE=source,
+        URL=crawler.spec.url_for(id_, slug),
+        SLUG=slug,
+    )
+
+
+# --- monsters --------------------------------------------------------------
+def parse_monster(crawler: ListingCrawler, info_el) -> MonsterRow:
+    """Extract monster fields from a single listing row (listing-only)."""
+    id_, slug = crawler.parse_id_slug(info_el)
+    if not id_ or not slug:
+        return MonsterRow(ID="")
+
+    name = crawler.text(info_el, ".row.monster-name a.link") or crawler.text(
+        info_el, ".row.monster-name .name"
+    )
+    # sometimes challenge may be direct text
+    cr = crawler.text(info_el, ".row.monster-challenge span") or crawler.text(
+        info_el, ".row.monster-challenge"
+    )
+
+    # TYPE + subtype (combine)
+    mtype = crawler.text(info_el, ".row.monster-type .type")
+    subtype = crawler.text(info_el, ".row.monster-type .subtype")
+    if subtype:
+        mtype = clean(f"{mtype} {subtype}")
+
+    size = crawler.text(info_el, ".row.monster-size span")
+    alignment = crawler.text(info_el, ".row.monster-alignment span")
+
+    # HABITAT: prefer title attribute (when truncated with tip)
+    habitat = ""
+    try:
+        span = info_el.find_element(By.CSS_SELECTOR, ".row.monster-environment span")
+        title = (span.get_attribute("title") or "").strip()
+        habitat = title or clean(span.text)
+    except Exception:
+        pass
+
+    # SOURCE: prefer .row.monster-name .source; fallback to inline more-info
+    source = crawler.text(info_el, ".row.monster-name .source")
+    if not source:
+        try:
+            more = crawler.ensure_more_info(info_el, id_, slug)
+            if more is not None:
+                source = crawler.text(more, SOURCE_SELECTOR) or crawler.text(
+                    more, BLOCKED_SOURCE_SELECTOR
+                )
+        except Exception:
+            pass
+
+    return MonsterRow(
+        ID=id_,
+        NAME=name,
+        CR=cr,
+        TYPE=mtype,
+        SIZE=size,
+        ALIGNMENT=alignment,
+        HABITAT=habitat,
+        SOURCE=source,
+        URL=crawler.spec.url_for(id_, slug),
+        SLUG=slug,
+    )
+
+
+# --- specs -----------------------------------------------------------------
+_PANEL_SOURCE = f"{SOURCE_SELECTOR}, {BLOCKED_SOURCE_SELECTOR}"
+
+SPELLS = EntitySpec(
+    key="spells",
+    label="spells",
+    path="spells",
+    listing_class="rpgspell",
+    more_info_class="more-info-spell",
+    toggle_selector=".row.spell-indicator .spell-color",
+    name_selector=".row.spell-name a.link",
+    ready_selector=".ddb-statblock",
+    parse_row=parse_spell,
+    record=SpellRow,
+    required=frozenset({"SOURCE", "CLASSES"}),
+)
+
+MAGIC_ITEMS = EntitySpec(
+    key="magic_items",
+    label="items",
+    path="magic-items",
+    listing_class="rpgmagic-item",
+    more_info_class="more-info-magic-item",
+    toggle_selector=".row.item-indicator .item-color",
+    name_selector=".row.item-name a.link",
+    ready_selector=_PANEL_SOURCE,
+    parse_row=parse_magic_item,
+    record=ItemRow,
+    loose_more_info=True,
+)
+
+MONSTERS = EntitySpec(
+    key="monsters",
+    label="monsters",
+    path="monsters",
+    listing_class="rpgmonster",
+    more_info_class="more-info-monster",
+    toggle_selector=".row.monster-indicator .monster-color",
+    name_selector=".row.monster-name a.link",
+    ready_selector=_PANEL_SOURCE,
+    parse_row=parse_monster,
+    record=MonsterRow,
+    loose_more_info=True,
+)
+
+SPECS = {s.key: s for s in (SPELLS, MAGIC_ITEMS, MONSTERS)}
@@ -0,0 +1,134 @@
+"""
+Streaming pipelines: generator stages between a crawl and its sinks.
+
+ListingCrawler.crawl_iter() / run_iter() yield rows as they are parsed, and
+the 5e.tools collectors' iter_5e_tools_sources() yields (name, SOURCE_SHORT)
+pairs as they are found. The stages here take such an iterator and yield
+the rows on, so enrichment, joins, validation and writing happen row by row
+while the crawl is still running, and only the rows in flight are held in
+memory:
+
+    rows = crawler.run_iter(start_time, store=store)
+    rows = stream.map_rows(rows, finish_row)
+    rows = stream.join(rows, sources_map, "SOURCE_SHORT", key=lambda r: norm_name(r["NAME"]))
+    rows = stream.validate(rows, ("ID", "NAME", "SOURCE"))
+    rows = stream.tap(rows, lambda r: store.upsert("spells", r), jsonl.write, csv_sink.write)
+    total = stream.drain(rows)
+
+Nothing runs until the last stage is consumed (drain(), list(), a for loop).
+Counts go to a collections.Counter passed as stats, for the summary line.
+"""
+from __future__ import annotations
+
+import csv
+import os
+from collections import Counter
+from typing import Any, Callable, Iterable, Iterator, List, Mapping, MutableMapping, Optional, Sequence, TypeVar
+
+from common import metrics
+
+T = TypeVar("T")
+Row = MutableMapping[str, Any]
+
+
+def map_rows(rows: Iterable[T], fn: Callable[[T], T]) -> Iterator[T]:
+    """fn(row) for every row (fn may update the row in place and return it)."""
+    for row in rows:
+        yield fn(row)
+
+
+def tap(rows: Iterable[T], *fns: Callable[[T], Any]) -> Iterator[T]:
+    """Call every fn with each row (store upserts, sinks), then pass the row on."""
+    for row in rows:
+        for fn in fns:
+            fn(row)
+        yield row
+
+
+def join(
+    rows: Iterable[Row],
+    mapping: Mapping[str, str],
+    column: str,
+    key: Callable[[Row], str],
+    stats: Optional[Counter] = None,
+) -> Iterator[Row]:
+    """Set row[column] = mapping[key(row)] ('' when there is no match)."""
+    for row in rows:
+        value = mapping.get(key(row), "")
+        row[column] = value
+        if stats is not None:
+            stats["rows"] += 1
+            stats["matched"] += bool(value)
+        yield row
+
+
+def validate(
+    rows: Iterable[Row], required: Sequence[str], stats: Optional[Counter] = None
+) -> Iterator[Row]:
+    """Count rows with an empty required column (metrics: invalid_rows); keeps them all."""
+    for row in rows:
+        if any(not row.get(c) for c in required):
+            metrics.inc("invalid_rows")
+            if stats is not None:
+                stats["invalid"] += 1
+        yield row
+
+
+def batched(rows: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Lists of up to size rows."""
+    batch: List[T] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def drain(rows: Iterable[Any]) -> int:
+    """Run the pipeline to the end; the number of rows that came out."""
+    n = 0
+    for _ in rows:
+        n += 1
+    return n
+
+
+class CsvSink:
+    """CSV writer for rows as they arrive (missing columns are written as '').
+
+    Rows go to <path>.<pid>.tmp; commit() moves it over path. A sink closed
+    without a commit (no rows, an error, Ctrl-C) removes the temporary file
+    and leaves the previous path untouched.
+    """
+
+    def __init__(self, path: str, header: Sequence[str]):
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self.path = path
+        self.header = list(header)
+        self.count = 0
+        self._tmp = f"{path}.{os.getpid()}.tmp"
+        self._file = open(self._tmp, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.header)
+
+    def write(self, row: Mapping[str, Any]):
+        self._writer.writerow([row.get(h, "") for h in self.header])
+        self.count += 1
+
+    def commit(self):
+        """Close and replace path with what was written."""
+        if not self._file.closed:
+            self._file.close()
+            os.replace(self._tmp, self.path)
+
+    def close(self):
+        """Close; without a commit() the rows written are discarded."""
+        if not self._file.closed:
+            self._file.close()
+            try:
+                os.remove(self._tmp)
+            except OSError:
+                pass
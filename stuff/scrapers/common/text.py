@@ -0,0 +1,218 @@
+"""
+Pure text helpers shared by the scrapers (no selenium imports).
+
+Everything here works on plain strings so it can be reused by the crawl
+engine, the 5e.tools matchers and offline tooling alike.
+"""
+from __future__ import annotations
+
+import json
+import re
+from functools import lru_cache
+from typing import Iterable, List, Optional, Pattern, Tuple
+
+AREA_SHAPES = [
+    "cube",
+    "sphere",
+    "line",
+    "cone",
+    "radius",
+    "hemisphere",
+    "cylinder",
+    "circle",
+    "square",
+]
+
+# Checked in order; "very-rare" before "rare", "uncommon" before "common"
+RARITY_CLASSES = [
+    ("very-rare", "Very Rare"),
+    ("legendary", "Legendary"),
+    ("artifact", "Artifact"),
+    ("uncommon", "Uncommon"),
+    ("rare", "Rare"),
+    ("varies", "Varies"),
+    ("common", "Common"),
+]
+
+_WS_RE = re.compile(r"\s+")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_DATA_SLUG_RE = re.compile(r"^\s*(\d+)-(.*)$")
+_PAGE_PARAM_RE = re.compile(r"[?&]page=(\d+)")
+_PAREN_RE = re.compile(r"\((.*?)\)")
+_PAREN_STRIP_RE = re.compile(r"\s*\(.*\)\s*")
+_COMPONENTS_RE = re.compile(r"\b(?:V|S|M)(?:\s*,\s*(?:V|S|M))*\b(?:\s*\*)?")
+_MATERIAL_LEAD_RE = re.compile(r"^[\*\s\-–:]*")
+_MATERIAL_DASH_RE = re.compile(r"^[\-\s:]*")
+_SCHOOL_RE = re.compile(r"[A-Za-z][A-Za-z\s'-]+")
+_DASHES_RE = re.compile(r"^[-–—]+$")
+_AOE_ICON_RE = re.compile(r"i-aoe-([a-z0-9_-]+)")
+_SCHOOL_TAIL_RE = re.compile(r"[•].*$")
+_SCHOOL_V_RE = re.compile(r"\bV\b.*$")
+_ALPHA_RE = re.compile(r"[A-Za-z]")
+_FRAGMENT_SPLIT_RE = re.compile(r"[,&]")
+
+
+@lru_cache(maxsize=None)
+def _href_re(path: str) -> Pattern:
+    return re.compile(rf"/{re.escape(path)}/(\d+)-([^/?#]+)")
+
+
+def clean(txt: Optional[str]) -> str:
+    """Collapse whitespace runs and strip."""
+    return _WS_RE.sub(" ", txt or "").strip()
+
+
+def format_elapsed(seconds: float) -> str:
+    """Return MM:SS:MS (ms 3 digits)."""
+    ms = int((seconds - int(seconds)) * 1000)
+    total_seconds = int(seconds)
+    mins = total_seconds // 60
+    secs = total_seconds % 60
+    return f"{mins:02d}:{secs:02d}:{ms:03d}"
+
+
+def norm_name(name: Optional[str]) -> str:
+    """Normalize a name for joining: lowercase and strip non-alphanumerics."""
+    return _NON_ALNUM_RE.sub("", (name or "").lower())
+
+
+def parse_id_slug(
+    data_slug: Optional[str], href: Optional[str], path: str
+) -> Tuple[Optional[str], Optional[str]]:
+    """(id, slug) from a listing row's data-slug ("123-fire-bolt") or its /{path}/123-slug href."""
+    m = _DATA_SLUG_RE.match(data_slug or "")
+    if m:
+        return m.group(1), m.group(2).strip()
+    m = _href_re(path).search(href or "")
+    if m:
+        return m.group(1), m.group(2)
+    return None, None
+
+
+def title_from_slug(slug: str) -> str:
+    """Last-resort display name: 'fire-bolt' -> 'Fire Bolt'."""
+    return clean(slug.replace("-", " ").replace("_", " ")).title()
+
+
+def page_numbers(labels: Iterable[Tuple[str, str]]) -> List[int]:
+    """Page numbers from pagination links given as (text, href) pairs."""
+    nums: List[int] = []
+    for text, href in labels:
+        txt = (text or "").strip()
+        if txt.isdigit():
+            nums.append(int(txt))
+            continue
+        m = _PAGE_PARAM_RE.search(href or "")
+        if m:
+            nums.append(int(m.group(1)))
+    return nums
+
+
+def page_url(url: str, page: int) -> str:
+    """url with its ?page= query parameter set to page (other parameters kept)."""
+    base, _, fragment = url.partition("#")
+    path, _, query = base.partition("?")
+    params = [p for p in query.split("&") if p and not p.startswith("page=")]
+    params.append(f"page={page}")
+    return f"{path}?{'&'.join(params)}" + (f"#{fragment}" if fragment else "")
+
+
+def parse_range_area(raw: str) -> Tuple[str, str, str]:
+    """Return (range_part, area_text, area_shape_from_paren)."""
+    if not raw:
+        return "", "", ""
+    raw = clean(raw)
+    m = _PAREN_RE.search(raw)
+    paren = m.group(1).strip() if m else ""
+    range_part = _PAREN_STRIP_RE.sub("", raw).strip()
+    area_shape = ""
+    if paren:
+        lp = paren.lower()
+        for s in AREA_SHAPES:
+            if s in lp:
+                area_shape = s
+                break
+    return range_part, paren, area_shape
+
+
+def aoe_shape_from_class(cls: Optional[str]) -> str:
+    """'i-aoe-cube' icon class -> 'cube'."""
+    m = _AOE_ICON_RE.search(cls or "")
+    return m.group(1) if m else ""
+
+
+def components_from_text(txt: str) -> str:
+    """First 'V, S, M *'-style components run in a compact row's text."""
+    m = _COMPONENTS_RE.search(txt or "")
+    return m.group(0) if m else ""
+
+
+def clean_material_text(cb_text: str) -> str:
+    """Turn a components-blurb like '* - (a bit of sponge)' -> 'a bit of sponge'."""
+    t = cb_text or ""
+    # remove leading asterisks, dashes, colons and whitespace
+    t = _MATERIAL_LEAD_RE.sub("", t)
+    # remove surrounding parentheses if present
+    if t.startswith("(") and t.endswith(")"):
+        t = t[1:-1].strip()
+    # remove leading dash/space again if any
+    t = _MATERIAL_DASH_RE.sub("", t)
+    return clean(t)
+
+
+def clean_school(school: str) -> str:
+    """Keep only the magic school words ('Evocation • V, S' -> 'Evocation')."""
+    m = _SCHOOL_RE.search(school or "")
+    return m.group(0).strip() if m else school
+
+
+def school_from_name_span(text: str) -> str:
+    """School from the compact row's second name span, or ''."""
+    s = clean(text)
+    s = _SCHOOL_TAIL_RE.sub("", s).strip()
+    s = _SCHOOL_V_RE.sub("", s).strip()
+    return s if s and _ALPHA_RE.search(s) else ""
+
+
+def order_classes(tags: Iterable[str]) -> str:
+    """'; '-join class tags, non-legacy first."""
+    tags = [t for t in tags if t]
+    non_legacy = [t for t in tags if "legacy" not in t.lower()]
+    legacy = [t for t in tags if "legacy" in t.lower()]
+    return "; ".join(non_legacy + legacy)
+
+
+def classes_json(raw: Optional[str]) -> str:
+    """'Wizard; Sorcerer' -> '["Wizard", "Sorcerer"]' (the CSV's CLASSES column)."""
+    parts = [p.strip() for p in (raw or "").split(";") if p.strip()]
+    return json.dumps(parts, ensure_ascii=False)
+
+
+def source_short_from_fragment(fragment: Optional[str]) -> str:
+    """5e.tools hash 'fireball_phb,st:1' -> 'phb' ('' when there is no source)."""
+    main_part = _FRAGMENT_SPLIT_RE.split(fragment or "", 1)[0]
+    if "_" not in main_part:
+        return ""
+    return main_part.rsplit("_", 1)[1].lower()
+
+
+def rarity_from_class(cls: Optional[str]) -> str:
+    """Infer rarity from the name span's CSS class ('very-rare' -> 'Very Rare')."""
+    c = cls or ""
+    for token, label in RARITY_CLASSES:
+        if token in c:
+            return label
+    return ""
+
+
+def is_dash_placeholder(text: str) -> bool:
+    """True for '—', '--' and similar empty-cell markers."""
+    return bool(_DASHES_RE.match(text or ""))
+
+
+def looks_like_source(text: str) -> bool:
+    """Heuristic for description-upper text that names a book rather than a type line."""
+    return bool(text) and (
+        ":" in text
+        or any(w in text for w in ("Guide", "Compendium", "Player", "Tasha", "Dungeon"))
+    )
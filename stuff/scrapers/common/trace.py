@@ -0,0 +1,171 @@
+"""
+Timeline traces of scrape runs in the Chrome trace-event JSON format.
+
+The file opens in chrome://tracing, https://ui.perfetto.dev and
+https://www.speedscope.app. Spans nest by time on each thread:
+
+    phase                 Phase 1: Scraping D&D Beyond, ...
+      page                page 3
+        row               one listing row (args: ID, NAME)
+          panel           more-info expansion (click + wait)
+          webdriver       every WebDriver round-trip (findElement, ...)
+        sleep             time.sleep pauses (page delay, item delay, ...)
+        wait              common/waits.py waits ("wait panel", "wait hash", ...)
+      5etools             one 5e.tools row click
+      csv / export        CSV view export, Parquet/Arrow/compact writes
+
+Tracing is off unless enable() is called, and every helper is then a cheap
+no-op, so the crawl code calls them unconditionally:
+
+    trace.enable()
+    trace.attach(driver)                  # webdriver spans
+    trace.phase("Phase 1: Scraping D&D Beyond")
+    with trace.span("page 1", "page"):
+        trace.sleep(2.5, "page delay")
+    trace.save("stuff/data/logs/spells.trace.json")
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+_tracer: Optional["Tracer"] = None
+
+
+class Tracer:
+    """Collects complete ("X") events; timestamps are µs since enable()."""
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.pid = os.getpid()
+        self.events: List[Dict[str, Any]] = []
+        self.threads: Dict[int, str] = {}
+        self._phase: Optional[tuple] = None
+
+    def now(self) -> float:
+        return (time.perf_counter() - self.t0) * 1e6
+
+    def _tid(self) -> int:
+        ident = threading.get_ident()
+        if ident not in self.threads:
+            self.threads[ident] = threading.current_thread().name
+        return ident
+
+    def begin(self, name: str, cat: str, args: Dict[str, Any]) -> tuple:
+        return (name, cat, self.now(), self._tid(), args)
+
+    def end(self, token: tuple, args: Optional[Dict[str, Any]] = None):
+        name, cat, ts, tid, span_args = token
+        if args:
+            span_args.update(args)
+        ev = {"name": name, "cat": cat, "ph": "X", "ts": ts, "dur": self.now() - ts,
+              "pid": self.pid, "tid": tid}
+        if span_args:
+            ev["args"] = {k: str(v) for k, v in span_args.items()}
+        self.events.append(ev)
+
+    def phase(self, name: Optional[str]):
+        if self._phase is not None:
+            self.end(self._phase)
+        self._phase = self.begin(name, "phase", {}) if name else None
+
+    def document(self) -> Dict[str, Any]:
+        meta = [{"name": "process_name", "ph": "M", "pid": self.pid, "tid": 0,
+                 "args": {"name": "scraper"}}]
+        meta += [{"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid,
+                  "args": {"name": name}} for tid, name in self.threads.items()]
+        return {"traceEvents": meta + sorted(self.events, key=lambda e: e["ts"]),
+                "displayTimeUnit": "ms"}
+
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "token")
+
+    def __init__(self, name: str, cat: str, args: Dict[str, Any]):
+        self.name, self.cat, self.args, self.token = name, cat, args, None
+
+    def __enter__(self) -> Dict[str, Any]:
+        if _tracer is not None:
+            self.token = _tracer.begin(self.name, self.cat, self.args)
+        return self.args
+
+    def __exit__(self, *exc):
+        if self.token is not None and _tracer is not None:
+            _tracer.end(self.token)
+        return False
+
+
+def enable() -> Tracer:
+    """Start collecting (once per process); later calls return the same tracer."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+def span(name: str, cat: str = "span", **args) -> _Span:
+    """Context manager timing a block; yields its args dict (add keys to annotate)."""
+    return _Span(name, cat, args)
+
+
+def begin(name: str, cat: str = "span", **args) -> Optional[tuple]:
+    """Open a span where a `with` block does not fit; close it with end()."""
+    return _tracer.begin(name, cat, args) if _tracer is not None else None
+
+
+def end(token: Optional[tuple], **args):
+    if token is not None and _tracer is not None:
+        _tracer.end(token, args)
+
+
+def phase(name: Optional[str]):
+    """End the current phase span and start the next one (None just ends it)."""
+    if _tracer is not None:
+        _tracer.phase(name)
+
+
+def sleep(seconds: float, name: str = "sleep"):
+    """time.sleep that shows up on the timeline."""
+    if _tracer is None:
+        time.sleep(seconds)
+        return
+    token = _tracer.begin(name, "sleep", {})
+    time.sleep(seconds)
+    _tracer.end(token)
+
+
+def attach(driver):
+    """Emit a span for every WebDriver command on driver (waits trace themselves, see common/waits.py)."""
+    if _tracer is None:
+        return
+    executor = driver.command_executor
+    send = executor.execute
+
+    def execute(command, params):
+        token = begin(command, "webdriver")
+        try:
+            return send(command, params)
+        finally:
+            end(token)
+
+    executor.execute = execute
+
+
+def save(path: str) -> Optional[str]:
+    """Close the open phase and write the trace JSON. Returns the path, or None if disabled."""
+    if _tracer is None:
+        return None
+    _tracer.phase(None)
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(_tracer.document(), f)
+    return path
@@ -0,0 +1,157 @@
+"""
+Event-driven waits: resolve the moment the page changes, not on the next poll.
+
+WebDriverWait and sleep loops ask "is it there yet?" every 100-500ms, and
+each ask is a WebDriver round-trip. Here one execute_async_script call
+installs a MutationObserver (plus hashchange / readystatechange listeners)
+in the page and re-checks a JavaScript predicate on every DOM change; the
+call returns as soon as the predicate is truthy, or None after the timeout:
+
+    waits.present(driver, "#list .lst__row", 20)          # first rows rendered
+    waits.count_above(driver, "#list .lst__row", 50, 1)    # more rows after a scroll
+    waits.hash_changed(driver, prev_hash, 3)               # 5e.tools row opened
+    waits.panel_ready(driver, info_el, ...)                # DDB more-info loaded
+    waits.page_changed(driver, prev_url, rows, first, n, 20)
+
+until() is the primitive: the predicate is the body of a JS function with
+`args` in scope, and whatever it returns (an element, a string, true) is
+passed back. A wait shows up as a "wait" span on the trace.
+"""
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from selenium.common.exceptions import WebDriverException
+
+from common import trace
+
+# Slack between the in-page timeout and the driver's script timeout
+_SCRIPT_TIMEOUT_MARGIN = 5.0
+
+_TEMPLATE = """
+var args = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+var finished = false, observer = null, timer = null;
+function predicate(args) { %s }
+function finish(value) {
+  if (finished) return;
+  finished = true;
+  if (observer) observer.disconnect();
+  clearTimeout(timer);
+  window.removeEventListener('hashchange', check);
+  document.removeEventListener('readystatechange', check);
+  done(value);
+}
+function check() {
+  var value = null;
+  try { value = predicate(args); } catch (e) { value = null; }
+  if (value) finish(value);
+}
+check();
+if (!finished) {
+  observer = new MutationObserver(check);
+  observer.observe(document.documentElement,
+                   {childList: true, subtree: true, attributes: true, characterData: true});
+  window.addEventListener('hashchange', check);
+  document.addEventListener('readystatechange', check);
+  timer = setTimeout(function () { finish(null); }, timeoutMs);
+}
+"""
+
+_PANEL_READY = """
+var info = args[0], cls = args[1], exact = args[2], loose = args[3], ready = args[4];
+var panel = document.getElementsByClassName(exact)[0];
+for (var s = info.nextElementSibling; !panel && s; s = s.nextElementSibling) {
+  var c = typeof s.className === 'string' ? s.className : '';
+  if (s.tagName === 'DIV' && (c.indexOf(cls) >= 0 || (loose && c.indexOf('more-info') >= 0))) panel = s;
+}
+return panel && panel.querySelector(ready) ? panel : null;
+"""
+
+_PAGE_CHANGED = """
+if (location.href !== args[0]) return true;
+var rows = document.querySelectorAll(args[1]);
+if (!rows.length) return null;
+var first = rows[0].getAttribute('data-slug');
+if (args[2] && first && first !== args[2]) return true;
+return rows.length !== args[3] ? true : null;
+"""
+
+
+def _ensure_script_timeout(driver, seconds: float):
+    """Raise the driver's async script timeout (once) above the in-page timeout."""
+    need = seconds + _SCRIPT_TIMEOUT_MARGIN
+    if getattr(driver, "_waits_script_timeout", 0) < need:
+        driver.set_script_timeout(need)
+        driver._waits_script_timeout = need
+
+
+def until(driver, predicate: str, *args, timeout: float, label: str = "until") -> Any:
+    """Run predicate (JS function body over `args`) on every DOM change until truthy.
+
+    Returns the predicate's value, or None on timeout. Selenium errors (a
+    stale element argument, the page unloading mid-wait) propagate.
+    """
+    _ensure_script_timeout(driver, timeout)
+    with trace.span(label, "wait"):
+        return driver.execute_async_script(_TEMPLATE % predicate, list(args), int(timeout * 1000))
+
+
+def ready(driver, timeout: float) -> bool:
+    """document.readyState == 'complete'."""
+    return bool(until(driver, "return document.readyState === 'complete';",
+                      timeout=timeout, label="wait ready"))
+
+
+def present(driver, selector: str, timeout: float):
+    """First element matching selector, once it exists (None on timeout)."""
+    return until(driver, "return document.querySelector(args[0]);", selector,
+                 timeout=timeout, label="wait present")
+
+
+def count_above(driver, selector: str, count: int, timeout: float) -> bool:
+    """True once more than count elements match selector."""
+    return bool(until(driver, "return document.querySelectorAll(args[0]).length > args[1];",
+                      selector, count, timeout=timeout, label="wait more rows"))
+
+
+def hash_changed(driver, prev_hash: str, timeout: float) -> Optional[str]:
+    """The new URL fragment (without '#') once it is set and differs from prev_hash."""
+    return until(driver, "var h = location.hash.slice(1); return h && h !== args[0] ? h : null;",
+                 prev_hash or "", timeout=timeout, label="wait hash")
+
+
+def panel_ready(
+    driver, info_el, more_info_class: str, exact_class: str, loose: bool, ready_selector: str,
+    timeout: float,
+):
+    """The row's more-info panel once it contains ready_selector (None on timeout).
+
+    The panel is the element with exact_class, else the row's next sibling
+    div whose class contains more_info_class (or any 'more-info' when loose),
+    matching ListingCrawler.more_info().
+    """
+    return until(driver, _PANEL_READY, info_el, more_info_class, exact_class, loose, ready_selector,
+                 timeout=timeout, label="wait panel")
+
+
+def page_changed(
+    driver, prev_url: str, row_selector: str, prev_first: Optional[str], prev_count: int,
+    timeout: float,
+) -> bool:
+    """True once the listing shows another page: new URL, new first row or row count.
+
+    A full navigation unloads the page under the wait; the new document is
+    then waited on for its first row.
+    """
+    try:
+        if until(driver, _PAGE_CHANGED, prev_url, row_selector, prev_first or "", prev_count,
+                 timeout=timeout, label="wait page change"):
+            return True
+        return False
+    except WebDriverException:
+        pass
+    # The old document went away: wait for the new one's rows
+    try:
+        return present(driver, row_selector, timeout) is not None
+    except WebDriverException:
+        return driver.current_url != prev_url
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Run the scrapers as a dependency graph instead of one script after another.
+
+Stages (each one is a `scrape.py` subcommand run in its own process, with its
+own browser):
+
+    spells           D&D Beyond spells
+    items            D&D Beyond magic items
+    monsters         D&D Beyond monsters
+    5etools-spells   D&D Beyond spells + 5e.tools SOURCE_SHORT
+    5etools-items    D&D Beyond magic items + 5e.tools SOURCE_SHORT
+    augment          SOURCE_SHORT for the magic items CSV   (needs: items)
+
+Independent stages run in parallel, at most --workers at a time; a stage
+starts as soon as the stages it needs have finished, and is skipped if one
+of them failed. Stages with dependents are started first so the longest
+chain begins early. A full refresh takes about as long as the longest chain
+rather than the sum of all scripts. The row store is in WAL mode, so the
+stages can write to it concurrently.
+
+Each stage's console output goes to <log-dir>/<stage>.log; a summary with
+start offsets and durations is printed at the end. With --metrics-dir each
+stage also writes <dir>/<stage>.prom and <dir>/<stage>.json (point it at the
+node_exporter textfile directory to alert on throughput).
+
+    python stuff/scrapers/pipeline.py                       # everything, 3 at a time
+    python stuff/scrapers/pipeline.py --workers 2 --only augment monsters
+    python stuff/scrapers/pipeline.py --limit 10 --cache-dir .cache/chrome --dry-run
+    python stuff/scrapers/pipeline.py --metrics-dir /var/lib/node_exporter/textfile
+
+Exit status is 1 if any stage failed or was skipped.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from rich.console import Console
+from rich.table import Table
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRAPE = os.path.join(HERE, "scrape.py")
+
+DEFAULT_WORKERS = 3
+DEFAULT_LOG_DIR = "stuff/data/logs"
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    argv: Tuple[str, ...]  # scrape.py arguments
+    needs: Tuple[str, ...] = ()
+
+
+STAGES: List[Stage] = [
+    Stage("spells", ("spells",)),
+    Stage("items", ("items",)),
+    Stage("monsters", ("monsters",)),
+    Stage("5etools-spells", ("spells", "--5etools")),
+    Stage("5etools-items", ("items", "--5etools")),
+    Stage("augment", ("augment",), needs=("items",)),
+]
+
+
+@dataclass
+class StageResult:
+    stage: Stage
+    status: str  # "ok", "failed", "skipped"
+    started: float = 0.0  # seconds after the pipeline started
+    elapsed: float = 0.0
+    returncode: Optional[int] = None
+    log: str = ""
+
+
+def select(stages: Sequence[Stage], only: Optional[Sequence[str]]) -> List[Stage]:
+    """The requested stages plus everything they (transitively) need, in definition order."""
+    by_name = {s.name: s for s in stages}
+    if not only:
+        return list(stages)
+    unknown = [n for n in only if n not in by_name]
+    if unknown:
+        raise SystemExit(f"Unknown stage(s): {', '.join(unknown)}")
+    wanted: Set[str] = set()
+    todo = list(only)
+    while todo:
+        name = todo.pop()
+        if name not in wanted:
+            wanted.add(name)
+            todo.extend(by_name[name].needs)
+    return [s for s in stages if s.name in wanted]
+
+
+def _dependents(stages: Sequence[Stage]) -> Dict[str, int]:
+    """Number of stages that (transitively) wait on each stage."""
+    counts: Dict[str, int] = {}
+    for s in stages:
+        seen: Set[str] = set()
+        todo = [t.name for t in stages if s.name in t.needs]
+        while todo:
+            name = todo.pop()
+            if name not in seen:
+                seen.add(name)
+                todo.extend(t.name for t in stages if name in t.needs)
+        counts[s.name] = len(seen)
+    return counts
+
+
+def waves(stages: Sequence[Stage]) -> List[List[str]]:
+    """Stage names grouped by dependency depth (for --dry-run)."""
+    names = {s.name for s in stages}
+    depth: Dict[str, int] = {}
+    pending = list(stages)
+    while pending:
+        progressed = False
+        for s in list(pending):
+            needs = [n for n in s.needs if n in names]
+            if all(n in depth for n in needs):
+                depth[s.name] = 1 + max((depth[n] for n in needs), default=-1)
+                pending.remove(s)
+                progressed = True
+        if not progressed:
+            raise SystemExit(f"Dependency cycle among: {', '.join(s.name for s in pending)}")
+    out: List[List[str]] = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+    for s in stages:
+        out[depth[s.name]].append(s.name)
+    return out
+
+
+def stage_argv(stage: Stage, extra: Sequence[str], metrics_dir: Optional[str] = None) -> List[str]:
+    """scrape.py arguments for one stage."""
+    argv = [*stage.argv, *extra]
+    if metrics_dir:
+        argv += ["--metrics", os.path.join(metrics_dir, stage.name)]
+    return argv
+
+
+def _run_stage(
+    stage: Stage, extra: Sequence[str], log_dir: str, t0: float, metrics_dir: Optional[str] = None
+) -> StageResult:
+    log = os.path.join(log_dir, f"{stage.name}.log")
+    started = time.perf_counter()
+    with open(log, "w", encoding="utf-8") as f:
+        proc = subprocess.run(
+            [sys.executable, SCRAPE, *stage_argv(stage, extra, metrics_dir)],
+            stdout=f,
+            stderr=subprocess.STDOUT,
+            env={**os.environ, "PYTHONUNBUFFERED": "1"},
+        )
+    return StageResult(
+        stage,
+        "ok" if proc.returncode == 0 else "failed",
+        started=started - t0,
+        elapsed=time.perf_counter() - started,
+        returncode=proc.returncode,
+        log=log,
+    )
+
+
+def run_pipeline(
+    stages: Sequence[Stage],
+    extra: Sequence[str] = (),
+    workers: int = DEFAULT_WORKERS,
+    log_dir: str = DEFAULT_LOG_DIR,
+    console: Optional[Console] = None,
+    metrics_dir: Optional[str] = None,
+) -> List[StageResult]:
+    """Run stages as a DAG with at most `workers` running at once."""
+    console = console or Console()
+    workers = max(1, workers)
+    os.makedirs(log_dir, exist_ok=True)
+    waves(stages)  # fail fast on cycles
+    names = {s.name for s in stages}
+    priority = _dependents(stages)
+    # Longest chains first, then definition order
+    pending = sorted(stages, key=lambda s: -priority[s.name])
+    results: Dict[str, StageResult] = {}
+    running: Dict[Future, Stage] = {}
+    t0 = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            for s in list(pending):
+                needs = [n for n in s.needs if n in names]
+                if any(n in results and results[n].status != "ok" for n in needs):
+                    pending.remove(s)
+                    results[s.name] = StageResult(s, "skipped", started=time.perf_counter() - t0)
+                    console.print(f"[yellow]skip[/yellow]  {s.name} (needs {', '.join(needs)})")
+                    continue
+                if len(running) >= workers:
+                    continue
+                if all(n in results for n in needs):
+                    pending.remove(s)
+                    console.print(f"[cyan]start[/cyan] {s.name}: scrape.py {' '.join(s.argv)}")
+                    running[pool.submit(_run_stage, s, extra, log_dir, t0, metrics_dir)] = s
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                s = running.pop(fut)
+                try:
+                    res = fut.result()
+                except Exception as e:
+                    res = StageResult(s, "failed", log=repr(e))
+                results[s.name] = res
+                colour = "green" if res.status == "ok" else "red"
+                console.print(
+                    f"[{colour}]{res.status:<5}[/{colour}] {s.name} in {res.elapsed:.1f}s -> {res.log}"
+                )
+    return [results[s.name] for s in stages]
+
+
+def print_summary(results: Sequence[StageResult], wall: float, console: Console):
+    table = Table(title="Pipeline")
+    for col in ("Stage", "Status", "Start", "Duration", "Log"):
+        table.add_column(col)
+    for r in results:
+        colour = {"ok": "green", "failed": "red"}.get(r.status, "yellow")
+        table.add_row(
+            r.stage.name,
+            f"[{colour}]{r.status}[/{colour}]",
+            f"+{r.started:.1f}s",
+            f"{r.elapsed:.1f}s" if r.status != "skipped" else "",
+            r.log,
+        )
+    console.print(table)
+    serial = sum(r.elapsed for r in results)
+    console.print(f"Wall time {wall:.1f}s (stages back to back: {serial:.1f}s)")
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="Run the scrapers as a parallel dependency graph.")
+    ap.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                    help=f"stages (browsers) running at once (default: {DEFAULT_WORKERS})")
+    ap.add_argument("--only", nargs="+", metavar="STAGE",
+                    help="run these stages and what they need: " + ", ".join(s.name for s in STAGES))
+    ap.add_argument("--log-dir", default=DEFAULT_LOG_DIR, help=f"(default: {DEFAULT_LOG_DIR})")
+    ap.add_argument("--metrics-dir", help="write <stage>.prom / <stage>.json run metrics here")
+    ap.add_argument("--dry-run", action="store_true", help="print the plan and exit")
+    # Forwarded to every stage (flags every scrape.py subcommand accepts)
+    fwd = ap.add_argument_group("passed to each stage")
+    fwd.add_argument("--limit", type=int)
+    fwd.add_argument("--headful", action="store_true")
+    fwd.add_argument("--cache-dir")
+    fwd.add_argument("--db")
+    fwd.add_argument("--max-wait")
+    args = ap.parse_args(argv)
+
+    extra: List[str] = []
+    for flag in ("limit", "cache_dir", "db", "max_wait"):
+        value = getattr(args, flag)
+        if value is not None:
+            extra += [f"--{flag.replace('_', '-')}", str(value)]
+    if args.headful:
+        extra.append("--headful")
+
+    console = Console()
+    stages = select(STAGES, args.only)
+    if args.dry_run:
+        for i, wave in enumerate(waves(stages)):
+            console.print(f"wave {i}: {', '.join(wave)}")
+        for s in stages:
+            console.print(f"  {s.name}: scrape.py {' '.join(stage_argv(s, extra, args.metrics_dir))}")
+        return
+
+    start = time.perf_counter()
+    results = run_pipeline(
+        stages, extra, workers=args.workers, log_dir=args.log_dir, console=console,
+        metrics_dir=args.metrics_dir,
+    )
+    print_summary(results, time.perf_counter() - start, console)
+    if any(r.status != "ok" for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
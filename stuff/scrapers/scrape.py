@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Single command-line entry point for the scrapers.
+
+Every script keeps its CONFIG constants as defaults; the flags below override
+them for one run, so tuning (pacing, limits, outputs) never needs a code edit
+and scheduled jobs can pass their own settings.
+
+    python stuff/scrapers/scrape.py spells                  # dndbeyond/dndbeyond_spell_scraper.py
+    python stuff/scrapers/scrape.py spells --5etools        # 5etools/5etools_spell_scraper.py
+    python stuff/scrapers/scrape.py items --5etools --limit 10 --match-only
+    python stuff/scrapers/scrape.py monsters --resume --cache-dir .cache/chrome
+    python stuff/scrapers/scrape.py monsters --page-delay 1 2 --format parquet --format compact
+    python stuff/scrapers/scrape.py spells --pacing-bounds 0.25 60
+    python stuff/scrapers/scrape.py items --page-delay 2 4 --fixed-pacing
+    python stuff/scrapers/scrape.py monsters --source "Monster Manual (2024)"
+    python stuff/scrapers/scrape.py spells --level 0 --level 1 --source "Player's Handbook (2024)"
+    python stuff/scrapers/scrape.py augment --limit 25 --headful
+    python stuff/scrapers/scrape.py augment --stream --input a.csv b.csv --chunk-size 5000
+    python stuff/scrapers/scrape.py augment --entities spells items monsters
+    python stuff/scrapers/scrape.py spells --limit 50 --commands stuff/data/logs/spells-commands.json
+    python stuff/scrapers/scrape.py items --5etools --limit 20 --trace stuff/data/logs/items.trace.json
+    python stuff/scrapers/scrape.py monsters --metrics /var/lib/node_exporter/textfile/monsters
+    python stuff/scrapers/scrape.py spells --5etools --limit 30 --profile stuff/data/logs/profile-spells
+
+Subcommands:
+ - spells    D&D Beyond spell listing (--5etools adds SOURCE_SHORT)
+ - items     D&D Beyond magic item listing (--5etools adds SOURCE_SHORT)
+ - monsters  D&D Beyond monster listing
+ - augment   SOURCE_SHORT for the existing magic items (--entities: spells,
+             monsters) CSVs
+             (appending_data/updating_ddb_items_with_5etools.py)
+
+Run from the repo root, like the scripts themselves.
+"""
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import importlib.util
+import os
+import sys
+from types import ModuleType
+from typing import Dict, Optional, Sequence
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+from common.filters import ListingFilter, filtered_path  # noqa: E402
+
+# subcommand -> (script, script with --5etools, limit constant)
+TARGETS: Dict[str, tuple] = {
+    "spells": (
+        "dndbeyond/dndbeyond_spell_scraper.py",
+        "5etools/5etools_spell_scraper.py",
+        "TEST_LIMIT_SPELLS",
+    ),
+    "items": (
+        "dndbeyond/dndbeyond_magicitems_scraper.py",
+        "5etools/5etools_magic_items_scraper.py",
+        "TEST_LIMIT_ITEMS",
+    ),
+    "monsters": (
+        "dndbeyond/dndbeyond_monsters_scraper.py",
+        None,
+        "TEST_LIMIT_MONSTERS",
+    ),
+    "augment": (
+        "appending_data/updating_ddb_items_with_5etools.py",
+        None,
+        "TEST_LIMIT_ITEMS",
+    ),
+}
+COLUMNAR = ("parquet", "arrow")
+# subcommand -> common.specs key, for checking filters against the row columns
+SPEC_KEYS = {"spells": "spells", "items": "magic_items", "monsters": "monsters"}
+
+
+def script_for(target: str, fiveetools: bool = False) -> str:
+    """Absolute path of the script a subcommand runs."""
+    plain, with_5etools, _ = TARGETS[target]
+    return os.path.join(HERE, with_5etools if fiveetools else plain)
+
+
+def load_script(path: str) -> ModuleType:
+    """Import a scraper script by path (its main() is not run)."""
+    name = "scrape_" + os.path.splitext(os.path.basename(path))[0].replace("-", "_")
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    # Registered before it runs, as an import would: dataclasses look their
+    # module up in sys.modules
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _set(module: ModuleType, name: str, value):
+    """Override a CONFIG constant the script actually has."""
+    if value is not None and hasattr(module, name):
+        setattr(module, name, value)
+
+
+def configure(module: ModuleType, target: str, args: argparse.Namespace):
+    """Apply the command-line overrides to a loaded script's CONFIG."""
+    _set(module, "HEADLESS", False if args.headful else None)
+    _set(module, TARGETS[target][2], args.limit)
+    if args.cache_dir:
+        # One cache per target so concurrent runs never share a directory
+        _set(module, "CACHE_DIR", os.path.join(args.cache_dir, target))
+    if args.no_store:
+        module.ROW_STORE_DB = None
+    else:
+        _set(module, "ROW_STORE_DB", args.db)
+    _set(module, "MAX_WAIT", args.max_wait)
+    _set(module, "COMMAND_STATS", args.commands)
+    _set(module, "TRACE_OUTPUT", args.trace)
+    _set(module, "METRICS_OUTPUT", args.metrics)
+    _set(module, "PROFILE_OUTPUT", args.profile)
+    if args.scroll_delay:
+        _set(module, "DELAY_MIN", args.scroll_delay[0])
+        _set(module, "DELAY_MAX", args.scroll_delay[1])
+
+    if hasattr(module, "TUNING"):
+        changes = {}
+        if args.page_delay:
+            changes["page_delay_min"], changes["page_delay_max"] = args.page_delay
+        if args.scroll_delay:
+            changes["delay_min"], changes["delay_max"] = args.scroll_delay
+        if getattr(args, "pacing_bounds", None):
+            changes["pacing_floor"], changes["pacing_ceiling"] = args.pacing_bounds
+        if getattr(args, "fixed_pacing", False):
+            changes["adaptive_pacing"] = False
+        if getattr(args, "click_next", False):
+            changes["plan_pages"] = False
+        if getattr(args, "breaker", None):
+            changes["breaker_threshold"], changes["breaker_cooldown"] = int(args.breaker[0]), args.breaker[1]
+        for key in ("item_delay", "toggle_wait", "max_wait", "tabs", "page_attempts", "panel_attempts",
+                    "deferred_rounds"):
+            if getattr(args, key, None) is not None:
+                changes[key] = getattr(args, key)
+        module.TUNING = dataclasses.replace(module.TUNING, **changes)
+
+    # Crawl-only options (not defined on the augment parser)
+    if getattr(args, "resume", False):
+        _set(module, "RESUME", True)
+    if getattr(args, "formats", None):
+        _set(module, "COLUMNAR_FORMATS", tuple(f for f in args.formats if f in COLUMNAR))
+        _set(module, "COMPACT_EXPORT", "compact" in args.formats)
+    _set(module, "JSONL_OUTPUT", getattr(args, "jsonl", None))
+    if getattr(args, "match_only", False):
+        _set(module, "SCRAPE_ALL_5ETOOLS", False)
+    if getattr(args, "click_rows", False):
+        _set(module, "TARGETED_LOOKUP", False)
+    inputs = getattr(args, "input", None) or []
+    _set(module, "INPUT_FILE", inputs[0] if inputs else None)
+    _set(module, "INPUT_FILES", tuple(inputs[1:]) or None)
+    if getattr(args, "stream", False):
+        _set(module, "STREAMING", True)
+    _set(module, "CHUNK_SIZE", getattr(args, "chunk_size", None))
+    entities = getattr(args, "entities", None)
+    _set(module, "ENTITIES", tuple(dict.fromkeys(entities)) if entities else None)
+    _set(module, "MAPPING_CACHE", getattr(args, "mapping_cache", None))
+    if getattr(args, "refresh_mapping", False):
+        _set(module, "REFRESH_MAPPING", True)
+    _set(module, "OUTPUT_FILE", getattr(args, "output", None))
+
+    listing_filter = build_filter(args)
+    if listing_filter and hasattr(module, "LISTING_FILTER"):
+        module.LISTING_FILTER = listing_filter
+        # A subset gets its own CSVs, written from the crawled rows: the row
+        # store's views would hold every row stored so far (--db keeps it)
+        for name in ("OUTPUT_FILE_URLS", "OUTPUT_FILE_DATA"):
+            if hasattr(module, name):
+                setattr(module, name, filtered_path(getattr(module, name), listing_filter))
+        if not args.db:
+            module.ROW_STORE_DB = None
+
+
+def build_filter(args: argparse.Namespace) -> Optional[ListingFilter]:
+    """ListingFilter from --source / --level / --rarity / --cr / --filter-param (None if unset)."""
+    cr = getattr(args, "cr", None) or (None, None)
+    listing_filter = ListingFilter(
+        sources=tuple(getattr(args, "sources", None) or ()),
+        levels=tuple(getattr(args, "levels", None) or ()),
+        rarities=tuple(getattr(args, "rarities", None) or ()),
+        cr_min=cr[0] or None,
+        cr_max=cr[1] or None,
+        params=tuple(tuple(p.split("=", 1)) for p in getattr(args, "filter_params", None) or ()),
+    )
+    return listing_filter or None
+
+
+def _param(value: str) -> str:
+    if "=" not in value or not value.startswith("filter-"):
+        raise argparse.ArgumentTypeError(f"expected filter-NAME=VALUE: {value}")
+    return value
+
+
+def _positive(value: str) -> float:
+    v = float(value)
+    if v < 0:
+        raise argparse.ArgumentTypeError(f"must be >= 0: {value}")
+    return v
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    run = common.add_argument_group("run")
+    run.add_argument("--limit", type=int, help="stop after N rows (0 = all)")
+    run.add_argument("--headful", action="store_true", help="show the browser window")
+    run.add_argument("--cache-dir", help="keep Chrome's HTTP cache here between runs")
+    run.add_argument("--db", help="SQLite row store (default: the script's ROW_STORE_DB)")
+    run.add_argument("--no-store", action="store_true", help="write the CSVs directly")
+    run.add_argument(
+        "--commands", metavar="JSON",
+        help="record every WebDriver command; print per-row counts and write stats here",
+    )
+    run.add_argument(
+        "--trace", metavar="JSON",
+        help="write a Chrome trace-event timeline (chrome://tracing, Perfetto, speedscope)",
+    )
+    run.add_argument(
+        "--metrics", metavar="BASE",
+        help="write run metrics to BASE.prom (Prometheus textfile) and BASE.json",
+    )
+    run.add_argument(
+        "--profile", metavar="DIR",
+        help="cProfile each phase into DIR; print browser-wait vs Python time and the top functions",
+    )
+    pace = common.add_argument_group("rate limits (seconds)")
+    pace.add_argument("--max-wait", type=_positive, help="page / list load timeout")
+    pace.add_argument(
+        "--scroll-delay", type=_positive, nargs=2, metavar=("MIN", "MAX"),
+        help="pause between scroll rounds",
+    )
+
+    crawl = argparse.ArgumentParser(add_help=False)
+    listing = crawl.add_argument_group("listing crawl")
+    listing.add_argument("--resume", action="store_true", help="start at the last checkpointed page")
+    listing.add_argument(
+        "--page-delay", type=_positive, nargs=2, metavar=("MIN", "MAX"),
+        help="starting pause between pages (a fixed random range with --fixed-pacing)",
+    )
+    listing.add_argument(
+        "--pacing-bounds", type=_positive, nargs=2, metavar=("FLOOR", "CEILING"),
+        help="range the adaptive page delay may move in",
+    )
+    listing.add_argument(
+        "--fixed-pacing", action="store_true",
+        help="sleep the full --page-delay before every page; no adapting",
+    )
+    listing.add_argument(
+        "--click-next", action="store_true",
+        help="follow Next links instead of loading ?page=N directly (no prefetch)",
+    )
+    listing.add_argument(
+        "--tabs", type=int, metavar="N",
+        help="tabs loading the next pages while one is parsed (1 = prefetch only; default 2)",
+    )
+    listing.add_argument("--page-attempts", type=int, metavar="N", help="tries per page load (default 3)")
+    listing.add_argument("--panel-attempts", type=int, metavar="N", help="tries per more-info panel (default 2)")
+    listing.add_argument(
+        "--breaker", type=_positive, nargs=2, metavar=("FAILURES", "COOLDOWN"),
+        help="pause COOLDOWN seconds after FAILURES page/panel failures in a row (default 5 30)",
+    )
+    listing.add_argument(
+        "--deferred-rounds", type=int, metavar="N",
+        help="reloads of pages with stale or incomplete rows at the end (0 = none; default 2)",
+    )
+    listing.add_argument("--item-delay", type=_positive, help="pause between rows on a page")
+    listing.add_argument("--toggle-wait", type=_positive, help="more-info panel timeout")
+    filt = crawl.add_argument_group("filters (pushed down to the DDB listing, checked per row)")
+    filt.add_argument("--source", dest="sources", action="append", metavar="BOOK",
+                      help="source book name or DDB source ID (repeatable)")
+    filt.add_argument("--level", dest="levels", action="append", type=int, choices=range(10),
+                      metavar="N", help="spell level, 0 = cantrip (repeatable)")
+    filt.add_argument("--rarity", dest="rarities", action="append", metavar="NAME",
+                      help="magic item rarity, e.g. 'Very Rare' (repeatable)")
+    filt.add_argument("--cr", nargs=2, metavar=("MIN", "MAX"),
+                      help="monster challenge rating range, e.g. 1/4 5 ('' = open)")
+    filt.add_argument("--filter-param", dest="filter_params", action="append", type=_param,
+                      metavar="filter-NAME=VALUE", help="any other DDB listing query parameter")
+    out = crawl.add_argument_group("output")
+    out.add_argument(
+        "--format", dest="formats", action="append", choices=(*COLUMNAR, "compact"),
+        help="extra export next to the data CSV (repeatable)",
+    )
+    out.add_argument("--jsonl", metavar="TARGET", help="stream rows as JSON lines ('-' = stdout)")
+
+    ap = argparse.ArgumentParser(
+        prog="scrape.py", description="Run the D&D Beyond / 5e.tools scrapers."
+    )
+    sub = ap.add_subparsers(dest="target", required=True)
+    for target in ("spells", "items"):
+        p = sub.add_parser(target, parents=[common, crawl], help=f"D&D Beyond {target} listing")
+        p.add_argument("--5etools", dest="fiveetools", action="store_true",
+                       help="also match SOURCE_SHORT on 5e.tools")
+        p.add_argument("--match-only", action="store_true",
+                       help="with --5etools, only look up the crawled names (one 5e.tools search each)")
+        p.add_argument("--click-rows", action="store_true",
+                       help="with --match-only, click down the 5e.tools list instead of searching")
+    sub.add_parser("monsters", parents=[common, crawl], help="D&D Beyond monster listing")
+    p = sub.add_parser("augment", parents=[common], help="add SOURCE_SHORT to the existing D&D Beyond CSVs")
+    p.add_argument("--input", nargs="+", metavar="CSV",
+                   help="D&D Beyond magic items data CSV(s); more than one implies --stream")
+    p.add_argument("--output", help="augmented CSV for the first input")
+    p.add_argument("--stream", action="store_true",
+                   help="augment in chunks with constant memory against the full 5e.tools mapping")
+    p.add_argument("--chunk-size", type=int, metavar="N", help="rows per chunk with --stream (default 1000)")
+    p.add_argument("--entities", nargs="+", choices=("spells", "items", "monsters"),
+                   help="5e.tools lists to augment from in one browser session (default items); implies --stream")
+    p.add_argument("--mapping-cache", metavar="JSON",
+                   help="cached 5e.tools mapping for --stream ({key} = spells / items / monsters)")
+    p.add_argument("--refresh-mapping", action="store_true", help="scrape 5e.tools even if the cache is fresh")
+    return ap
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    args = build_parser().parse_args(argv)
+    fiveetools = getattr(args, "fiveetools", False)
+    if getattr(args, "match_only", False) and not fiveetools:
+        raise SystemExit("--match-only needs --5etools")
+    if getattr(args, "click_rows", False) and not getattr(args, "match_only", False):
+        raise SystemExit("--click-rows needs --match-only")
+    if getattr(args, "resume", False) and args.no_store:
+        raise SystemExit("--resume needs the row store (drop --no-store)")
+    listing_filter = build_filter(args)
+    if listing_filter:
+        from common.specs import SPECS
+
+        record = SPECS[SPEC_KEYS[args.target]].record
+        bad = listing_filter.unsupported(record.FIELDS)
+        if bad:
+            raise SystemExit(f"{args.target} rows have no column for: {', '.join(bad)}")
+        if getattr(args, "resume", False) and not args.db:
+            raise SystemExit("--resume with filters needs --db (filtered runs skip the default row store)")
+    module = load_script(script_for(args.target, fiveetools))
+    configure(module, args.target, args)
+    module.main()
+
+
+if __name__ == "__main__":
+    main()
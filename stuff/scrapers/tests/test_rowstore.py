@@ -0,0 +1,25 @@
+"""
+Row store checks. Run from the repo root:
+
+    python -m pytest stuff/scrapers/tests
+"""
+from __future__ import annotations
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.rowstore import RowStore  # noqa: E402
+
+
+def test_spells_view_with_empty_classes(tmp_path):
+    # A timed-out more-info panel leaves CLASSES empty
+    store = RowStore(str(tmp_path / "store.sqlite3"))
+    try:
+        store.upsert("spells", {"ID": "1", "NAME": "Fire Bolt", "URL": "/spells/1-fire-bolt", "CLASSES": ""})
+        store.upsert("spells", {"ID": "2", "NAME": "Shield", "URL": "/spells/2-shield", "CLASSES": "Wizard; Sorcerer"})
+        rows = {r["ID"]: r for r in store.view_rows("dndbeyond_spells_data")}
+    finally:
+        store.close()
+    assert rows["1"]["CLASSES"] == ""
+    assert rows["2"]["CLASSES"] == "Wizard; Sorcerer"
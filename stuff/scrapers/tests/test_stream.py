@@ -0,0 +1,30 @@
+"""
+Streaming pipeline checks. Run from the repo root:
+
+    python -m pytest stuff/scrapers/tests
+"""
+from __future__ import annotations
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.stream import CsvSink  # noqa: E402
+
+
+def test_csv_sink_replaces_only_on_commit(tmp_path):
+    path = tmp_path / "spells-data.csv"
+    path.write_text("ID,NAME\n1,Fire Bolt\n", encoding="utf-8")
+
+    # An interrupted or empty run leaves the previous file as it was
+    sink = CsvSink(str(path), ("ID", "NAME"))
+    sink.write({"ID": "2"})
+    sink.close()
+    assert path.read_text(encoding="utf-8") == "ID,NAME\n1,Fire Bolt\n"
+    assert os.listdir(tmp_path) == ["spells-data.csv"]
+
+    sink = CsvSink(str(path), ("ID", "NAME"))
+    sink.write({"ID": "2", "NAME": "Shield"})
+    sink.commit()
+    sink.close()
+    assert path.read_text(encoding="utf-8").splitlines() == ["ID,NAME", "2,Shield"]
@@ -0,0 +1,94 @@
+/** @format */
+
+// Reader for the compact, dictionary-encoded bundles written by
+// stuff/scrapers/common/compact.py (x-data.compact.json next to x-data.csv).
+// readCompact() returns the same rows csv-parse would return for the CSV.
+
+import fs from "node:fs";
+import zlib from "node:zlib";
+
+type Rec = Record<string, string>;
+
+type CompactBundle = {
+    format: "compact/1";
+    columns: string[];
+    count: number;
+    dicts: Record<string, string[]>;
+    lists: Record<string, string>;
+    derived: Record<string, string>;
+    data: Record<string, unknown[]>;
+    overrides: Record<string, Record<string, string>>;
+};
+
+export function slugify(name: string): string {
+    return name
+        .toLowerCase()
+        .replace(/['’]/g, "")
+        .replace(/[^a-z0-9]+/g, "-")
+        .replace(/^-+|-+$/g, "");
+}
+
+function joinList(values: string[] | null, how: string): string {
+    if (values === null) return "";
+    // Match Python's json.dumps spacing: ["A", "B"]
+    if (how === "json") return `[${values.map((v) => JSON.stringify(v)).join(", ")}]`;
+    return values.join(how);
+}
+
+function derive(col: string, row: Rec, urlTemplate?: string): string {
+    if (col === "NAME_LOWER") return (row.NAME ?? "").toLowerCase();
+    if (col === "SLUG") return slugify(row.NAME ?? "");
+    if (col === "URL" && urlTemplate) {
+        const slug = "SLUG" in row ? row.SLUG : slugify(row.NAME ?? "");
+        return urlTemplate.replace("{ID}", row.ID ?? "").replace("{SLUG}", slug);
+    }
+    return "";
+}
+
+export function decodeCompact(bundle: CompactBundle): Rec[] {
+    if (bundle.format !== "compact/1") {
+        throw new Error(`Not a compact/1 bundle: ${bundle.format}`);
+    }
+    const decoded: Record<string, string[]> = {};
+    for (const [col, values] of Object.entries(bundle.data)) {
+        const lookup = bundle.dicts[col];
+        const how = bundle.lists[col];
+        if (how !== undefined) {
+            decoded[col] = values.map((v) =>
+                joinList(v === null ? null : (v as number[]).map((x) => lookup[x]), how)
+            );
+        } else if (lookup !== undefined) {
+            decoded[col] = values.map((v) => lookup[v as number]);
+        } else {
+            decoded[col] = values.map((v) => String(v));
+        }
+    }
+
+    const rows: Rec[] = [];
+    for (let i = 0; i < bundle.count; i++) {
+        const row: Rec = {};
+        for (const [col, values] of Object.entries(decoded)) row[col] = values[i];
+        rows.push(row);
+    }
+
+    const urlTemplate = bundle.derived.URL;
+    for (const col of ["NAME_LOWER", "SLUG", "URL"]) {
+        if (!(col in bundle.derived)) continue;
+        const overrides = bundle.overrides[col] ?? {};
+        rows.forEach((row, i) => {
+            row[col] = overrides[String(i)] ?? derive(col, row, urlTemplate);
+        });
+    }
+
+    return rows.map((row) => {
+        const out: Rec = {};
+        for (const col of bundle.columns) out[col] = row[col] ?? "";
+        return out;
+    });
+}
+
+export function readCompact(filePath: string): Rec[] {
+    let buf = fs.readFileSync(filePath);
+    if (filePath.endsWith(".gz")) buf = zlib.gunzipSync(buf);
+    return decodeCompact(JSON.parse(buf.toString("utf8")) as CompactBundle);
+}